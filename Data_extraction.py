@@ -7,32 +7,67 @@ Created on Mon Jun 16 16:17:14 2025
 #Importamos las librerías
 import pandas as pd
 import numpy as np
+import os
+import io
+import urllib.request
 import nfl_data_py as nfl
-
-# Diccionario con la información de Conferencia y División de cada equipo.
-TEAM_INFO_MAP = {
-    'ARI': {'conference': 'NFC', 'division': 'NFC West'}, 'ATL': {'conference': 'NFC', 'division': 'NFC South'},
-    'BAL': {'conference': 'AFC', 'division': 'AFC North'}, 'BUF': {'conference': 'AFC', 'division': 'AFC East'},
-    'CAR': {'conference': 'NFC', 'division': 'NFC South'}, 'CHI': {'conference': 'NFC', 'division': 'NFC North'},
-    'CIN': {'conference': 'AFC', 'division': 'AFC North'}, 'CLE': {'conference': 'AFC', 'division': 'AFC North'},
-    'DAL': {'conference': 'NFC', 'division': 'NFC East'}, 'DEN': {'conference': 'AFC', 'division': 'AFC West'},
-    'DET': {'conference': 'NFC', 'division': 'NFC North'}, 'GB': {'conference': 'NFC', 'division': 'NFC North'},
-    'HOU': {'conference': 'AFC', 'division': 'AFC South'}, 'IND': {'conference': 'AFC', 'division': 'AFC South'},
-    'JAX': {'conference': 'AFC', 'division': 'AFC South'}, 'KC': {'conference': 'AFC', 'division': 'AFC West'},
-    'LA': {'conference': 'NFC', 'division': 'NFC West'}, 'LAC': {'conference': 'AFC', 'division': 'AFC West'},
-    'LV': {'conference': 'AFC', 'division': 'AFC West'}, 'MIA': {'conference': 'AFC', 'division': 'AFC East'},
-    'MIN': {'conference': 'NFC', 'division': 'NFC North'}, 'NE': {'conference': 'AFC', 'division': 'AFC East'},
-    'NO': {'conference': 'NFC', 'division': 'NFC South'}, 'NYG': {'conference': 'NFC', 'division': 'NFC East'},
-    'NYJ': {'conference': 'AFC', 'division': 'AFC East'}, 'PHI': {'conference': 'NFC', 'division': 'NFC East'},
-    'PIT': {'conference': 'AFC', 'division': 'AFC North'}, 'SEA': {'conference': 'NFC', 'division': 'NFC West'},
-    'SF': {'conference': 'NFC', 'division': 'NFC West'}, 'TB': {'conference': 'NFC', 'division': 'NFC South'},
-    'TEN': {'conference': 'AFC', 'division': 'AFC South'}, 'WAS': {'conference': 'NFC', 'division': 'NFC East'}
+from PIL import Image
+from utils.players import build_player_dimension
+from utils.careers import build_career_table
+from utils.distributions import build_play_distributions
+from utils.games import build_team_games
+from utils.adjusted import add_adjusted_columns
+from utils.models import MODEL_DIR, add_derived_features, load_or_fit_model_store, load_or_build_feature_matrices
+from utils.charts import data_version
+from utils.teams import TEAM_INFO, TEAM_INFO_MAP, LOGO_DIR, LOGO_SIZES
+
+
+# Columnas de identificadores de jugador del pbp y la estadística (y peso) que aporta cada una.
+DEFENSIVE_PLAYER_ID_COLUMNS = {
+    'solo_tackle_1_player_id': ('solo_tackles', 1.0), 'solo_tackle_2_player_id': ('solo_tackles', 1.0),
+    'tackle_with_assist_1_player_id': ('tackles_with_assist', 1.0), 'tackle_with_assist_2_player_id': ('tackles_with_assist', 1.0),
+    'assist_tackle_1_player_id': ('assisted_tackles', 1.0), 'assist_tackle_2_player_id': ('assisted_tackles', 1.0),
+    'assist_tackle_3_player_id': ('assisted_tackles', 1.0), 'assist_tackle_4_player_id': ('assisted_tackles', 1.0),
+    'sack_player_id': ('sacks', 1.0), 'half_sack_1_player_id': ('sacks', 0.5), 'half_sack_2_player_id': ('sacks', 0.5),
+    'qb_hit_1_player_id': ('qb_hits', 1.0), 'qb_hit_2_player_id': ('qb_hits', 1.0),
+    'interception_player_id': ('interceptions', 1.0),
+    'pass_defense_1_player_id': ('passes_defended', 1.0), 'pass_defense_2_player_id': ('passes_defended', 1.0),
+    'forced_fumble_player_1_player_id': ('forced_fumbles', 1.0), 'forced_fumble_player_2_player_id': ('forced_fumbles', 1.0)
 }
+DEFENSIVE_STAT_BY_SOURCE = {source: stat for source, (stat, _) in DEFENSIVE_PLAYER_ID_COLUMNS.items()}
+DEFENSIVE_WEIGHT_BY_SOURCE = {source: weight for source, (_, weight) in DEFENSIVE_PLAYER_ID_COLUMNS.items()}
+TACKLE_STATS = ['solo_tackles', 'tackles_with_assist', 'assisted_tackles'] #Componentes de los placajes totales
+
+
+def build_defensive_player_stats(pbp_data, roster_info):
+    """
+    Calcula las estadísticas defensivas por jugador y temporada a partir de las columnas
+    de identificadores del play by play (melt de ancho a largo y un único groupby)
+    """
+    id_columns = [col for col in DEFENSIVE_PLAYER_ID_COLUMNS if col in pbp_data.columns] #Solo las columnas disponibles en el pbp
+    plays = pbp_data[['season'] + id_columns].reset_index(drop=True).rename_axis('play').reset_index()
+    long_df = plays.melt(id_vars=['play', 'season'], var_name='source', value_name='player_id').dropna(subset=['player_id']) #Una fila por (jugada, jugador implicado)
+    long_df['stat'] = long_df['source'].map(DEFENSIVE_STAT_BY_SOURCE)
+    long_df['weight'] = long_df['source'].map(DEFENSIVE_WEIGHT_BY_SOURCE) #Medio sack = 0.5
+
+    defense_df = long_df.groupby(['player_id', 'season', 'stat'])['weight'].sum().unstack(fill_value=0).reset_index()
+    defense_df.columns.name = None
+    stat_columns = sorted(set(DEFENSIVE_STAT_BY_SOURCE.values()))
+    for col in stat_columns: #Garantizamos todas las columnas aunque algún año no tenga datos
+        if col not in defense_df.columns:
+            defense_df[col] = 0.0
+    tackles = long_df[long_df['stat'].isin(TACKLE_STATS)].drop_duplicates(['play', 'player_id']) #Un jugador en varias columnas de placaje de la misma jugada cuenta una vez
+    total_tackles = tackles.groupby(['player_id', 'season']).size().rename('total_tackles').reset_index()
+    defense_df = pd.merge(defense_df, total_tackles, on=['player_id', 'season'], how='left')
+    defense_df['total_tackles'] = defense_df['total_tackles'].fillna(0).astype(float)
+
+    defense_df = pd.merge(defense_df, roster_info, on=['player_id', 'season'], how='left', validate='many_to_one')
+    return defense_df.rename(columns={'season': 'year'})
 
 
 def create_nfl_stats_report_advanced(start_year=2020, end_year=2024): #Parámetros de entrada los años de inicio y final, valores por defecto, pero se pueden modificar
     """
-    Genera 3 csvs con estadísticas avanzadas para equipos y jugadores,
+    Genera 6 csvs con estadísticas avanzadas para equipos y jugadores,
     utilizando únicamente datos de la temporada regular
     """
     years = list(range(start_year, end_year + 1)) #Lista de temporadas
@@ -89,8 +124,7 @@ def create_nfl_stats_report_advanced(start_year=2020, end_year=2024): #Parámetr
     offensive_df['conference'] = offensive_df['team'].map(lambda x: TEAM_INFO_MAP.get(x, {}).get('conference')) #Añadimos variables de conferencia y división (diccionario)
     offensive_df['division'] = offensive_df['team'].map(lambda x: TEAM_INFO_MAP.get(x, {}).get('division'))
     
-    offensive_df.to_csv(f'offensive_team_stats_advanced_{start_year}-{end_year}.csv', index=False)
-    print(f"Tabla ofensiva avanzada guardada.\n")
+    print(f"Tabla ofensiva avanzada calculada.\n")
 
     # --- TABLA 2: DEFENSIVA AVANZADA POR EQUIPO Y AÑO ---
     print("--- Procesando Tabla Defensiva Avanzada ---")
@@ -122,21 +156,79 @@ def create_nfl_stats_report_advanced(start_year=2020, end_year=2024): #Parámetr
     defensive_df['conference'] = defensive_df['team'].map(lambda x: TEAM_INFO_MAP.get(x, {}).get('conference'))
     defensive_df['division'] = defensive_df['team'].map(lambda x: TEAM_INFO_MAP.get(x, {}).get('division'))
     
+    print(f"Tabla defensiva avanzada calculada.\n")
+
+    # --- TABLA 3: PARTIDOS POR EQUIPO Y MÉTRICAS AJUSTADAS POR RIVAL ---
+    print("--- Procesando Partidos y Ajuste por Rival ---")
+    team_games = build_team_games(pbp_data) #Una fila por equipo y partido
+    team_games.to_csv(f'team_game_stats_{start_year}-{end_year}.csv', index=False)
+    offensive_df, defensive_df = add_adjusted_columns(offensive_df, defensive_df, team_games) #EPA por jugada y yardas/EPA ajustados por calendario
+
+    offensive_df.to_csv(f'offensive_team_stats_advanced_{start_year}-{end_year}.csv', index=False)
     defensive_df.to_csv(f'defensive_team_stats_advanced_{start_year}-{end_year}.csv', index=False)
-    print(f"Tabla defensiva avanzada guardada.\n")
+    print(f"Tablas de equipos guardadas.\n")
 
-    # --- TABLA 3: ESTADÍSTICAS AVANZADAS POR JUGADOR Y AÑO ---
+    # --- TABLA 4: ESTADÍSTICAS AVANZADAS POR JUGADOR Y AÑO ---
     print("--- Procesando Tabla de Jugadores Avanzada ---")
-    roster_info = roster_data[['player_id', 'player_name', 'position', 'team', 'season']].drop_duplicates() #Eliminar posibles duplicados
-    player_df = pd.merge(seasonal_player_data, roster_info, on=['player_id', 'season'], how='left')
+    roster_info = build_player_dimension(roster_data) #Una fila por jugador y temporada (equipo principal + lista de equipos)
+    player_df = pd.merge(seasonal_player_data, roster_info, on=['player_id', 'season'], how='left', validate='many_to_one') #Sin duplicar filas de jugadores traspasados
     player_df = player_df.rename(columns={'season': 'year'})
+
+    roster_info.rename(columns={'season': 'year'}).to_csv(f'player_dimension_{start_year}-{end_year}.csv', index=False)
     
     player_df.to_csv(f'detailed_player_stats_advanced_{start_year}-{end_year}.csv', index=False)
     print(f"Tabla de jugadores avanzada guardada.\n")
+
+    # Tabla de carreras: player_df contiene todas las temporadas desde start_year, así que se reconstruye entera y
+    # refleja la temporada en curso y los datos corregidos
+    career_df = build_career_table(player_df)
+    career_df.to_csv(f'player_career_stats_{start_year}-{end_year}.csv', index=False)
+    print(f"Tabla de carreras guardada.\n")
+
+    # Escalado y PCA por posición sobre todas las temporadas (la página de modelado solo proyecta)
+    player_file = f'detailed_player_stats_advanced_{start_year}-{end_year}.csv'
+    model_df = add_derived_features(player_df.copy())
+    model_store = load_or_fit_model_store(model_df, data_version(player_file), os.path.join(MODEL_DIR, f'player_models_{start_year}-{end_year}.npz'))
+    load_or_build_feature_matrices(model_df, model_store, os.path.join(MODEL_DIR, f'features_{start_year}-{end_year}')) #Matrices float32 para abrir con memmap
+    print("Modelos y matrices de características por posición guardados.\n")
+
+    # --- TABLA 5: ESTADÍSTICAS DEFENSIVAS POR JUGADOR Y AÑO ---
+    print("--- Procesando Tabla de Jugadores Defensivos ---")
+    defensive_player_df = build_defensive_player_stats(pbp_data, roster_info)
+    defensive_player_df.to_csv(f'defensive_player_stats_advanced_{start_year}-{end_year}.csv', index=False)
+    print(f"Tabla de jugadores defensivos guardada.\n")
+
+    # --- TABLA 6: DISTRIBUCIONES DE JUGADAS (HISTOGRAMAS PRECALCULADOS) ---
+    print("--- Procesando Distribuciones de Jugadas ---")
+    distributions_df = build_play_distributions(pbp_data) #Conteos por bin de EPA, yardas y posición en el campo x EPA
+    distributions_df.to_csv(f'play_distributions_{start_year}-{end_year}.csv', index=False)
+    print(f"Distribuciones de jugadas guardadas.\n")
     
     print("¡Proceso completado exitosamente!")
 
 
+def vendor_team_logos(sizes=LOGO_SIZES):
+    """
+    Descarga una sola vez los logos de ESPN y los guarda redimensionados en Images/logos/<tamaño>/,
+    para que la aplicación no dependa de la red al mostrarlos
+    """
+    print("--- Descargando logos de los equipos ---")
+    for team, info in TEAM_INFO.items():
+        try:
+            with urllib.request.urlopen(info['logo_url'], timeout=10) as response:
+                logo = Image.open(io.BytesIO(response.read())).convert('RGBA')
+        except Exception as e:
+            print(f"No se pudo descargar el logo de {team}: {e}")
+            continue
+        for size in sizes: #Un fichero por tamaño, ya redimensionado
+            os.makedirs(os.path.join(LOGO_DIR, str(size)), exist_ok=True)
+            resized = logo.copy()
+            resized.thumbnail((size, size), Image.LANCZOS)
+            resized.save(os.path.join(LOGO_DIR, str(size), f'{team}.png'), optimize=True)
+    print(f"Logos guardados en '{LOGO_DIR}'.\n")
+
+
 # --- EJECUTAR LA FUNCIÓN ---
 if __name__ == '__main__':
     create_nfl_stats_report_advanced(start_year=2020, end_year=2024)
+    vendor_team_logos()
@@ -55,7 +55,7 @@ with col1:
 
     st.subheader("⚔️ Comparador de Equipos")
     st.info("""
-    Enfréntate a dos equipos en un análisis "Head-to-Head". Compara sus perfiles estadísticos a través de un gráfico de radar
+    Enfrenta hasta diez equipos, de la misma o de distintas temporadas. Compara sus perfiles estadísticos a través de un gráfico de radar
     que muestra sus fortalezas y debilidades.
     """)
     
@@ -75,15 +75,38 @@ with col2:
 
     st.subheader("🎯 Comparador de Jugadores Ofensivos")
     st.info("""
-    Análogo al comparador de equipos, filtra por posición y compara a dos jugadores en un análisis a través de un gráfico de radar.
+    Análogo al comparador de equipos, filtra por posición y compara hasta diez jugadores (o temporadas de un mismo jugador) a través de un gráfico de radar.
     """)
     
+    st.subheader("🔎 Buscador de Jugadores")
+    st.info("""
+    Combina condiciones sobre cualquier estadística (targets, RACR, EPA...) y un rango de temporadas para encontrar al instante
+    los jugadores que las cumplen todas.
+    """)
+
+    st.subheader("🎲 Simulador de Temporada")
+    st.info("""
+    Simula miles de temporadas a partir de la fuerza de cada equipo y descubre sus probabilidades de ganar la división, entrar en playoffs
+    o conseguir cada cabeza de serie, para la temporada completa, los partidos restantes o la temporada siguiente.
+    """)
+
     st.subheader("🧠 Modelado Analítico")
     st.info("""
     Sumérgete en el análisis avanzado con Machine Learning. Descubre arquetipos de jugadores por posición a través del **Clustering**
     o encuentra perfiles estadísticos similares con el **buscador basado en PCA**.
     """)
 
+    st.subheader("🧩 Modelado de Equipos")
+    st.info("""
+    Agrupa los equipos en arquetipos según su ataque y su defensa y descubre qué equipo-temporadas desde 2020 se parecen más a cualquier equipo.
+    """)
+
+    st.subheader("📉 Distribuciones de Jugadas")
+    st.info("""
+    Ve más allá de las medias: descubre cómo se reparten el EPA y las yardas de cada jugada de un equipo o jugador y en qué zonas del campo
+    genera valor, comparado con el resto de la liga.
+    """)
+
 
 st.divider()
 
@@ -0,0 +1,401 @@
+"""
+API HTTP local de solo lectura sobre los mismos datos que las páginas de Streamlit. Es una aplicación ASGI
+sin dependencias: se puede servir con el servidor incluido (python api.py) o con cualquier servidor ASGI
+(uvicorn api:app). Las respuestas llevan ETag (hash del contenido), se comprimen con gzip si el cliente lo
+acepta y los cálculos se ejecutan fuera del bucle de eventos.
+
+Endpoints (GET, JSON):
+    /health
+    /teams?year=2024&conference=AFC&division=AFC West
+    /players?position=QB&year=2024&min=100&sort=passing_yards&limit=20
+    /percentiles/teams?entities=KC:2024,SF:2023&all_time=true
+    /percentiles/players?position=QB&min=100&entities=00-0033873:2024,00-0033873:2020
+    /similar?position=QB&year=2024&min=150&player_id=00-0033873&k=10&weights=passing_epa:2,sacks:0
+
+Uso:
+    python api.py --port 8000
+"""
+
+# Importamos las librerías
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qs
+import numpy as np
+import pandas as pd
+from utils.charts import data_version
+from utils.models import MODEL_DIR, add_derived_features, position_rows, load_or_fit_model_store, load_or_build_feature_matrices, weighted_neighbours
+from utils.percentiles import PercentileMatrix, TEAM_RADAR_METRICS, PLAYER_RADAR_METRICS, radar_columns
+
+OFFENSIVE_FILE = 'offensive_team_stats_advanced_2020-2024.csv'
+DEFENSIVE_FILE = 'defensive_team_stats_advanced_2020-2024.csv'
+PLAYER_FILE = 'detailed_player_stats_advanced_2020-2024.csv'
+RESPONSE_CACHE_SIZE = 512 #Respuestas ya serializadas (y comprimidas) por ruta y parámetros
+GZIP_MIN_BYTES = 1024 #Por debajo de este tamaño no compensa comprimir
+MAX_LIMIT = 500 #Filas máximas por respuesta de clasificación
+
+
+class ApiError(Exception):
+    """Error con código HTTP para devolver al cliente."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# --- Capa de datos (se carga una vez y se reutiliza entre peticiones) ---
+class DataLayer:
+    """Tablas, matrices de percentiles y matrices de características, creadas bajo demanda y una sola vez."""
+
+    def __init__(self, version=None):
+        self.version = data_version(OFFENSIVE_FILE, DEFENSIVE_FILE, PLAYER_FILE) if version is None else version
+        self._lock = threading.RLock() #Reentrante: unos objetos se construyen a partir de otros
+        self._cache = {}
+
+    def _get(self, key, builder):
+        with self._lock: #Las peticiones se atienden en hilos: cada objeto se construye una sola vez
+            if key not in self._cache:
+                self._cache[key] = builder()
+            return self._cache[key]
+
+    def teams(self):
+        def build():
+            offensive, defensive = pd.read_csv(OFFENSIVE_FILE), pd.read_csv(DEFENSIVE_FILE)
+            return pd.merge(offensive, defensive, on=['team', 'year', 'conference', 'division'])
+        return self._get('teams', build)
+
+    def players(self):
+        def build():
+            player_df = add_derived_features(pd.read_csv(PLAYER_FILE))
+            numeric = player_df.select_dtypes('number').columns
+            player_df[numeric] = player_df[numeric].fillna(0) #Como en el comparador de jugadores
+            return player_df
+        return self._get('players', build)
+
+    def team_percentiles(self):
+        return self._get('team_percentiles', lambda: PercentileMatrix(self.teams(), ['team', 'year'], radar_columns(TEAM_RADAR_METRICS)))
+
+    def player_percentiles(self, position, min_participation):
+        return self._get(('player_percentiles', position, min_participation), lambda: PercentileMatrix(
+            position_rows(self.players(), position, min_participation), ['player_id', 'year'], radar_columns(PLAYER_RADAR_METRICS[position])))
+
+    def model_store(self):
+        #Mismos ficheros y versión que la página de modelado: los modelos y matrices se comparten
+        return self._get('model_store', lambda: load_or_fit_model_store(pd.read_csv(PLAYER_FILE).pipe(add_derived_features), data_version(PLAYER_FILE),
+                                                                          os.path.join(MODEL_DIR, 'player_models_2020-2024.npz')))
+
+    def feature_matrices(self):
+        return self._get('feature_matrices', lambda: load_or_build_feature_matrices(pd.read_csv(PLAYER_FILE).pipe(add_derived_features), self.model_store(),
+                                                                                    os.path.join(MODEL_DIR, 'features_2020-2024')))
+
+
+# --- Parámetros ---
+def _param(params, name, default=None, cast=str, required=False):
+    values = params.get(name)
+    if not values:
+        if required:
+            raise ApiError(400, f"Falta el parámetro '{name}'.")
+        return default
+    try:
+        return cast(values[0])
+    except ValueError:
+        raise ApiError(400, f"Valor no válido para '{name}': {values[0]}")
+
+
+def _position(params):
+    position = _param(params, 'position', required=True)
+    if position not in PLAYER_RADAR_METRICS:
+        raise ApiError(400, f"Posición no válida: {position}. Opciones: {', '.join(PLAYER_RADAR_METRICS)}")
+    return position
+
+
+def _entities(params):
+    """Lista 'id:temporada,id:temporada' -> [(id, temporada), ...]."""
+    try:
+        entities = [(entity.rsplit(':', 1)[0], int(entity.rsplit(':', 1)[1])) for entity in _param(params, 'entities', required=True).split(',')]
+    except (IndexError, ValueError):
+        raise ApiError(400, "El parámetro 'entities' debe tener el formato id:temporada,id:temporada")
+    return entities
+
+
+def _weights(params, features):
+    """Lista 'métrica:peso,métrica:peso' -> pesos en el orden de las características (1 para las no indicadas)."""
+    weights = dict.fromkeys(features, 1.0)
+    value = _param(params, 'weights')
+    if value is None:
+        return list(weights.values())
+    try:
+        for item in value.split(','):
+            feature, weight = item.rsplit(':', 1)
+            if feature not in weights:
+                raise ApiError(400, f"Métrica desconocida en 'weights': {feature}")
+            weights[feature] = float(weight)
+    except ValueError:
+        raise ApiError(400, "El parámetro 'weights' debe tener el formato métrica:peso,métrica:peso")
+    if not all(math.isfinite(weight) and weight >= 0 for weight in weights.values()): #nan e inf romperían el JSON y el ranking
+        raise ApiError(400, "Los pesos deben ser números finitos no negativos")
+    return list(weights.values())
+
+
+def _all_time(params):
+    """Percentiles frente a todas las temporadas (all_time=true) o frente a la temporada de cada entidad."""
+    return _param(params, 'all_time', 'false').lower() in ('true', '1')
+
+
+def _records(df):
+    return json.loads(df.to_json(orient='records')) #NaN -> null
+
+
+def _percentile_payload(matrix, entities, radar_metrics, key_names, all_time=False):
+    missing = [entity for entity in entities if entity not in matrix]
+    if missing:
+        raise ApiError(404, f"No encontrados en el grupo de comparación: {missing}")
+    percentiles, values = matrix.take(entities, all_time=all_time)
+    return {'metrics': list(radar_metrics), 'scope': 'all_time' if all_time else 'season', 'entities': [
+        {key_names[0]: entity[0], key_names[1]: entity[1], 'percentiles': [round(p, 2) for p in row_p], 'values': [float(v) for v in row_v]}
+        for entity, row_p, row_v in zip(entities, percentiles.tolist(), values.tolist())
+    ]}
+
+
+# --- Endpoints ---
+def health(data, params):
+    return {'status': 'ok', 'version': str(data.version)}
+
+
+def teams(data, params):
+    df = data.teams()
+    year = _param(params, 'year', cast=int)
+    if year is not None:
+        df = df[df['year'] == year]
+    for column in ['conference', 'division']:
+        value = _param(params, column)
+        if value is not None:
+            df = df[df[column] == value]
+    return {'rows': _records(df)}
+
+
+def players(data, params):
+    position = _position(params)
+    df = position_rows(data.players(), position, _param(params, 'min', 0, float))
+    year = _param(params, 'year', cast=int)
+    if year is not None:
+        df = df[df['year'] == year]
+    sort = _param(params, 'sort')
+    if sort is not None:
+        if sort not in df.columns:
+            raise ApiError(400, f"Columna de ordenación desconocida: {sort}")
+        df = df.sort_values(sort, ascending=_param(params, 'ascending', 'false') == 'true')
+    limit = max(1, min(_param(params, 'limit', 50, int), MAX_LIMIT))
+    return {'total': len(df), 'rows': _records(df.head(limit))}
+
+
+def team_percentiles(data, params):
+    return _percentile_payload(data.team_percentiles(), _entities(params), TEAM_RADAR_METRICS, ('team', 'year'), _all_time(params))
+
+
+def player_percentiles(data, params):
+    position = _position(params)
+    matrix = data.player_percentiles(position, _param(params, 'min', 0, float))
+    return _percentile_payload(matrix, _entities(params), PLAYER_RADAR_METRICS[position], ('player_id', 'year'), _all_time(params))
+
+
+def similar(data, params):
+    """Vecinos más cercanos con la misma escala y fórmula de similitud que la página de modelado."""
+    position = _position(params)
+    year = _param(params, 'year', cast=int, required=True)
+    min_participation = _param(params, 'min', 0, float)
+    player_id = _param(params, 'player_id', required=True)
+    k = max(1, min(_param(params, 'k', 10, int), MAX_LIMIT))
+
+    matrices = data.feature_matrices()
+    if matrices is not None:
+        rows, scaled = matrices.select(position, year, min_participation)
+    else: #Sin matrices en disco: se escala en memoria
+        pool = position_rows(data.players(), position, min_participation)
+        pool = pool[pool['year'] == year]
+        rows, scaled = data.players().index.get_indexer(pool.index), data.model_store()[position].scale_features(pool)
+    pool = data.players().iloc[rows]
+    target = np.flatnonzero(pool['player_id'].to_numpy() == player_id)
+    if len(target) == 0:
+        raise ApiError(404, f"Jugador {player_id} no encontrado en {position} {year} con participación >= {min_participation}")
+
+    features = data.model_store()[position].features
+    weights = _weights(params, features)
+    nearest, distances = weighted_neighbours(scaled, target[:1], weights, k=k)
+    nearest, distances = nearest[0][np.isfinite(distances[0])], distances[0][np.isfinite(distances[0])] #El propio jugador no cuenta
+    result = pool.iloc[nearest][['player_id', 'player_name', 'team', 'year']].assign(
+        distance=distances, similarity_score=100 / (1 + distances))
+    return {'player_id': player_id, 'features': features, 'weights': dict(zip(features, weights)), 'neighbours': _records(result)}
+
+
+ROUTES = {
+    '/health': health,
+    '/teams': teams,
+    '/players': players,
+    '/percentiles/teams': team_percentiles,
+    '/percentiles/players': player_percentiles,
+    '/similar': similar
+}
+
+
+# --- Aplicación ASGI ---
+class ApiApp:
+    """
+    Aplicación ASGI: enruta, calcula en un hilo (asyncio.to_thread) para no bloquear el bucle de eventos y
+    guarda cada respuesta serializada con su ETag y su versión comprimida (LRU por ruta y parámetros)
+    """
+
+    def __init__(self):
+        self.data = DataLayer()
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'cache_hits': 0, 'not_modified': 0}
+
+    def _current_data(self):
+        """Capa de datos de la versión actual de los ficheros: si el ETL los ha reescrito se recarga y se vacía la caché."""
+        version = data_version(OFFENSIVE_FILE, DEFENSIVE_FILE, PLAYER_FILE)
+        with self._lock:
+            if version != self.data.version:
+                self.data = DataLayer(version)
+                self._responses.clear()
+            return self.data
+
+    def _build(self, data, path, query):
+        handler = ROUTES.get(path)
+        if handler is None:
+            raise ApiError(404, f"Ruta desconocida: {path}")
+        body = json.dumps(handler(data, parse_qs(query)), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"' #ETag por contenido: igual entre procesos y reinicios
+        compressed = gzip.compress(body, compresslevel=5) if len(body) >= GZIP_MIN_BYTES else None
+        return 200, body, etag, compressed
+
+    async def _response(self, path, query):
+        data = self._current_data()
+        key = (data.version, path, query) #Una respuesta calculada con datos anteriores nunca se sirve con los nuevos
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is not None:
+                self._responses.move_to_end(key)
+                self.stats['cache_hits'] += 1
+                return cached
+        try:
+            response = await asyncio.to_thread(self._build, data, path, query)
+        except ApiError as error:
+            body = json.dumps({'error': str(error)}, ensure_ascii=False).encode('utf-8')
+            return error.status, body, None, None #Los errores no se guardan
+        with self._lock:
+            self._responses[key] = response
+            while len(self._responses) > RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+        return response
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        if scope['type'] != 'http':
+            return
+
+        self.stats['requests'] += 1
+        headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope.get('headers', [])}
+        if scope['method'] not in ('GET', 'HEAD'):
+            status, body, etag, compressed = 405, b'{"error":"Solo se admiten peticiones GET"}', None, None
+        else:
+            status, body, etag, compressed = await self._response(scope['path'].rstrip('/') or '/', scope.get('query_string', b'').decode('latin-1'))
+
+        response_headers = [(b'content-type', b'application/json; charset=utf-8'), (b'vary', b'accept-encoding')]
+        if etag is not None:
+            response_headers += [(b'etag', etag.encode()), (b'cache-control', b'no-cache')] #El cliente revalida siempre con If-None-Match
+            if etag in [tag.strip() for tag in headers.get('if-none-match', '').split(',')]:
+                self.stats['not_modified'] += 1
+                status, body = 304, b''
+        if status != 304 and compressed is not None and 'gzip' in headers.get('accept-encoding', ''):
+            body = compressed
+            response_headers.append((b'content-encoding', b'gzip'))
+        response_headers.append((b'content-length', str(len(body)).encode()))
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+        await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else body})
+
+
+app = ApiApp()
+
+
+# --- Servidor HTTP/1.1 mínimo (biblioteca estándar) para servir la aplicación ASGI ---
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+async def _handle_connection(asgi_app, reader, writer):
+    """Atiende una conexión con keep-alive: una petición tras otra hasta que el cliente la cierra."""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, target, version = request_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+            headers = []
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers.append((name.strip().lower().encode('latin-1'), value.strip().encode('latin-1')))
+            length = int(dict(headers).get(b'content-length', b'0'))
+            if length:
+                await reader.readexactly(length) #Se descarta el cuerpo (la API no lo usa) para no desincronizar la conexión
+            path, _, query = target.partition('?')
+            scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': version.split('/')[-1], 'method': method,
+                     'path': path, 'raw_path': path.encode(), 'query_string': query.encode('latin-1'), 'headers': headers}
+
+            response = {}
+
+            async def receive():
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    response['status'], response['headers'] = message['status'], message['headers']
+                else:
+                    response['body'] = response.get('body', b'') + message.get('body', b'')
+
+            try:
+                await asgi_app(scope, receive, send)
+            except Exception:
+                response = {'status': 500, 'headers': [(b'content-length', b'0')], 'body': b''}
+            status = response['status']
+            head = f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n".encode() + b''.join(name + b': ' + value + b'\r\n' for name, value in response['headers'])
+            writer.write(head + b'\r\n' + response.get('body', b''))
+            await writer.drain()
+            if dict(headers).get(b'connection', b'').lower() == b'close':
+                break
+    except (ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(asgi_app, host='127.0.0.1', port=8000):
+    server = await asyncio.start_server(lambda r, w: _handle_connection(asgi_app, r, w), host, port)
+    print(f"API escuchando en http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="API local de solo lectura de NFL Analytics Hub")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+    os.chdir(os.path.dirname(os.path.abspath(__file__))) #Los ficheros de datos se leen con rutas relativas a la raíz
+    asyncio.run(serve(app, args.host, args.port))
@@ -0,0 +1,132 @@
+"""
+Prueba de carga de la API local (api.py). Abre varias conexiones keep-alive concurrentes, reparte las
+peticiones entre los endpoints principales y muestra peticiones por segundo y latencias (p50, p95, p99).
+Con --etag cada conexión reenvía el último ETag recibido (If-None-Match) para medir las respuestas 304.
+
+Uso:
+    python benchmarks/api_load_test.py                          # arranca la API en un proceso aparte y la prueba
+    python benchmarks/api_load_test.py --url http://127.0.0.1:8000 --requests 5000 --concurrency 32 --etag
+"""
+
+# Importamos las librerías
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlparse
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Mezcla de peticiones (rutas representativas de cada endpoint)
+DEFAULT_PATHS = [
+    '/teams?year=2024',
+    '/players?position=QB&year=2024&min=100&sort=passing_yards&limit=20',
+    '/players?position=Receptor&year=2023&min=50&sort=receiving_yards&limit=50',
+    '/percentiles/teams?entities=KC:2024,SF:2024,BUF:2023,DET:2024',
+    '/similar?position=RB&year=2024&min=75&player_id=00-0034844&k=10',
+    '/health'
+]
+
+
+async def _worker(host, port, paths, n_requests, use_etag, gzip, latencies, statuses):
+    """Una conexión keep-alive que envía n_requests peticiones seguidas."""
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    try:
+        for i in range(n_requests):
+            path = paths[i % len(paths)]
+            headers = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+            if gzip:
+                headers += "Accept-Encoding: gzip\r\n"
+            if use_etag and path in etags:
+                headers += f"If-None-Match: {etags[path]}\r\n"
+            start = time.perf_counter()
+            writer.write((headers + "\r\n").encode())
+            await writer.drain()
+
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+                elif name.lower() == 'etag':
+                    etags[path] = value.strip()
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+    finally:
+        writer.close()
+
+
+async def run_load(url, n_requests, concurrency, use_etag, gzip, paths=DEFAULT_PATHS):
+    parsed = urlparse(url)
+    latencies, statuses = [], Counter()
+    per_worker = [n_requests // concurrency + (1 if i < n_requests % concurrency else 0) for i in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker(parsed.hostname, parsed.port, paths[i % len(paths):] + paths[:i % len(paths)], n, use_etag, gzip, latencies, statuses)
+                           for i, n in enumerate(per_worker) if n > 0))
+    return time.perf_counter() - start, np.array(latencies), statuses
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(host, port, timeout=120):
+    """Espera a que la API responda a /health (la primera petición carga los datos)."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1) as sock:
+                sock.sendall(b"GET /health HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+                if sock.recv(64).startswith(b'HTTP/1.1 200'):
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("La API no ha arrancado a tiempo.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API local")
+    parser.add_argument('--url', help="URL de una API ya arrancada (por defecto se arranca una en un puerto libre)")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--etag', action='store_true', help="Reenviar el ETag recibido (If-None-Match)")
+    parser.add_argument('--no-gzip', action='store_true', help="No pedir respuestas comprimidas")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        port = _free_port()
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT_DIR, 'api.py'), '--port', str(port)], cwd=ROOT_DIR, stdout=subprocess.DEVNULL)
+        url = f'http://127.0.0.1:{port}'
+    try:
+        _wait_for(urlparse(url).hostname, urlparse(url).port)
+        asyncio.run(run_load(url, len(DEFAULT_PATHS), 1, False, not args.no_gzip)) #Calentamiento: carga de datos y primeras respuestas
+        elapsed, latencies, statuses = asyncio.run(run_load(url, args.requests, args.concurrency, args.etag, not args.no_gzip))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    print(f"{len(latencies)} peticiones, {args.concurrency} conexiones, {elapsed:.2f}s")
+    print(f"Peticiones por segundo: {len(latencies) / elapsed:,.0f}")
+    print(f"Latencia (ms): p50 {p50:.2f} | p95 {p95:.2f} | p99 {p99:.2f}")
+    print("Códigos de respuesta: " + ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items())))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark de arranque en frío de la aplicación. Ejecuta cada página en un proceso nuevo
+(como un worker recién creado) con el AppTest de Streamlit y mide:
+    - import_s: tiempo dedicado a importar librerías durante la ejecución de la página
+    - render_s: tiempo total de la primera ejecución completa de la página
+Compara los resultados con benchmarks/startup_budget.json y termina con error si alguna
+página supera su presupuesto.
+
+Uso:
+    python benchmarks/startup_benchmark.py                 # medir y comprobar el presupuesto
+    python benchmarks/startup_benchmark.py --write-budget  # guardar las medidas actuales (con margen) como presupuesto
+"""
+
+# Importamos las librerías
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(ROOT_DIR, 'benchmarks', 'startup_budget.json')
+BUDGET_HEADROOM = 1.5 #Margen al escribir el presupuesto (máquinas distintas, ruido)
+
+
+def measure_page(page):
+    """Se ejecuta en el proceso hijo: mide importaciones y primera ejecución de una página."""
+    import builtins
+    import threading
+    from streamlit.testing.v1 import AppTest
+
+    original_import = builtins.__import__
+    state = threading.local()
+    import_time = [0.0]
+
+    def timed_import(*args, **kwargs): #Solo contamos la importación más externa para no sumar dos veces
+        depth = getattr(state, 'depth', 0)
+        state.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            return original_import(*args, **kwargs)
+        finally:
+            state.depth = depth
+            if depth == 0:
+                import_time[0] += time.perf_counter() - start
+
+    app = AppTest.from_file(os.path.join(ROOT_DIR, page), default_timeout=300)
+    builtins.__import__ = timed_import
+    start = time.perf_counter()
+    try:
+        app.run()
+    finally:
+        builtins.__import__ = original_import
+    render_time = time.perf_counter() - start
+    errors = [str(e.value) for e in app.exception]
+    return {'page': page, 'import_s': round(import_time[0], 3), 'render_s': round(render_time, 3), 'errors': errors}
+
+
+def run_benchmark(pages):
+    """Lanza un proceso nuevo por página (arranque en frío) y recoge sus medidas."""
+    results = []
+    for page in pages:
+        output = subprocess.run([sys.executable, __file__, '--child', page], cwd=ROOT_DIR, capture_output=True, text=True)
+        if output.returncode != 0:
+            results.append({'page': page, 'import_s': None, 'render_s': None, 'errors': [output.stderr.strip()[-500:]]})
+            continue
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def check_budget(results, budget):
+    """Devuelve la lista de páginas que superan su presupuesto, que no tienen presupuesto (o que fallan)."""
+    failures = []
+    for result in results:
+        if result['errors']:
+            failures.append(f"{result['page']}: error al ejecutar la página ({result['errors'][0][:200]})")
+            continue
+        page_budget = budget.get(result['page'])
+        if page_budget is None: #Una página nueva debe entrar en el presupuesto con --write-budget
+            failures.append(f"{result['page']}: sin presupuesto en {os.path.basename(BUDGET_FILE)} (ejecuta con --write-budget)")
+            continue
+        for key in ('import_s', 'render_s'):
+            if result[key] > page_budget[key]:
+                failures.append(f"{result['page']}: {key} = {result[key]:.3f}s > presupuesto {page_budget[key]:.3f}s")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque en frío de las páginas de la aplicación.")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--write-budget', action='store_true', help="Guarda las medidas actuales como nuevo presupuesto.")
+    parser.add_argument('pages', nargs='*', help="Páginas a medir (por defecto todas).")
+    args = parser.parse_args()
+
+    if args.child: #Proceso hijo: una sola página
+        os.chdir(ROOT_DIR)
+        sys.path.insert(0, ROOT_DIR)
+        print(json.dumps(measure_page(args.child)))
+        return 0
+
+    pages = args.pages or ['Inicio.py'] + sorted(os.path.relpath(p, ROOT_DIR) for p in glob.glob(os.path.join(ROOT_DIR, 'pages', '*.py')))
+    results = run_benchmark(pages)
+
+    print(f"{'Página':<45} {'Imports (s)':>12} {'Render (s)':>12}")
+    for result in results:
+        import_s = f"{result['import_s']:.3f}" if result['import_s'] is not None else '-'
+        render_s = f"{result['render_s']:.3f}" if result['render_s'] is not None else '-'
+        print(f"{result['page']:<45} {import_s:>12} {render_s:>12}")
+
+    budget = {}
+    if os.path.exists(BUDGET_FILE):
+        with open(BUDGET_FILE, encoding='utf-8') as f:
+            budget = json.load(f)
+
+    if args.write_budget: #Solo se actualizan las páginas medidas; las demás conservan su presupuesto
+        budget.update({r['page']: {'import_s': round(r['import_s'] * BUDGET_HEADROOM + 0.1, 2), 'render_s': round(r['render_s'] * BUDGET_HEADROOM + 0.1, 2)}
+                       for r in results if not r['errors']})
+        with open(BUDGET_FILE, 'w', encoding='utf-8') as f:
+            json.dump(budget, f, indent=2, ensure_ascii=False)
+        print(f"\nPresupuesto guardado en {BUDGET_FILE}")
+        return 0
+
+    failures = check_budget(results, budget)
+    if failures:
+        print("\nPáginas fuera de presupuesto:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\nTodas las páginas dentro del presupuesto.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
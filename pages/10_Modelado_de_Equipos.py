@@ -0,0 +1,155 @@
+#Importamos las librerías
+import streamlit as st
+import pandas as pd
+import os
+import numpy as np
+from utils.teams import TEAM_INFO
+from utils.export import export_button
+from utils.charts import cached_figure, data_version
+from utils.models import TEAM_FEATURES, PositionModel, NeighbourIndex, clustering_scores, kmeans_labels
+
+# --- Configuración de la Página ---
+st.set_page_config(
+    page_title="Modelado de Equipos",
+    page_icon="🧩",
+    layout="wide"
+)
+
+# --- Carga de Datos ---
+@st.cache_data
+def load_data(file_path):
+    if os.path.exists(file_path):
+        return pd.read_csv(file_path)
+    else:
+        st.error(f"Error: No se encontró el fichero en la ruta: {file_path}")
+        return None
+
+offensive_df = load_data('offensive_team_stats_advanced_2020-2024.csv')
+defensive_df = load_data('defensive_team_stats_advanced_2020-2024.csv')
+DATA_VERSION = data_version('offensive_team_stats_advanced_2020-2024.csv', 'defensive_team_stats_advanced_2020-2024.csv') #Invalida las figuras guardadas si cambian los ficheros
+
+@st.cache_resource
+def load_team_model(version):
+    """
+    Escalado + PCA ajustados con todos los equipo-temporadas y el índice de vecinos precalculado
+    (se construyen una sola vez por versión de los datos)
+    """
+    team_df = pd.merge(offensive_df, defensive_df, on=['team', 'year', 'conference', 'division']).sort_values(['year', 'team'], ascending=[False, True]).reset_index(drop=True)
+    team_df['label'] = team_df['team'].map({abbr: info['name'] for abbr, info in TEAM_INFO.items()}).fillna(team_df['team']) + ' (' + team_df['year'].astype(str) + ')'
+    model = PositionModel.fit(team_df, TEAM_FEATURES)
+    scaled_features = model.scale_features(team_df)
+    return team_df, model, scaled_features, NeighbourIndex(scaled_features)
+
+@st.cache_data
+def get_clustering_scores(year, version, _scaled_features):
+    """Inercia y silhouette score (k de 2 a 8) de una temporada o de todas, cacheados por vista."""
+    return clustering_scores(_scaled_features, range(2, 9))
+
+# --- Título Principal ---
+st.title("🧩 Modelado Analítico de Equipos")
+st.markdown("Descubre arquetipos de equipos combinando su ataque y su defensa y encuentra los equipo-temporadas más parecidos desde 2020.")
+st.markdown("---")
+
+if offensive_df is None or defensive_df is None:
+    st.warning("No se pudieron cargar los datos. Por favor, verifica la ruta de los ficheros CSV.")
+    st.stop()
+
+team_df, model, all_scaled_features, neighbour_index = load_team_model(DATA_VERSION)
+feature_names = {
+    'offensive_tds': 'TDs Ofensivos', 'net_yards_per_pass': 'Yardas/Pase Netas', 'yards_per_rush': 'Yardas/Carrera', 'total_turnovers': 'Pérdidas de Balón',
+    'cmp_percentage': '% Pases Completados', 'offensive_tds_allowed': 'TDs Permitidos', 'yards_per_pass_allowed': 'Yardas/Pase Permitidas',
+    'yards_per_rush_allowed': 'Yardas/Carrera Permitidas', 'sack_rate': '% de Sacks', 'turnovers_forced': 'Turnovers Forzados'
+}
+
+# --- Barra Lateral de Filtros ---
+st.sidebar.header("Filtros del Modelo")
+years = sorted(team_df['year'].unique(), reverse=True)
+selected_year = st.sidebar.selectbox('Temporadas a agrupar', options=['Todas'] + years)
+in_view = np.ones(len(team_df), dtype=bool) if selected_year == 'Todas' else (team_df['year'] == selected_year).to_numpy()
+model_df = team_df.loc[in_view, ['team', 'year', 'label'] + TEAM_FEATURES].reset_index(drop=True)
+scaled_features = all_scaled_features[in_view]
+model_filters = (selected_year,) #Clave de la vista para reutilizar figuras
+
+# --- Pestañas de Visualización ---
+import plotly.express as px #Importación diferida: solo cuando ya hay datos que dibujar
+tab1, tab2 = st.tabs(["Clustering de Equipos", "Buscador de Equipos Similares"])
+
+with tab1: #Clusters
+    view_name = "todas las temporadas" if selected_year == 'Todas' else str(selected_year)
+    st.header(f"Arquetipos de Equipos ({view_name})")
+    k_range, inertias, silhouette_scores = get_clustering_scores(selected_year, DATA_VERSION, scaled_features)
+    recommended_k = k_range[np.argmax(silhouette_scores)]
+
+    with st.expander("Ver Análisis para Determinar el Número Óptimo de Clústeres (k)"):
+        col1, col2 = st.columns(2)
+        with col1:
+            fig_inertia = cached_figure('team_elbow', DATA_VERSION, model_filters, 'inertia', lambda: px.line(x=k_range, y=inertias, title='Método del Codo (Inertia)', markers=True, labels={'x': 'Número de Clústeres (k)', 'y': 'Inercia'}))
+            st.plotly_chart(fig_inertia, use_container_width=True)
+        with col2:
+            fig_silhouette = cached_figure('team_elbow', DATA_VERSION, model_filters, 'silhouette', lambda: px.line(x=k_range, y=silhouette_scores, title='Coeficiente de Silueta', markers=True, labels={'x': 'Número de Clústeres (k)', 'y': 'Silhouette Score'}))
+            st.plotly_chart(fig_silhouette, use_container_width=True)
+        st.success(f"**Recomendación:** El número óptimo de clústeres según el Silhouette Score es **{recommended_k}**.")
+
+    st.markdown("---")
+    selected_k = st.slider("Selecciona el número de clústeres para visualizar:", min_value=1, max_value=8, value=recommended_k, key='team_k')
+    principal_components = model.project(scaled_features) #PCA ajustado con todas las temporadas: solo un producto matricial
+    model_df['PC1'], model_df['PC2'] = principal_components[:, 0], principal_components[:, 1]
+    model_df['cluster'] = kmeans_labels(scaled_features, selected_k)
+
+    def build_cluster_figure():
+        plot_df = model_df.assign(cluster=model_df['cluster'].astype(str))
+        fig_cluster = px.scatter(plot_df, x='PC1', y='PC2', color='cluster', text='team', hover_name='label',
+                                 hover_data={'team': False, 'cluster': True, 'PC1': False, 'PC2': False},
+                                 title=f'Clústeres de equipos ({view_name}) con k={selected_k}')
+        fig_cluster.update_traces(textposition='top center', textfont_size=9)
+        pc1, pc2 = 100 * model.explained_variance_ratio[:2]
+        fig_cluster.update_layout(xaxis_title=f"Componente Principal 1 ({pc1:.0f}% var.)", yaxis_title=f"Componente Principal 2 ({pc2:.0f}% var.)", legend_title_text='Clúster')
+        return fig_cluster
+
+    st.plotly_chart(cached_figure('team_cluster_scatter', DATA_VERSION, model_filters, selected_k, build_cluster_figure), use_container_width=True)
+    st.caption("Las métricas se estandarizan y las componentes principales se ajustan una sola vez con todos los equipo-temporadas, así que los ejes son comparables entre años.")
+
+    st.markdown("---")
+    st.subheader("Caracterización de Arquetipos")
+    st.markdown("Valor medio de cada métrica para los equipos de cada clúster.")
+    cluster_summary = model_df.groupby('cluster')[TEAM_FEATURES].mean().T.rename(index=feature_names)
+    st.dataframe(cluster_summary.style.format("{:.2f}").background_gradient(cmap='Blues', axis=1))
+    export_button(model_df.drop(columns='label'), f"clusters_equipos_{selected_year}_k{selected_k}", 'team_cluster_export', label="📥 Exportar Asignaciones")
+
+
+with tab2: #Similitud
+    st.header("Buscador de Equipos Similares")
+    st.markdown("Selecciona un equipo y una temporada para encontrar los equipo-temporadas con el perfil estadístico más parecido desde 2020. Los vecinos están precalculados, así que la respuesta es inmediata.")
+    default_row = team_df.index[(team_df['team'] == 'DET') & (team_df['year'] == years[0])]
+    selected_row = st.selectbox("Selecciona un equipo:", team_df.index, index=int(default_row[0]) if len(default_row) else 0, format_func=team_df['label'].get)
+    exclude_same_team = st.checkbox("Excluir otras temporadas del mismo equipo", value=False)
+
+    exclude = team_df.index[team_df['team'] == team_df.loc[selected_row, 'team']] if exclude_same_team else None
+    rows, distances = neighbour_index.query(selected_row, k=10, exclude=exclude)
+    similar_teams = team_df.loc[rows, ['label'] + TEAM_FEATURES].assign(similarity_score=100 / (1 + distances)) #Misma fórmula de similitud que la de jugadores
+
+    st.markdown("---")
+    st.subheader(f"Top 10 Equipos más similares a {team_df.loc[selected_row, 'label']}:")
+    display_df = pd.concat([team_df.loc[[selected_row], ['label'] + TEAM_FEATURES].assign(similarity_score=np.nan), similar_teams]) #Primera fila: el equipo seleccionado
+    st.dataframe(
+        display_df[['label', 'similarity_score'] + TEAM_FEATURES].rename(columns=feature_names).style
+            .format({'similarity_score': "{:.1f}%"}, subset=['similarity_score'], na_rep='-')
+            .format("{:.2f}", subset=[feature_names[col] for col in TEAM_FEATURES])
+            .background_gradient(cmap='Greens', subset=['similarity_score'])
+            .relabel_index(['Equipo', 'Similitud'] + [feature_names[col] for col in TEAM_FEATURES], axis=1),
+        hide_index=True
+    )
+    export_button(similar_teams, f"equipos_similares_{team_df.loc[selected_row, 'team']}_{team_df.loc[selected_row, 'year']}", 'team_similarity_export', label="📥 Exportar Similares")
+
+
+st.divider()
+col3, col4, col5 = st.columns(3)
+with col3:
+    st.image('./Images/logo_sdc.png', width=250)
+with col4:
+    st.image('./Images/logo_nfl.png', width=120)
+with col5:
+    st.image('./Images/logo_ucam.jpg', width=100)
+st.caption('Trabajo de Fin de Master - Master en Big Data Deportivo')
+st.caption('NFL Analytics Hub')
+st.caption('Juan Marcos Díaz')
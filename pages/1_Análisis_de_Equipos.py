@@ -8,8 +8,12 @@ Created on Tue Jul 8 20:37:21 2025
 import streamlit as st
 import pandas as pd
 import os
-import plotly.express as px
-import plotly.graph_objects as go
+from utils.ranges import RangeAggregator, TEAM_OFFENSE_RATES, TEAM_DEFENSE_RATES, TEAM_OFFENSE_WEIGHTED, TEAM_DEFENSE_WEIGHTED, numeric_sum_columns
+from utils.export import export_button
+from utils.charts import cached_figure, data_version, scatter_render_mode
+from utils.prefetch import PRIORITY_ADJACENT_SEASON, get_prefetcher, session_scope, show_prefetch_stats
+from utils.distributions import DistributionStore
+from utils.bootstrap import TEAM_BOOTSTRAP_METRICS, CONFIDENCE, available_metrics, bootstrap_metric, interval_table
 
 # --- Configuración de la Página ---
 st.set_page_config(
@@ -30,15 +34,53 @@ def load_data(file_path):
 
 offensive_df = load_data('offensive_team_stats_advanced_2020-2024.csv')
 defensive_df = load_data('defensive_team_stats_advanced_2020-2024.csv')
+DISTRIBUTIONS_FILE = 'play_distributions_2020-2024.csv' #Fichero opcional generado por Data_extraction.py
+DATA_VERSION = data_version('offensive_team_stats_advanced_2020-2024.csv', 'defensive_team_stats_advanced_2020-2024.csv', DISTRIBUTIONS_FILE) #Invalida las figuras guardadas si cambian los ficheros
+
+@st.cache_resource
+def load_range_aggregator(file_path, _rate_formulas, _weighted_columns):
+    """Sumas acumuladas por equipo y año para consultar cualquier rango de temporadas sin recorrer filas."""
+    data = load_data(file_path)
+    exclude = list(_rate_formulas) + list(_weighted_columns)
+    return RangeAggregator(data, 'team', numeric_sum_columns(data, exclude), _rate_formulas, _weighted_columns, attribute_columns=['conference', 'division'])
+
+@st.cache_resource
+def load_distribution_store(file_path):
+    """Histogramas por jugada precalculados (None si no se han generado)."""
+    return DistributionStore(pd.read_csv(file_path)) if os.path.exists(file_path) else None
+
+@st.cache_data
+def load_bootstrap(year, metric_col):
+    """Réplicas bootstrap de una métrica para todos los equipos de una temporada (se calculan una vez por temporada)."""
+    season_df = offensive_df[offensive_df['year'] == year]
+    return bootstrap_metric(TEAM_BOOTSTRAP_METRICS[metric_col], season_df, 'team', load_distribution_store(DISTRIBUTIONS_FILE), year)
+
+def filter_view(df, conference, division):
+    """Equipos de la conferencia y división seleccionadas."""
+    if conference != 'Ambas':
+        df = df[df['conference'] == conference]
+        if division != 'Todas':
+            df = df[df['division'] == division]
+    return df
+
+prefetcher = get_prefetcher()
+prefetch_scope = session_scope('team_analysis')
+prefetcher.foreground(prefetch_scope) #Cancela la precarga pendiente de esta sesión y le da prioridad a esta ejecución
 
 # --- Barra Lateral de Filtros ---
 st.sidebar.header("Filtros de Visualización")
 
 if offensive_df is not None and defensive_df is not None: #Filtro año
-    selected_year = st.sidebar.selectbox(
-        'Selecciona una Temporada',
-        options=sorted(offensive_df['year'].unique(), reverse=True)
-    )
+    years = sorted(offensive_df['year'].unique())
+    use_year_range = st.sidebar.checkbox('Ver un rango de temporadas') #Totales y ratios de varias temporadas
+    if use_year_range:
+        start_year, end_year = st.sidebar.select_slider('Selecciona el Rango de Temporadas', options=years, value=(years[0], years[-1]))
+        selected_year = f"{start_year}-{end_year}" if start_year != end_year else start_year
+    else:
+        selected_year = st.sidebar.selectbox(
+            'Selecciona una Temporada',
+            options=years[::-1]
+        )
 
     conference_options = ['Ambas'] + sorted(offensive_df['conference'].dropna().unique()) #Filtro conferencia
     selected_conference = st.sidebar.selectbox(
@@ -56,19 +98,28 @@ if offensive_df is not None and defensive_df is not None: #Filtro año
         options=division_options
     )
 
-    filtered_offensive_df = offensive_df[offensive_df['year'] == selected_year]
-    filtered_defensive_df = defensive_df[defensive_df['year'] == selected_year]
+    if use_year_range:
+        filtered_offensive_df = load_range_aggregator('offensive_team_stats_advanced_2020-2024.csv', TEAM_OFFENSE_RATES, TEAM_OFFENSE_WEIGHTED).query(start_year, end_year)
+        filtered_defensive_df = load_range_aggregator('defensive_team_stats_advanced_2020-2024.csv', TEAM_DEFENSE_RATES, TEAM_DEFENSE_WEIGHTED).query(start_year, end_year)
+    else:
+        filtered_offensive_df = offensive_df[offensive_df['year'] == selected_year]
+        filtered_defensive_df = defensive_df[defensive_df['year'] == selected_year]
 
-    if selected_conference != 'Ambas':
-        filtered_offensive_df = filtered_offensive_df[filtered_offensive_df['conference'] == selected_conference]
-        filtered_defensive_df = filtered_defensive_df[filtered_defensive_df['conference'] == selected_conference]
-        if selected_division != 'Todas':
-            filtered_offensive_df = filtered_offensive_df[filtered_offensive_df['division'] == selected_division]
-            filtered_defensive_df = filtered_defensive_df[filtered_defensive_df['division'] == selected_division]
+    filtered_offensive_df = filter_view(filtered_offensive_df, selected_conference, selected_division)
+    filtered_defensive_df = filter_view(filtered_defensive_df, selected_conference, selected_division)
 else:
     st.warning("No se pudieron cargar los datos. Por favor, verifica la ruta de los ficheros CSV.")
     st.stop()
 
+view_filters = (selected_year, selected_conference, selected_division) #Clave de la vista para reutilizar figuras
+
+# --- Exportación de la vista filtrada ---
+with st.sidebar:
+    st.markdown("---")
+    st.subheader("Exportar Vista")
+    export_table = st.selectbox("Tabla:", ['Ofensiva', 'Defensiva'], key='export_table')
+    export_button(filtered_offensive_df if export_table == 'Ofensiva' else filtered_defensive_df, f"equipos_{export_table.lower()}_{selected_year}", 'team_export')
+
 # --- Título Principal ---
 st.title(f"📊 Análisis de Equipos - Temporada Regular {selected_year}")
 st.markdown("Explora y compara el rendimiento de los equipos de la NFL en diferentes facetas del juego. Utiliza los menús desplegables para ver las estadísticas.")
@@ -81,50 +132,61 @@ LOWER_IS_BETTER_METRICS = [ #En estas variables un valor más bajo es mejor (imp
     'total_yards_allowed', 'total_plays_faced', 'yards_per_play_allowed',
     'completions_allowed', 'pass_attempts_faced', 'passing_yards_allowed', 'passing_tds_allowed',
     'opponent_cmp_percentage', 'yards_per_pass_allowed', 'offensive_tds_allowed',
-    'rush_attempts_faced', 'rushing_yards_allowed', 'rushing_tds_allowed', 'yards_per_rush_allowed'
+    'rush_attempts_faced', 'rushing_yards_allowed', 'rushing_tds_allowed', 'yards_per_rush_allowed', 'epa_per_play_allowed'
 ]
 
-def create_plotly_barchart(df, metric_col, metric_name):
-    """Crea un gráfico de barras horizontal, ordenado y con colores graduales."""
-    st.markdown(f"**Ranking por {metric_name}**")
+# Métricas por jugada y ajustadas por la calidad del rival (generadas por Data_extraction.py)
+ADJUSTED_OFFENSE_METRICS = {'EPA por Jugada': 'epa_per_play', 'Yardas por Jugada (Ajustadas por Rival)': 'adj_yards_per_play', 'EPA por Jugada (Ajustado por Rival)': 'adj_epa_per_play'}
+ADJUSTED_DEFENSE_METRICS = {'EPA por Jugada Permitido': 'epa_per_play_allowed', 'Yardas por Jugada Permitidas (Ajustadas por Rival)': 'adj_yards_per_play_allowed', 'EPA por Jugada Permitido (Ajustado por Rival)': 'adj_epa_per_play_allowed'}
+
+def team_bar_figure(df, metric_col, metric_name):
+    """Gráfico de barras horizontal, ordenado y con colores graduales (sin llamadas a Streamlit: también se usa en la precarga)."""
+    import plotly.express as px #Importación diferida (arranque más rápido)
     lower_is_better = any(keyword in metric_col for keyword in LOWER_IS_BETTER_METRICS) 
     chart_data = df.sort_values(by=metric_col, ascending=lower_is_better) #Ordenamos de menos a más si la métrica pertenece a la anterior lista
     color_scale = px.colors.diverging.RdYlGn_r if lower_is_better else px.colors.diverging.RdYlGn #Escala de colores gradual Verde/Amarillo/Rojo
-    fig = px.bar(chart_data, x=metric_col, y='team', orientation='h', color=metric_col, color_continuous_scale=color_scale, text_auto='.2s', labels={'team': 'Equipo', metric_col: metric_name})
+    fig = px.bar(chart_data, x=metric_col, y='team', orientation='h', color=metric_col, color_continuous_scale=color_scale, text_auto='.3f' if 'epa' in metric_col else '.2s', labels={'team': 'Equipo', metric_col: metric_name}) #El EPA por jugada necesita decimales
     fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', xaxis=(dict(showgrid=False)), yaxis={'categoryorder':'total ascending'}, coloraxis_showscale=False, height=max(400, len(df) * 20))
     fig.update_traces(textposition='outside', marker_line_color='rgb(8,48,107)', marker_line_width=1.5)
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-def create_plotly_scatterplot(df, x_metric, y_metric, x_name, y_name, title, is_defensive=False):
-    """Crea un gráfico de dispersión con líneas de promedio y anotaciones de cuadrantes correctas."""
-    st.markdown(f"**{title}**")
-    
+def team_scatter_figure(df, x_metric, y_metric, x_name, y_name, is_defensive=False):
+    """Gráfico de dispersión con líneas de promedio y anotaciones de cuadrantes (sin llamadas a Streamlit)."""
+    import plotly.express as px #Importación diferida (arranque más rápido)
     x_avg = df[x_metric].mean() #Medias para dar el eje
     y_avg = df[y_metric].mean()
-
     fig = px.scatter(
         df, x=x_metric, y=y_metric, text='team',
         labels={x_metric: x_name, y_metric: y_name},
         hover_name='team',
-        hover_data={x_metric: ':.2f', y_metric: ':.2f', 'team': False}
+        hover_data={x_metric: ':.2f', y_metric: ':.2f', 'team': False},
+        render_mode=scatter_render_mode(len(df)) #WebGL automático con muchos puntos
     )
     fig.add_vline(x=x_avg, line_width=2, line_dash="dash", line_color="gray") #Ejes
     fig.add_hline(y=y_avg, line_width=2, line_dash="dash", line_color="gray")
-    
     if is_defensive: #Texto a mostrar en cada cuadrante, depende del lado de la jugada
         top_right_text, top_right_color = "Peor Pase, Peor Carrera", "red"
         bottom_left_text, bottom_left_color = "Mejor Pase, Mejor Carrera", "green"
     else:
         top_right_text, top_right_color = "Mejor Pase, Mejor Carrera", "green"
         bottom_left_text, bottom_left_color = "Peor Pase, Peor Carrera", "red"
-
     fig.add_annotation(x=df[x_metric].max(), y=df[y_metric].max(), text=top_right_text, showarrow=False, xanchor='right', yanchor='top', font=dict(color=top_right_color, size=10), bgcolor="rgba(255,255,255,0.5)")
     fig.add_annotation(x=df[x_metric].min(), y=df[y_metric].min(), text=bottom_left_text, showarrow=False, xanchor='left', yanchor='bottom', font=dict(color=bottom_left_color, size=10), bgcolor="rgba(255,255,255,0.5)")
-
     fig.update_traces(textposition='top center', textfont_size=10)
     fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', height=500)
+    return fig
+
+def create_plotly_barchart(df, metric_col, metric_name, filters=()):
+    """Crea un gráfico de barras horizontal, ordenado y con colores graduales."""
+    st.markdown(f"**Ranking por {metric_name}**")
+    fig = cached_figure('team_bar', DATA_VERSION, filters, metric_col, lambda: team_bar_figure(df, metric_col, metric_name)) #Reutiliza la figura si ya se construyó con los mismos filtros
     st.plotly_chart(fig, use_container_width=True)
 
+def create_plotly_scatterplot(df, x_metric, y_metric, x_name, y_name, title, is_defensive=False, filters=()):
+    """Crea un gráfico de dispersión con líneas de promedio y anotaciones de cuadrantes correctas."""
+    st.markdown(f"**{title}**")
+    fig = cached_figure('team_scatter', DATA_VERSION, filters, (x_metric, y_metric), lambda: team_scatter_figure(df, x_metric, y_metric, x_name, y_name, is_defensive))
+    st.plotly_chart(fig, use_container_width=True)
 
 # --- Menús Desplegables ---
 with st.expander("📊 Estadísticas Totales"): #4 expandibles y 2 columnas
@@ -133,13 +195,15 @@ with st.expander("📊 Estadísticas Totales"): #4 expandibles y 2 columnas
     with col_total_off:
         st.subheader("🚀 Ofensiva")
         offensive_total_metrics = {'Yardas Totales': 'total_yards', 'Jugadas Totales': 'total_plays', 'Yardas por Jugada': 'yards_per_play', 'TDs Ofensivos': 'offensive_tds', 'Pérdidas de Balón': 'total_turnovers'} #Renombramos las estadísticas
+        offensive_total_metrics.update({name: col for name, col in ADJUSTED_OFFENSE_METRICS.items() if col in filtered_offensive_df.columns}) #Solo si las tablas incluyen el ajuste por rival
         selected_off_total_name = st.selectbox("Selecciona una métrica:", options=list(offensive_total_metrics.keys()), key='off_total') #Selección (filtro desplegable)
-        create_plotly_barchart(filtered_offensive_df, offensive_total_metrics[selected_off_total_name], selected_off_total_name) #Creamos gráfico con la función
+        create_plotly_barchart(filtered_offensive_df, offensive_total_metrics[selected_off_total_name], selected_off_total_name, filters=view_filters) #Creamos gráfico con la función
     with col_total_def:
         st.subheader("🛡️ Defensiva")
         defensive_total_metrics = {'Yardas Totales Permitidas': 'total_yards_allowed', 'Jugadas Totales Enfrentadas': 'total_plays_faced', 'Yardas por Jugada Permitidas': 'yards_per_play_allowed', 'TDs Ofensivos Permitidos': 'offensive_tds_allowed', 'Pérdidas de Balón Forzadas': 'turnovers_forced'}
+        defensive_total_metrics.update({name: col for name, col in ADJUSTED_DEFENSE_METRICS.items() if col in filtered_defensive_df.columns})
         selected_def_total_name = st.selectbox("Selecciona una métrica:", options=list(defensive_total_metrics.keys()), key='def_total')
-        create_plotly_barchart(filtered_defensive_df, defensive_total_metrics[selected_def_total_name], selected_def_total_name)
+        create_plotly_barchart(filtered_defensive_df, defensive_total_metrics[selected_def_total_name], selected_def_total_name, filters=view_filters)
 
 with st.expander("✈️ Estadísticas de Pase"):
    
@@ -148,12 +212,12 @@ with st.expander("✈️ Estadísticas de Pase"):
         st.subheader("🚀 Ofensiva")
         offensive_pass_metrics = {'Yardas de Pase': 'passing_yards', 'TDs de Pase': 'passing_tds', 'Pases Completados': 'pass_completions', 'Intentos de Pase': 'pass_attempts', '% Pases Completados': 'cmp_percentage', 'Yardas por Intento de Pase': 'yards_per_pass', 'Yardas Netas por Pase': 'net_yards_per_pass', 'Ratio TD/INT': 'pass_td_int_ratio', 'Intercepciones Lanzadas': 'interceptions', 'Sacks Sufridos': 'sacks_taken'}
         selected_off_pass_name = st.selectbox("Selecciona una métrica:", options=list(offensive_pass_metrics.keys()), key='off_pass')
-        create_plotly_barchart(filtered_offensive_df, offensive_pass_metrics[selected_off_pass_name], selected_off_pass_name)
+        create_plotly_barchart(filtered_offensive_df, offensive_pass_metrics[selected_off_pass_name], selected_off_pass_name, filters=view_filters)
     with col_pass_def:
         st.subheader("🛡️ Defensiva")
         defensive_pass_metrics = {'Yardas de Pase Permitidas': 'passing_yards_allowed', 'TDs de Pase Permitidos': 'passing_tds_allowed', 'Intercepciones Realizadas': 'interceptions_made', 'Sacks Realizados': 'sacks_made', '% Pases Completados del Rival': 'opponent_cmp_percentage', 'Yardas por Intento de Pase Permitidas': 'yards_per_pass_allowed', '% de Sacks por Jugada de Pase': 'sack_rate'}
         selected_def_pass_name = st.selectbox("Selecciona una métrica:", options=list(defensive_pass_metrics.keys()), key='def_pass')
-        create_plotly_barchart(filtered_defensive_df, defensive_pass_metrics[selected_def_pass_name], selected_def_pass_name)
+        create_plotly_barchart(filtered_defensive_df, defensive_pass_metrics[selected_def_pass_name], selected_def_pass_name, filters=view_filters)
 
 with st.expander("🏃‍♂️ Estadísticas de Carrera"):
    
@@ -162,12 +226,12 @@ with st.expander("🏃‍♂️ Estadísticas de Carrera"):
         st.subheader("🚀 Ofensiva")
         offensive_rush_metrics = {'Yardas de Carrera': 'rushing_yards', 'TDs de Carrera': 'rushing_tds', 'Intentos de Carrera': 'rush_attempts', 'Yardas por Intento de Carrera': 'yards_per_rush', 'Fumbles Perdidos': 'fumbles_lost'}
         selected_off_rush_name = st.selectbox("Selecciona una métrica:", options=list(offensive_rush_metrics.keys()), key='off_rush')
-        create_plotly_barchart(filtered_offensive_df, offensive_rush_metrics[selected_off_rush_name], selected_off_rush_name)
+        create_plotly_barchart(filtered_offensive_df, offensive_rush_metrics[selected_off_rush_name], selected_off_rush_name, filters=view_filters)
     with col_rush_def:
         st.subheader("🛡️ Defensiva")
         defensive_rush_metrics = {'Yardas de Carrera Permitidas': 'rushing_yards_allowed', 'TDs de Carrera Permitidos': 'rushing_tds_allowed', 'Yardas por Intento de Carrera Permitidas': 'yards_per_rush_allowed', 'Fumbles Forzados': 'fumbles_forced'}
         selected_def_rush_name = st.selectbox("Selecciona una métrica:", options=list(defensive_rush_metrics.keys()), key='def_rush')
-        create_plotly_barchart(filtered_defensive_df, defensive_rush_metrics[selected_def_rush_name], selected_def_rush_name)
+        create_plotly_barchart(filtered_defensive_df, defensive_rush_metrics[selected_def_rush_name], selected_def_rush_name, filters=view_filters)
 
 with st.expander("⚖️ Comparativa del Juego de Pase y de Carrera"):
     col_scatter_off, col_scatter_def = st.columns(2, gap="large")
@@ -181,7 +245,7 @@ with st.expander("⚖️ Comparativa del Juego de Pase y de Carrera"):
         }
         selected_scatter_off_name = st.selectbox("Selecciona una comparativa:", options=list(scatter_off_options.keys()), key='scatter_off')
         x_metric_off, y_metric_off, x_name_off, y_name_off = scatter_off_options[selected_scatter_off_name]
-        create_plotly_scatterplot(filtered_offensive_df, x_metric_off, y_metric_off, x_name_off, y_name_off, f"Eficiencia Ofensiva: {selected_scatter_off_name}")
+        create_plotly_scatterplot(filtered_offensive_df, x_metric_off, y_metric_off, x_name_off, y_name_off, f"Eficiencia Ofensiva: {selected_scatter_off_name}", filters=view_filters)
 
     with col_scatter_def:
         st.subheader("🛡️ Defensiva")
@@ -192,7 +256,66 @@ with st.expander("⚖️ Comparativa del Juego de Pase y de Carrera"):
         }
         selected_scatter_def_name = st.selectbox("Selecciona una comparativa:", options=list(scatter_def_options.keys()), key='scatter_def')
         x_metric_def, y_metric_def, x_name_def, y_name_def = scatter_def_options[selected_scatter_def_name]
-        create_plotly_scatterplot(filtered_defensive_df, x_metric_def, y_metric_def, x_name_def, y_name_def, f"Eficiencia Defensiva: {selected_scatter_def_name}", is_defensive=True)
+        create_plotly_scatterplot(filtered_defensive_df, x_metric_def, y_metric_def, x_name_def, y_name_def, f"Eficiencia Defensiva: {selected_scatter_def_name}", is_defensive=True, filters=view_filters)
+
+with st.expander("🎯 Incertidumbre de los Rankings"):
+    st.markdown(f"Intervalos de confianza del {int(CONFIDENCE * 100)}% obtenidos remuestreando las jugadas de cada equipo (bootstrap) y el rango de posiciones que podría ocupar cada uno en la clasificación.")
+    ci_metrics = {'% Pases Completados': 'cmp_percentage', 'Yardas por Intento de Pase': 'yards_per_pass', 'EPA por Jugada': 'epa_per_play'}
+    ci_metrics = {name: col for name, col in ci_metrics.items() if col in available_metrics(TEAM_BOOTSTRAP_METRICS, load_distribution_store(DISTRIBUTIONS_FILE))}
+    if use_year_range:
+        st.info("Los intervalos se calculan por temporada. Selecciona una única temporada para verlos.")
+    else:
+        selected_ci_name = st.selectbox("Selecciona una métrica:", options=list(ci_metrics.keys()), key='ci_metric')
+        if len(ci_metrics) < 3:
+            st.caption("Las métricas por jugada (yardas, EPA) requieren el fichero de distribuciones de jugadas generado por Data_extraction.py.")
+        entities, point, draws = load_bootstrap(selected_year, ci_metrics[selected_ci_name])
+        in_view = pd.Series(entities).isin(filtered_offensive_df['team']).to_numpy() #Clasificación entre los equipos filtrados
+        ci_df = interval_table(entities[in_view], point[in_view], draws[:, in_view])
+
+        def build_ci_figure():
+            import plotly.express as px
+            chart_data = ci_df.sort_values('value')
+            fig = px.scatter(chart_data, x='value', y='entity', error_x=chart_data['ci_high'] - chart_data['value'], error_x_minus=chart_data['value'] - chart_data['ci_low'],
+                             labels={'value': selected_ci_name, 'entity': 'Equipo'}, hover_data={'rank_low': True, 'rank_high': True})
+            fig.update_traces(marker=dict(size=9, color='#013369'), error_x=dict(color='gray', thickness=1.5))
+            fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', xaxis=dict(showgrid=True, gridcolor='lightgrey'), height=max(400, len(chart_data) * 20))
+            return fig
+
+        col_ci_chart, col_ci_table = st.columns([3, 2], gap="large")
+        with col_ci_chart:
+            st.plotly_chart(cached_figure('team_ci', DATA_VERSION, view_filters, ci_metrics[selected_ci_name], build_ci_figure), use_container_width=True)
+        with col_ci_table:
+            ci_display = ci_df.assign(rank_range=ci_df['rank_low'].astype(str) + ' - ' + ci_df['rank_high'].astype(str))
+            st.dataframe(ci_display[['rank', 'entity', 'value', 'ci_low', 'ci_high', 'rank_range']].style.format({'value': "{:.2f}", 'ci_low': "{:.2f}", 'ci_high': "{:.2f}"})
+                         .relabel_index(['Posición', 'Equipo', 'Valor', 'IC Inferior', 'IC Superior', 'Rango de Posiciones'], axis=1), hide_index=True, height=min(35 * (len(ci_df) + 1) + 3, 600))
+            export_button(ci_df, f"intervalos_{ci_metrics[selected_ci_name]}_{selected_year}", 'team_ci_export')
+
+# --- Precarga de las temporadas contiguas ---
+prefetch_tasks = []
+if not use_year_range:
+    bar_charts = [ #Gráficos visibles: (tabla, columna, nombre)
+        ('off', offensive_total_metrics[selected_off_total_name], selected_off_total_name), ('def', defensive_total_metrics[selected_def_total_name], selected_def_total_name),
+        ('off', offensive_pass_metrics[selected_off_pass_name], selected_off_pass_name), ('def', defensive_pass_metrics[selected_def_pass_name], selected_def_pass_name),
+        ('off', offensive_rush_metrics[selected_off_rush_name], selected_off_rush_name), ('def', defensive_rush_metrics[selected_def_rush_name], selected_def_rush_name)
+    ]
+    scatter_charts = [('off', scatter_off_options[selected_scatter_off_name], False), ('def', scatter_def_options[selected_scatter_def_name], True)]
+
+    def prefetch_season(year, conference=selected_conference, division=selected_division):
+        """Tarea de precarga: las mismas figuras para otra temporada con los mismos filtros."""
+        def task():
+            season_dfs = {'off': filter_view(offensive_df[offensive_df['year'] == year], conference, division),
+                          'def': filter_view(defensive_df[defensive_df['year'] == year], conference, division)}
+            filters = (year, conference, division)
+            for side, metric_col, metric_name in bar_charts:
+                cached_figure('team_bar', DATA_VERSION, filters, metric_col, lambda: team_bar_figure(season_dfs[side], metric_col, metric_name), prefetch=True)
+            for side, (x_metric, y_metric, x_name, y_name), is_defensive in scatter_charts:
+                cached_figure('team_scatter', DATA_VERSION, filters, (x_metric, y_metric),
+                              lambda: team_scatter_figure(season_dfs[side], x_metric, y_metric, x_name, y_name, is_defensive), prefetch=True)
+        return task
+
+    prefetch_tasks = [(PRIORITY_ADJACENT_SEASON, prefetch_season(year)) for year in (selected_year - 1, selected_year + 1) if year in years]
+prefetcher.schedule(prefetch_scope, prefetch_tasks)
+show_prefetch_stats()
 
 st.divider()
 col3, col4, col5 = st.columns(3)
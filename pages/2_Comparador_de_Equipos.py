@@ -8,7 +8,11 @@ Created on Tue Wed 16 12:06:07 2025
 import streamlit as st
 import pandas as pd
 import os
-import plotly.graph_objects as go
+from utils.teams import TEAM_INFO, team_logo
+from utils.charts import cached_figure, data_version, radar_figure
+from utils.percentiles import PercentileMatrix, MAX_COMPARED, TEAM_RADAR_METRICS, PERCENTILE_SCOPES, radar_columns
+from utils.distributions import DistributionStore
+from utils.bootstrap import TEAM_BOOTSTRAP_METRICS, CONFIDENCE, available_metrics, bootstrap_metric, interval_table
 
 # --- Configuración de la Página ---
 st.set_page_config(
@@ -17,42 +21,6 @@ st.set_page_config(
     layout="wide"
 )
 
-# --- Diccionario de Información de Equipos (Nombres y Logos ESPN) ---
-TEAM_INFO = { 
-    'ARI': {'name': 'Arizona Cardinals', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/ari.png'},
-    'ATL': {'name': 'Atlanta Falcons', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/atl.png'},
-    'BAL': {'name': 'Baltimore Ravens', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/bal.png'},
-    'BUF': {'name': 'Buffalo Bills', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/buf.png'},
-    'CAR': {'name': 'Carolina Panthers', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/car.png'},
-    'CHI': {'name': 'Chicago Bears', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/chi.png'},
-    'CIN': {'name': 'Cincinnati Bengals', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/cin.png'},
-    'CLE': {'name': 'Cleveland Browns', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/cle.png'},
-    'DAL': {'name': 'Dallas Cowboys', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/dal.png'},
-    'DEN': {'name': 'Denver Broncos', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/den.png'},
-    'DET': {'name': 'Detroit Lions', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/det.png'},
-    'GB': {'name': 'Green Bay Packers', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/gb.png'},
-    'HOU': {'name': 'Houston Texans', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/hou.png'},
-    'IND': {'name': 'Indianapolis Colts', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/ind.png'},
-    'JAX': {'name': 'Jacksonville Jaguars', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/jax.png'},
-    'KC': {'name': 'Kansas City Chiefs', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/kc.png'},
-    'LV': {'name': 'Las Vegas Raiders', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/lv.png'},
-    'LAC': {'name': 'Los Angeles Chargers', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/lac.png'},
-    'LA': {'name': 'Los Angeles Rams', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/lar.png'},
-    'MIA': {'name': 'Miami Dolphins', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/mia.png'},
-    'MIN': {'name': 'Minnesota Vikings', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/min.png'},
-    'NE': {'name': 'New England Patriots', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/ne.png'},
-    'NO': {'name': 'New Orleans Saints', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/no.png'},
-    'NYG': {'name': 'New York Giants', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/nyg.png'},
-    'NYJ': {'name': 'New York Jets', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/nyj.png'},
-    'PHI': {'name': 'Philadelphia Eagles', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/phi.png'},
-    'PIT': {'name': 'Pittsburgh Steelers', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/pit.png'},
-    'SF': {'name': 'San Francisco 49ers', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/sf.png'},
-    'SEA': {'name': 'Seattle Seahawks', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/sea.png'},
-    'TB': {'name': 'Tampa Bay Buccaneers', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/tb.png'},
-    'TEN': {'name': 'Tennessee Titans', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/ten.png'},
-    'WAS': {'name': 'Washington Commanders', 'logo': 'https://a.espncdn.com/i/teamlogos/nfl/500/wsh.png'}
-}
-
 
 # --- Carga de Datos ---
 @st.cache_data
@@ -66,119 +34,125 @@ def load_data(file_path):
 
 offensive_df = load_data('offensive_team_stats_advanced_2020-2024.csv')
 defensive_df = load_data('defensive_team_stats_advanced_2020-2024.csv')
+DISTRIBUTIONS_FILE = 'play_distributions_2020-2024.csv' #Fichero opcional generado por Data_extraction.py
+DATA_VERSION = data_version('offensive_team_stats_advanced_2020-2024.csv', 'defensive_team_stats_advanced_2020-2024.csv') #Invalida las figuras guardadas si cambian los ficheros
+
+@st.cache_resource
+def load_distribution_store(file_path):
+    """Histogramas por jugada precalculados (None si no se han generado)."""
+    return DistributionStore(pd.read_csv(file_path)) if os.path.exists(file_path) else None
+
+@st.cache_data
+def load_full_stats():
+    """Estadísticas ofensivas y defensivas de todos los equipos y temporadas en una sola tabla."""
+    return pd.merge(offensive_df, defensive_df, on=['team', 'year', 'conference', 'division'])
+
+@st.cache_resource
+def load_percentile_matrix(version):
+    """Percentiles (equipo-temporada x métrica del radar) calculados una vez para todas las temporadas."""
+    return PercentileMatrix(load_full_stats(), ['team', 'year'], radar_columns(TEAM_RADAR_METRICS))
+
+@st.cache_data
+def load_bootstrap(year, metric_col):
+    """Réplicas bootstrap de una métrica para todos los equipos de una temporada (se calculan una vez por temporada)."""
+    season_df = offensive_df[offensive_df['year'] == year]
+    return bootstrap_metric(TEAM_BOOTSTRAP_METRICS[metric_col], season_df, 'team', load_distribution_store(DISTRIBUTIONS_FILE), year)
 
 # --- Título Principal ---
 st.title("⚔️ Comparador de Equipos")
-st.markdown("Selecciona dos equipos y una temporada para comparar su rendimiento en métricas clave.")
+st.markdown(f"Selecciona hasta {MAX_COMPARED} equipos (de la misma o de distintas temporadas) para comparar su rendimiento en métricas clave.")
 st.divider()
 
-# --- Filtros ---
-if offensive_df is not None and defensive_df is not None:
-    full_stats_df = pd.merge(offensive_df, defensive_df, on=['team', 'year', 'conference', 'division'])
-    
-    years = sorted(full_stats_df['year'].unique(), reverse=True)
-    team_names = {abbr: info['name'] for abbr, info in TEAM_INFO.items() if abbr in full_stats_df['team'].unique()}
-    
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        selected_year = st.selectbox("Selecciona una Temporada:", years)
-    with col2:
-        team_a_name = st.selectbox("Selecciona el Equipo A:", options=list(team_names.values()), index=list(team_names.keys()).index('KC') if 'KC' in team_names else 0) #Filtro de equipo A, KC valor por defecto
-        team_a = [abbr for abbr, name in team_names.items() if name == team_a_name][0]
-    with col3:
-        default_b_index = list(team_names.keys()).index('SF') if 'SF' in team_names and team_a != 'SF' else 1 #Filtro de equipo B, SF valor por defecto si no es el equipo A
-        team_b_name = st.selectbox("Selecciona el Equipo B:", options=list(team_names.values()), index=default_b_index)
-        team_b = [abbr for abbr, name in team_names.items() if name == team_b_name][0]
-
-    year_df = full_stats_df[full_stats_df['year'] == selected_year].copy()
-else:
+if offensive_df is None or defensive_df is None:
     st.warning("No se pudieron cargar los datos. Por favor, verifica la ruta de los ficheros CSV.")
     st.stop()
 
-# --- Lógica de Percentiles para el Gráfico de Radar ---
-if team_a == team_b:
-    st.warning("Por favor, selecciona dos equipos diferentes para comparar.")
+full_stats_df = load_full_stats()
+radar_metrics = TEAM_RADAR_METRICS
+table_metrics = {
+    'TDs Ofensivos Totales': 'offensive_tds',
+    'Yardas por Intento de Pase': 'yards_per_pass',
+    'Yardas por Intento de Carrera': 'yards_per_rush',
+    'Turnovers Forzados por la Defensa': 'turnovers_forced',
+    'Yardas por Pase Permitidas': 'yards_per_pass_allowed',
+    'Yardas por Carrera Permitidas': 'yards_per_rush_allowed'
+}
+adjusted_metrics = { #Métricas ajustadas por la calidad del rival (solo si las tablas las incluyen)
+    'EPA por Jugada': 'epa_per_play',
+    'Yardas por Jugada (Ajustadas por Rival)': 'adj_yards_per_play',
+    'EPA por Jugada (Ajustado por Rival)': 'adj_epa_per_play',
+    'EPA por Jugada Permitido': 'epa_per_play_allowed',
+    'Yardas por Jugada Permitidas (Ajustadas por Rival)': 'adj_yards_per_play_allowed',
+    'EPA por Jugada Permitido (Ajustado por Rival)': 'adj_epa_per_play_allowed'
+}
+table_metrics.update({name: col for name, col in adjusted_metrics.items() if col in full_stats_df.columns})
+
+# --- Filtros ---
+years = sorted(full_stats_df['year'].unique(), reverse=True)
+team_names = {abbr: info['name'] for abbr, info in TEAM_INFO.items() if abbr in full_stats_df['team'].unique()}
+team_seasons = list(full_stats_df.sort_values(['year', 'team'], ascending=[False, True])[['team', 'year']].itertuples(index=False, name=None))
+
+def season_label(entry):
+    """'Nombre del equipo (temporada)' para los selectores y las leyendas."""
+    team, year = entry
+    return f"{team_names.get(team, team)} ({year})"
+
+default_entries = [(team, years[0]) for team in ['KC', 'SF'] if (team, years[0]) in team_seasons]
+selected_entries = st.multiselect(f"Selecciona los Equipos y Temporadas (hasta {MAX_COMPARED}):", team_seasons, default=default_entries,
+                                  format_func=season_label, max_selections=MAX_COMPARED)
+
+if len(selected_entries) < 2:
+    st.warning("Por favor, selecciona al menos dos equipos (o temporadas) diferentes para comparar.")
 else:
-    radar_metrics = {
-        'TDs Ofensivos': ('offensive_tds', True),
-        'Yardas/Pase Netas': ('net_yards_per_pass', True),
-        'Yardas/Carrera': ('yards_per_rush', True),
-        'Turnovers Forzados': ('turnovers_forced', True),
-        'Yardas/Pase Permitidas': ('yards_per_pass_allowed', False), #2º parámetro para indicar en qué estadísticas un valor mayor es mejor
-        'Yardas/Carrera Permitidas': ('yards_per_rush_allowed', False)
-    }
-
-    for metric_name, (col_name, higher_is_better) in radar_metrics.items():
-        year_df[f'{col_name}_percentile'] = year_df[col_name].rank(pct=True) #Ranking por percentiles
-        if not higher_is_better:
-            year_df[f'{col_name}_percentile'] = 1 - year_df[f'{col_name}_percentile'] #Invertimos para las stats donde el valor menor es mejor
-        year_df[f'{col_name}_percentile'] *= 100
-
-    team_a_percentiles = year_df[year_df['team'] == team_a]
-    team_b_percentiles = year_df[year_df['team'] == team_b]
+    names = [season_label(entry) for entry in selected_entries]
 
     # --- Gráfico de Radar ---
-    st.subheader(f"Comparativa de Percentiles de Rendimiento: {team_a_name} vs. {team_b_name} ({selected_year})")
-    st.markdown("El gráfico muestra el percentil de cada equipo en la liga (un valor más alto siempre es mejor).")
-
-    fig = go.Figure()
-
-    fig.add_trace(go.Scatterpolar( #Radar equipo A
-        r=[team_a_percentiles[f'{col}_percentile'].iloc[0] for col, _ in radar_metrics.values()],
-        theta=list(radar_metrics.keys()),
-        fill='toself',
-        name=team_a_name,
-        hovertemplate='<b>%{theta}</b><br>Percentil: %{r:.1f}<extra></extra>'
-    ))
-
-    fig.add_trace(go.Scatterpolar( #Radar equipo B
-        r=[team_b_percentiles[f'{col}_percentile'].iloc[0] for col, _ in radar_metrics.values()],
-        theta=list(radar_metrics.keys()),
-        fill='toself',
-        name=team_b_name,
-        hovertemplate='<b>%{theta}</b><br>Percentil: %{r:.1f}<extra></extra>'
-    ))
-
-    fig.update_layout(
-        polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
-        showlegend=True,
-        height=500,
-        legend=dict(yanchor="top", y=1.15, xanchor="center", x=0.5)
-    )
+    st.subheader(f"Comparativa de Percentiles de Rendimiento: {' vs. '.join(names)}")
+    scope = st.radio("Percentiles:", list(PERCENTILE_SCOPES), horizontal=True, key='team_percentile_scope')
+    all_time = PERCENTILE_SCOPES[scope]
+    percentile_matrix = load_percentile_matrix(DATA_VERSION)
+    percentiles, _ = percentile_matrix.take(selected_entries, all_time=all_time) #Una sola extracción para todas las entidades
+    if all_time:
+        st.markdown("El gráfico muestra el percentil de cada equipo frente a todos los equipos de todas las temporadas, así que los percentiles de distintas temporadas son comparables (un valor más alto siempre es mejor).")
+    else:
+        st.markdown("El gráfico muestra el percentil de cada equipo en la liga de su temporada (un valor más alto siempre es mejor).")
+    fig = cached_figure('team_radar', DATA_VERSION, (tuple(selected_entries), all_time), 'percentiles',
+                        lambda: radar_figure(radar_metrics.keys(), dict(zip(names, percentiles)))) #Reutiliza el radar si ya se construyó
     st.plotly_chart(fig, use_container_width=True)
 
-    # --- Tablas Comparativas de Datos Brutos ---
+    # --- Tabla Comparativa de Datos Brutos ---
     st.markdown("---")
     st.subheader("Estadísticas Detalladas")
-
-    table_metrics = {
-        'TDs Ofensivos Totales': 'offensive_tds',
-        'Yardas por Intento de Pase': 'yards_per_pass',
-        'Yardas por Intento de Carrera': 'yards_per_rush',
-        'Turnovers Forzados por la Defensa': 'turnovers_forced',
-        'Yardas por Pase Permitidas': 'yards_per_pass_allowed',
-        'Yardas por Carrera Permitidas': 'yards_per_rush_allowed'
-    }
-
-    team_a_stats = year_df[year_df['team'] == team_a][list(table_metrics.values())].iloc[0]
-    team_b_stats = year_df[year_df['team'] == team_b][list(table_metrics.values())].iloc[0]
-
-    comparison_df = pd.DataFrame({
-        team_a_name: team_a_stats,
-        team_b_name: team_b_stats
-    })
-    comparison_df.index = list(table_metrics.keys())
-
-    col_a, col_b = st.columns(2)
-    with col_a:
-        st.image(TEAM_INFO[team_a]['logo'], width=100) #Nombre y logos en la tabla
-        st.markdown(f"##### {team_a_name}")
-        st.dataframe(comparison_df[[team_a_name]].style.format("{:.2f}"))
-    
-    with col_b:
-        st.image(TEAM_INFO[team_b]['logo'], width=100)
-        st.markdown(f"##### {team_b_name}")
-        st.dataframe(comparison_df[[team_b_name]].style.format("{:.2f}"))
+    logo_cols = st.columns(len(selected_entries))
+    for logo_col, (team, year), name in zip(logo_cols, selected_entries, names):
+        with logo_col:
+            logo = team_logo(team) #Logo local (Images/logos) o, si aún no se ha descargado, el de ESPN
+            if logo:
+                st.image(logo, width=60)
+            st.caption(name)
+    stats_rows = full_stats_df.set_index(['team', 'year']).loc[selected_entries, list(table_metrics.values())] #Selección indexada de todas las filas
+    comparison_df = pd.DataFrame(stats_rows.to_numpy().T, index=list(table_metrics.keys()), columns=names)
+    st.dataframe(comparison_df.style.format("{:.2f}"), use_container_width=True)
+
+    # --- Posición en la liga con incertidumbre ---
+    st.markdown("---")
+    st.subheader("🎯 Posición en la Liga con Intervalos de Confianza")
+    st.markdown(f"Valor, intervalo de confianza del {int(CONFIDENCE * 100)}% (bootstrap sobre las jugadas de cada equipo) y rango de posiciones que podría ocupar cada equipo entre los de su temporada.")
+    ci_metrics = {'% Pases Completados': 'cmp_percentage', 'Yardas por Intento de Pase': 'yards_per_pass', 'EPA por Jugada': 'epa_per_play'}
+    ci_metrics = {name: col for name, col in ci_metrics.items() if col in available_metrics(TEAM_BOOTSTRAP_METRICS, load_distribution_store(DISTRIBUTIONS_FILE))}
+
+    def format_interval(ci_df, team):
+        """Texto 'valor [IC] · posición (rango de posiciones)' de un equipo."""
+        if team not in ci_df.index:
+            return '-'
+        row = ci_df.loc[team]
+        return f"{row['value']:.2f} [{row['ci_low']:.2f}, {row['ci_high']:.2f}] · {int(row['rank'])}º ({int(row['rank_low'])}º-{int(row['rank_high'])}º)"
+
+    ci_rows = {}
+    for metric_name, metric_col in ci_metrics.items():
+        ci_tables = {year: interval_table(*load_bootstrap(year, metric_col)).set_index('entity') for year in {year for _, year in selected_entries}} #Clasificación entre los equipos de cada temporada
+        ci_rows[metric_name] = {name: format_interval(ci_tables[year], team) for (team, year), name in zip(selected_entries, names)}
+    st.dataframe(pd.DataFrame(ci_rows).T, use_container_width=True)
 
 st.divider()
 col3, col4, col5 = st.columns(3)
@@ -8,7 +8,13 @@ Created on Tue Mon 21 17:42:11 2025
 import streamlit as st
 import pandas as pd
 import os
-import plotly.express as px
+from utils.players import POSITION_GROUPS, DEFENSIVE_POSITIONS
+from utils.ranges import RangeAggregator, PLAYER_RATES, PLAYER_WEIGHTED, numeric_sum_columns
+from utils.export import export_button
+from utils.charts import cached_figure, data_version
+from utils.prefetch import PRIORITY_ADJACENT_SEASON, PRIORITY_OTHER_POSITION, PRIORITY_DEFAULT_THRESHOLD, get_prefetcher, session_scope, show_prefetch_stats
+from utils.distributions import DistributionStore
+from utils.bootstrap import PLAYER_BOOTSTRAP_METRICS, CONFIDENCE, available_metrics, bootstrap_metric, interval_table
 
 # --- Configuración de la Página ---
 st.set_page_config(
@@ -28,6 +34,12 @@ def load_data(file_path):
 
 player_df_raw = load_data('detailed_player_stats_advanced_2020-2024.csv')
 team_info_df = load_data('offensive_team_stats_advanced_2020-2024.csv')
+DEFENSIVE_PLAYERS_FILE = 'defensive_player_stats_advanced_2020-2024.csv' #Fichero opcional generado por Data_extraction.py
+defensive_player_df_raw = load_data(DEFENSIVE_PLAYERS_FILE) if os.path.exists(DEFENSIVE_PLAYERS_FILE) else None
+DISTRIBUTIONS_FILE = 'play_distributions_2020-2024.csv' #Fichero opcional generado por Data_extraction.py
+CAREERS_FILE = 'player_career_stats_2020-2024.csv' #Fichero opcional generado por Data_extraction.py
+career_df_raw = load_data(CAREERS_FILE) if os.path.exists(CAREERS_FILE) else None
+DATA_VERSION = data_version('detailed_player_stats_advanced_2020-2024.csv', 'offensive_team_stats_advanced_2020-2024.csv', DEFENSIVE_PLAYERS_FILE, DISTRIBUTIONS_FILE, CAREERS_FILE) #Invalida las figuras guardadas si cambian los ficheros
 
 # --- Título Principal ---
 st.title("🏃 Análisis de Jugadores Ofensivos")
@@ -38,32 +50,98 @@ st.divider()
 if player_df_raw is not None and team_info_df is not None:
     team_info_subset = team_info_df[['team', 'year', 'conference', 'division']].drop_duplicates()
     player_df = pd.merge(player_df_raw, team_info_subset, on=['team', 'year'], how='left')
+    if defensive_player_df_raw is not None:
+        defensive_player_df = pd.merge(defensive_player_df_raw, team_info_subset, on=['team', 'year'], how='left')
+    if career_df_raw is not None: #Conferencia y división del equipo de la última temporada
+        career_df = pd.merge(career_df_raw, team_info_subset.rename(columns={'year': 'last_year'}), on=['team', 'last_year'], how='left')
 else:
     st.warning("No se pudieron cargar los datos.")
     st.stop()
 
+@st.cache_resource
+def load_range_aggregator(table_name, _df):
+    """Sumas acumuladas por jugador y año para consultar cualquier rango de temporadas sin recorrer filas."""
+    rate_formulas, weighted_columns = (PLAYER_RATES, PLAYER_WEIGHTED) if table_name == 'players' else ({}, {}) #La tabla defensiva solo tiene columnas sumables
+    exclude = list(rate_formulas) + list(weighted_columns)
+    return RangeAggregator(_df, 'player_id', numeric_sum_columns(_df, exclude), rate_formulas, weighted_columns,
+                           attribute_columns=['player_name', 'position', 'team', 'conference', 'division'])
+
+@st.cache_resource
+def load_distribution_store(file_path):
+    """Histogramas por jugada precalculados (None si no se han generado)."""
+    return DistributionStore(pd.read_csv(file_path)) if os.path.exists(file_path) else None
+
+@st.cache_data
+def load_bootstrap(year, position, metric_col):
+    """Réplicas bootstrap de una métrica para todos los jugadores de una posición y temporada (una vez por temporada)."""
+    season_df = player_df_raw[(player_df_raw['year'] == year) & player_df_raw['position'].isin(POSITION_GROUPS[position])]
+    return bootstrap_metric(PLAYER_BOOTSTRAP_METRICS[position][metric_col], season_df, 'player_id', load_distribution_store(DISTRIBUTIONS_FILE), year)
+
+DEFAULT_MIN = {'QB': 100, 'RB': 50, 'Receptor': 50, 'Defensa': 20} #Mínimo de participación por defecto de cada posición
+PARTICIPATION_COLUMN = {'QB': 'attempts', 'RB': 'carries', 'Receptor': 'targets', 'Defensa': 'total_tackles'}
+DEFAULT_CHART_METRICS = { #Gráficos que muestra cada posición al entrar en ella (primera métrica de cada desplegable)
+    'QB': [('passing_yards', 'Yardas de Pase', False), ('rushing_yards', 'Yardas de Carrera', False)],
+    'RB': [('rushing_yards', 'Yardas de Carrera', False)],
+    'Receptor': [('receiving_yards', 'Yardas de Recepción', False)],
+    'Defensa': [('total_tackles', 'Placajes Totales', True)]
+}
+
+def filter_position(df, position, min_attempts):
+    """Jugadores de la posición con la participación mínima."""
+    df = df[df['position'].isin(DEFENSIVE_POSITIONS if position == 'Defensa' else POSITION_GROUPS[position])]
+    return df[df[PARTICIPATION_COLUMN[position]] >= min_attempts]
+
+def filter_view(df, conference, division):
+    """Jugadores de equipos de la conferencia y división seleccionadas."""
+    if conference != 'Ambas':
+        df = df[df['conference'] == conference]
+        if division != 'Todas':
+            df = df[df['division'] == division]
+    return df
+
+def season_players(year, position, min_attempts, conference, division):
+    """Jugadores de una temporada con todos los filtros de la página aplicados."""
+    season_df = defensive_player_df if position == 'Defensa' else player_df
+    return filter_view(filter_position(season_df[season_df['year'] == year], position, min_attempts), conference, division)
+
+prefetcher = get_prefetcher()
+prefetch_scope = session_scope('player_analysis')
+prefetcher.foreground(prefetch_scope) #Cancela la precarga pendiente de esta sesión y le da prioridad a esta ejecución
+
 # --- Barra Lateral de Filtros ---
 st.sidebar.header("Filtros de Jugadores")
 
-selected_year = st.sidebar.selectbox(
-    'Selecciona una Temporada',
-    options=sorted(player_df['year'].unique(), reverse=True)
-)
+years = sorted(player_df['year'].unique())
+career_view = career_df_raw is not None and st.sidebar.radio('Granularidad', ['Temporada', 'Carrera'], horizontal=True) == 'Carrera' #Tabla de carreras precalculada
+use_year_range = not career_view and st.sidebar.checkbox('Ver un rango de temporadas') #Totales y ratios de varias temporadas
+if career_view:
+    selected_year = 'Carrera'
+    st.sidebar.caption(f"Totales de toda la carrera ({years[0]}-{years[-1]}); el mínimo de participación se aplica a los totales.")
+elif use_year_range:
+    start_year, end_year = st.sidebar.select_slider('Selecciona el Rango de Temporadas', options=years, value=(years[0], years[-1]))
+    selected_year = f"{start_year}-{end_year}" if start_year != end_year else start_year
+else:
+    selected_year = st.sidebar.selectbox(
+        'Selecciona una Temporada',
+        options=years[::-1]
+    )
 
 selected_position = st.sidebar.selectbox(
     'Selecciona una Posición',
-    options=['QB', 'RB', 'Receptor']
+    options=['QB', 'RB', 'Receptor'] + (['Defensa'] if defensive_player_df_raw is not None and not career_view else []) #Defensa solo si existe el fichero (y por temporada)
 )
 
 # --- Slider para Mínimo de Participación ---
 st.sidebar.markdown("---")
 st.sidebar.subheader("Filtro de Participación Mínima")
 if selected_position == 'QB':
-    min_attempts = st.sidebar.slider("Mínimo de Intentos de Pase:", 0, 600, 100)
+    min_attempts = st.sidebar.slider("Mínimo de Intentos de Pase:", 0, 600, DEFAULT_MIN['QB'])
 elif selected_position == 'RB':
-    min_attempts = st.sidebar.slider("Mínimo de Intentos de Carrera:", 0, 400, 50)
+    min_attempts = st.sidebar.slider("Mínimo de Intentos de Carrera:", 0, 400, DEFAULT_MIN['RB'])
+elif selected_position == 'Defensa':
+    min_attempts = st.sidebar.slider("Mínimo de Placajes Totales:", 0, 150, DEFAULT_MIN['Defensa'])
 else: # Receptor
-    min_attempts = st.sidebar.slider("Mínimo de Targets:", 0, 200, 50)
+    min_attempts = st.sidebar.slider("Mínimo de Targets:", 0, 200, DEFAULT_MIN['Receptor'])
 st.sidebar.markdown("---")
 
 
@@ -84,26 +162,14 @@ selected_division = st.sidebar.selectbox(
 )
 
 # --- Filtrado de Datos ---
-filtered_players = player_df[player_df['year'] == selected_year]
-
-if selected_position == 'Receptor':
-    filtered_players = filtered_players[filtered_players['position'].isin(['WR', 'TE'])]
-    # Aplicar filtro de participación
-    filtered_players = filtered_players[filtered_players['targets'] >= min_attempts]
-elif selected_position == 'QB':
-    filtered_players = filtered_players[filtered_players['position'] == 'QB']
-    # Aplicar filtro de participación
-    filtered_players = filtered_players[filtered_players['attempts'] >= min_attempts]
-else: # RB
-    filtered_players = filtered_players[filtered_players['position'] == 'RB']
-    # Aplicar filtro de participación
-    filtered_players = filtered_players[filtered_players['carries'] >= min_attempts]
-
-
-if selected_conference != 'Ambas':
-    filtered_players = filtered_players[filtered_players['conference'] == selected_conference]
-    if selected_division != 'Todas':
-        filtered_players = filtered_players[filtered_players['division'] == selected_division]
+if career_view:
+    filtered_players = career_df
+elif use_year_range:
+    filtered_players = load_range_aggregator('defensive_players' if selected_position == 'Defensa' else 'players', defensive_player_df if selected_position == 'Defensa' else player_df).query(start_year, end_year)
+else:
+    filtered_players = (defensive_player_df if selected_position == 'Defensa' else player_df)
+    filtered_players = filtered_players[filtered_players['year'] == selected_year]
+filtered_players = filter_view(filter_position(filtered_players, selected_position, min_attempts), selected_conference, selected_division)
 
 # --- Función para crear gráficos ---
 LOWER_IS_BETTER_PLAYER_METRICS = [
@@ -112,13 +178,14 @@ LOWER_IS_BETTER_PLAYER_METRICS = [
     'receiving_fumbles', 'receiving_fumbles_lost'
 ]
 
-def create_player_barchart(df, metric_col, metric_name): #grafico de barras, top 20, análoga a la de equipos
-    st.markdown(f"**Top 20 Jugadores por {metric_name}**")
-    chart_df = df[df[metric_col].notna() & (df[metric_col] != 0)].copy()
-    if chart_df.empty:
-        st.warning("No hay jugadores que cumplan los filtros seleccionados.")
-        return
-    lower_is_better = any(keyword in metric_col for keyword in LOWER_IS_BETTER_PLAYER_METRICS)
+def chart_players(df, metric_col):
+    """Jugadores con valor (no nulo ni cero) en la métrica."""
+    return df[df[metric_col].notna() & (df[metric_col] != 0)]
+
+def player_bar_figure(chart_df, metric_col, metric_name, is_defensive=False):
+    """Top 20 en un gráfico de barras (sin llamadas a Streamlit: también se usa en la precarga)."""
+    import plotly.express as px #Importación diferida (arranque más rápido)
+    lower_is_better = not is_defensive and any(keyword in metric_col for keyword in LOWER_IS_BETTER_PLAYER_METRICS) #En defensa sacks e intercepciones suman
     min_val, max_val = chart_df[metric_col].min(), chart_df[metric_col].max() 
     top_20 = chart_df.sort_values(by=metric_col, ascending=lower_is_better).head(20) #solo top 20
     top_20_for_plot = top_20.sort_values(by=metric_col, ascending=not lower_is_better) #ajuste para estadísticas invertidas
@@ -126,8 +193,28 @@ def create_player_barchart(df, metric_col, metric_name): #grafico de barras, top
     fig = px.bar(top_20_for_plot, x=metric_col, y='player_name', orientation='h', color=metric_col, color_continuous_scale=color_scale, range_color=[min_val, max_val], text_auto='.2s', labels={'player_name': 'Jugador', metric_col: metric_name}, hover_name='player_name', hover_data={'team': True, metric_col: ':.2f'}) #Escala de color en base a valores totales, no filtrados
     fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', xaxis=(dict(showgrid=False)), coloraxis_showscale=False, height=600)
     fig.update_traces(textposition='outside', marker_line_color='rgb(8,48,107)', marker_line_width=1.5)
+    return fig
+
+rendered_charts = [] #Gráficos de la vista actual, para precargarlos en las vistas contiguas
+
+def create_player_barchart(df, metric_col, metric_name, is_defensive=False, filters=()): #grafico de barras, top 20, análoga a la de equipos
+    st.markdown(f"**Top 20 Jugadores por {metric_name}**")
+    rendered_charts.append((metric_col, metric_name, is_defensive))
+    chart_df = chart_players(df, metric_col)
+    if chart_df.empty:
+        st.warning("No hay jugadores que cumplan los filtros seleccionados.")
+        return
+    fig = cached_figure('player_bar', DATA_VERSION, filters, metric_col, lambda: player_bar_figure(chart_df, metric_col, metric_name, is_defensive)) #Reutiliza la figura si ya se construyó con los mismos filtros
     st.plotly_chart(fig, use_container_width=True)
 
+view_filters = (selected_year, selected_position, min_attempts, selected_conference, selected_division) #Clave de la vista para reutilizar figuras
+
+# --- Exportación de la vista filtrada ---
+with st.sidebar:
+    st.markdown("---")
+    st.subheader("Exportar Vista")
+    export_button(filtered_players, f"jugadores_{selected_position.lower()}_{selected_year}", 'player_export')
+
 # --- Lógica de Visualización por Posición ---
 if selected_position == 'QB':
     st.header(f"Análisis de Quarterbacks (QB) - {selected_year}")
@@ -137,22 +224,87 @@ if selected_position == 'QB':
     with col1:
         st.subheader("Estadísticas de Pase")
         selected_qb_pass_name = st.selectbox("Selecciona una métrica de pase:", options=list(qb_pass_metrics.keys()), key='qb_pass')
-        create_player_barchart(filtered_players, qb_pass_metrics[selected_qb_pass_name], selected_qb_pass_name)
+        create_player_barchart(filtered_players, qb_pass_metrics[selected_qb_pass_name], selected_qb_pass_name, filters=view_filters)
     with col2:
         st.subheader("Estadísticas de Carrera")
         selected_qb_rush_name = st.selectbox("Selecciona una métrica de carrera:", options=list(qb_rush_metrics.keys()), key='qb_rush')
-        create_player_barchart(filtered_players, qb_rush_metrics[selected_qb_rush_name], selected_qb_rush_name)
+        create_player_barchart(filtered_players, qb_rush_metrics[selected_qb_rush_name], selected_qb_rush_name, filters=view_filters)
 elif selected_position == 'RB':
     st.header(f"Análisis de Running Backs (RB) - {selected_year}")
     rb_metrics = {'Yardas de Carrera': 'rushing_yards', 'TDs de Carrera': 'rushing_tds', 'EPA de Carrera': 'rushing_epa', 'Intentos de Carrera': 'carries', 'Fumbles': 'rushing_fumbles', 'Fumbles Perdidos': 'rushing_fumbles_lost', 'Primeros Downs de Carrera': 'rushing_first_downs', 'Conversiones de 2pts': 'rushing_2pt_conversions'}
     selected_rb_metric_name = st.selectbox("Selecciona una métrica de carrera:", options=list(rb_metrics.keys()), key='rb_metric')
-    create_player_barchart(filtered_players, rb_metrics[selected_rb_metric_name], selected_rb_metric_name)
+    create_player_barchart(filtered_players, rb_metrics[selected_rb_metric_name], selected_rb_metric_name, filters=view_filters)
 elif selected_position == 'Receptor':
     st.header(f"Análisis de Receptores (WR/TE) - {selected_year}")
     rec_metrics = {'Yardas de Recepción': 'receiving_yards', 'TDs de Recepción': 'receiving_tds', 'EPA de Recepción': 'receiving_epa', 'Recepciones': 'receptions', 'Targets': 'targets', 'Yardas Aéreas': 'receiving_air_yards', 'Yardas tras Recepción': 'receiving_yards_after_catch', 'Fumbles': 'receiving_fumbles', 'Fumbles Perdidos': 'receiving_fumbles_lost', 'Primeros Downs de Recepción': 'receiving_first_downs', 'Conversiones de 2pts': 'receiving_2pt_conversions', 'RACR': 'racr', 'Cuota de Targets': 'target_share', 'Cuota de Yardas Aéreas': 'air_yards_share'}
     selected_rec_metric_name = st.selectbox("Selecciona una métrica de recepción:", options=list(rec_metrics.keys()), key='rec_metric')
-    create_player_barchart(filtered_players, rec_metrics[selected_rec_metric_name], selected_rec_metric_name)
+    create_player_barchart(filtered_players, rec_metrics[selected_rec_metric_name], selected_rec_metric_name, filters=view_filters)
+elif selected_position == 'Defensa':
+    st.header(f"Análisis de Jugadores Defensivos - {selected_year}")
+    def_metrics = {'Placajes Totales': 'total_tackles', 'Placajes en Solitario': 'solo_tackles', 'Placajes Asistidos': 'assisted_tackles', 'Sacks': 'sacks', 'QB Hits': 'qb_hits', 'Intercepciones': 'interceptions', 'Pases Defendidos': 'passes_defended', 'Fumbles Forzados': 'forced_fumbles'}
+    selected_def_metric_name = st.selectbox("Selecciona una métrica defensiva:", options=list(def_metrics.keys()), key='def_metric')
+    create_player_barchart(filtered_players, def_metrics[selected_def_metric_name], selected_def_metric_name, is_defensive=True, filters=view_filters)
+
+# --- Intervalos de confianza de los rankings ---
+CI_METRIC_NAMES = {'cmp_percentage': '% Pases Completados', 'yards_per_attempt': 'Yardas por Intento', 'yards_per_carry': 'Yardas por Carrera',
+                   'catch_rate': '% de Recepción', 'yards_per_target': 'Yardas por Target', 'epa_per_play': 'EPA por Jugada'}
+
+if selected_position in PLAYER_BOOTSTRAP_METRICS:
+    with st.expander("🎯 Incertidumbre de los Rankings"):
+        st.markdown(f"Intervalos de confianza del {int(CONFIDENCE * 100)}% obtenidos remuestreando las jugadas de cada jugador (bootstrap). Con pocos intentos el intervalo y el rango de posiciones posibles se amplían.")
+        position_metrics = available_metrics(PLAYER_BOOTSTRAP_METRICS[selected_position], load_distribution_store(DISTRIBUTIONS_FILE))
+        ci_metrics = {CI_METRIC_NAMES[col]: col for col in position_metrics}
+        if use_year_range or career_view:
+            st.info("Los intervalos se calculan por temporada. Selecciona una única temporada para verlos.")
+        elif not ci_metrics:
+            st.info("Las métricas por jugada de esta posición requieren el fichero de distribuciones de jugadas generado por Data_extraction.py.")
+        else:
+            selected_ci_name = st.selectbox("Selecciona una métrica:", options=list(ci_metrics.keys()), key='ci_metric')
+            entities, point, draws = load_bootstrap(selected_year, selected_position, ci_metrics[selected_ci_name])
+            in_view = pd.Series(entities).isin(filtered_players['player_id']).to_numpy() #Clasificación entre los jugadores filtrados
+            ci_df = interval_table(entities[in_view], point[in_view], draws[:, in_view])
+            ci_df = ci_df.merge(filtered_players[['player_id', 'player_name', 'team']], left_on='entity', right_on='player_id', how='left')
+
+            def build_ci_figure():
+                import plotly.express as px
+                chart_data = ci_df.head(20).sort_values('value') #Top 20, como los gráficos de barras
+                fig = px.scatter(chart_data, x='value', y='player_name', error_x=chart_data['ci_high'] - chart_data['value'], error_x_minus=chart_data['value'] - chart_data['ci_low'],
+                                 labels={'value': selected_ci_name, 'player_name': 'Jugador'}, hover_data={'team': True, 'rank_low': True, 'rank_high': True})
+                fig.update_traces(marker=dict(size=9, color='#013369'), error_x=dict(color='gray', thickness=1.5))
+                fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', xaxis=dict(showgrid=True, gridcolor='lightgrey'), height=600)
+                return fig
+
+            col_ci_chart, col_ci_table = st.columns([3, 2], gap="large")
+            with col_ci_chart:
+                st.plotly_chart(cached_figure('player_ci', DATA_VERSION, view_filters, ci_metrics[selected_ci_name], build_ci_figure), use_container_width=True)
+            with col_ci_table:
+                ci_display = ci_df.assign(rank_range=ci_df['rank_low'].astype(str) + ' - ' + ci_df['rank_high'].astype(str))
+                st.dataframe(ci_display[['rank', 'player_name', 'team', 'value', 'ci_low', 'ci_high', 'rank_range']].style.format({'value': "{:.2f}", 'ci_low': "{:.2f}", 'ci_high': "{:.2f}"})
+                             .relabel_index(['Posición', 'Jugador', 'Equipo', 'Valor', 'IC Inferior', 'IC Superior', 'Rango de Posiciones'], axis=1), hide_index=True, height=600)
+                export_button(ci_df.drop(columns='entity'), f"intervalos_{selected_position}_{ci_metrics[selected_ci_name]}_{selected_year}", 'player_ci_export')
+
+# --- Precarga de las vistas contiguas ---
+def prefetch_view(year, position, min_attempts, charts, conference=selected_conference, division=selected_division):
+    """Tarea de precarga: los gráficos de barras de otra vista por temporada."""
+    def task():
+        view_df = season_players(year, position, min_attempts, conference, division)
+        for metric_col, metric_name, is_defensive in charts:
+            chart_df = chart_players(view_df, metric_col)
+            if not chart_df.empty:
+                cached_figure('player_bar', DATA_VERSION, (year, position, min_attempts, conference, division), metric_col,
+                              lambda: player_bar_figure(chart_df, metric_col, metric_name, is_defensive), prefetch=True)
+    return task
 
+prefetch_tasks = []
+if not use_year_range and not career_view:
+    prefetch_tasks += [(PRIORITY_ADJACENT_SEASON, prefetch_view(year, selected_position, min_attempts, rendered_charts))
+                       for year in (selected_year - 1, selected_year + 1) if year in years]
+    other_positions = [position for position in DEFAULT_CHART_METRICS if position != selected_position and (position != 'Defensa' or defensive_player_df_raw is not None)]
+    prefetch_tasks += [(PRIORITY_OTHER_POSITION, prefetch_view(selected_year, position, DEFAULT_MIN[position], DEFAULT_CHART_METRICS[position])) for position in other_positions]
+    if min_attempts != DEFAULT_MIN[selected_position]:
+        prefetch_tasks.append((PRIORITY_DEFAULT_THRESHOLD, prefetch_view(selected_year, selected_position, DEFAULT_MIN[selected_position], rendered_charts)))
+prefetcher.schedule(prefetch_scope, prefetch_tasks)
+show_prefetch_stats()
 
 st.divider()
 col3, col4, col5 = st.columns(3)
@@ -8,7 +8,13 @@ Created on Aug Wed 6 19:12:24 2025
 import streamlit as st
 import pandas as pd
 import os
-import plotly.graph_objects as go
+from utils.players import POSITION_GROUPS
+from utils.search import PlayerSearchIndex, split_search_results, format_entry
+from utils.charts import cached_figure, data_version, radar_figure
+from utils.percentiles import PercentileMatrix, MAX_COMPARED, PLAYER_RADAR_METRICS, PERCENTILE_SCOPES, radar_columns
+from utils.distributions import DistributionStore
+from utils.models import add_derived_features
+from utils.bootstrap import PLAYER_BOOTSTRAP_METRICS, CONFIDENCE, available_metrics, bootstrap_metric, interval_table
 
 # --- Configuración de la Página ---
 st.set_page_config(
@@ -27,10 +33,30 @@ def load_data(file_path):
         return None
 
 player_df_raw = load_data('detailed_player_stats_advanced_2020-2024.csv')
+DATA_VERSION = data_version('detailed_player_stats_advanced_2020-2024.csv', 'player_career_stats_2020-2024.csv') #Invalida las figuras guardadas si cambian los ficheros
+DISTRIBUTIONS_FILE = 'play_distributions_2020-2024.csv' #Fichero opcional generado por Data_extraction.py
+CAREERS_FILE = 'player_career_stats_2020-2024.csv' #Fichero opcional generado por Data_extraction.py
+career_df_raw = load_data(CAREERS_FILE) if os.path.exists(CAREERS_FILE) else None
+
+@st.cache_resource
+def load_search_index(file_path):
+    """Índice de búsqueda de jugadores sobre todas las temporadas (se construye una sola vez)."""
+    return PlayerSearchIndex(load_data(file_path))
+
+@st.cache_resource
+def load_distribution_store(file_path):
+    """Histogramas por jugada precalculados (None si no se han generado)."""
+    return DistributionStore(pd.read_csv(file_path)) if os.path.exists(file_path) else None
+
+@st.cache_data
+def load_bootstrap(year, position, metric_col):
+    """Réplicas bootstrap de una métrica para todos los jugadores de una posición y temporada (una vez por temporada)."""
+    season_df = player_df_raw[(player_df_raw['year'] == year) & player_df_raw['position'].isin(POSITION_GROUPS[position])]
+    return bootstrap_metric(PLAYER_BOOTSTRAP_METRICS[position][metric_col], season_df, 'player_id', load_distribution_store(DISTRIBUTIONS_FILE), year)
 
 # --- Título Principal ---
 st.title("⚔️ Comparador de Jugadores Ofensivos")
-st.markdown("Selecciona una posición, dos jugadores y una temporada para comparar su rendimiento.")
+st.markdown(f"Selecciona una posición y hasta {MAX_COMPARED} jugadores (también distintas temporadas de un mismo jugador) para comparar su rendimiento.")
 st.divider()
 
 # --- Pre-procesamiento de Datos ---
@@ -45,16 +71,34 @@ if player_df_raw is not None:
     player_df['total_tds'] = player_df['passing_tds'] + player_df['rushing_tds']
     player_df['total_first_downs'] = player_df['passing_first_downs'] + player_df['rushing_first_downs']
     player_df['total_turnovers'] = player_df['interceptions'] + player_df['rushing_fumbles_lost'] + player_df['sack_fumbles_lost']
+    if career_df_raw is not None: #Mismas métricas combinadas sobre los totales de carrera
+        career_df = add_derived_features(career_df_raw.copy()).fillna(0)
 else:
     st.warning("No se pudieron cargar los datos.")
     st.stop()
 
+PARTICIPATION_COLUMNS = {'QB': 'attempts', 'RB': 'carries', 'Receptor': 'targets'}
+
+def position_pool(position, min_attempts, career=False):
+    """Jugador-temporadas (o carreras) de una posición con la participación mínima (grupo de comparación de los percentiles)."""
+    df = career_df if career else player_df
+    pool = df[df['position'].isin(POSITION_GROUPS[position]) & (df[PARTICIPATION_COLUMNS[position]] >= min_attempts)]
+    return pool.set_index(['player_id'] if career else ['player_id', 'year'], drop=False) #Selección por identificador (y temporada), no por nombre
+
+@st.cache_resource
+def load_percentile_matrix(position, min_attempts, version, career=False):
+    """Percentiles (jugador-temporada o carrera x métrica del radar) del grupo de comparación, calculados una vez por grupo."""
+    key_columns = ['player_id'] if career else ['player_id', 'year']
+    return PercentileMatrix(position_pool(position, min_attempts, career), key_columns, radar_columns(PLAYER_RADAR_METRICS[position]), group_column=None if career else 'year')
+
 # --- Filtros Principales ---
+career_view = career_df_raw is not None and st.radio("Granularidad:", ['Temporada', 'Carrera'], horizontal=True) == 'Carrera' #Tabla de carreras precalculada
 col1, col2 = st.columns(2)
 with col1:
-    selected_year = st.selectbox("Selecciona una Temporada:", sorted(player_df['year'].unique(), reverse=True))
-with col2:
     selected_position = st.selectbox("Selecciona una Posición:", ['QB', 'RB', 'Receptor'])
+with col2:
+    years = sorted(player_df['year'].unique(), reverse=True)
+    year_filter = 'Todas' if career_view else st.selectbox("Buscar en la Temporada:", years + ['Todas'])
 
 # --- Slider para Mínimo de Participación ---
 st.sidebar.header("Filtro de Participación Mínima")
@@ -64,82 +108,93 @@ elif selected_position == 'RB':
     min_attempts = st.sidebar.slider("Mínimo de Intentos de Carrera:", 0, 400, 50, key="comp_rb")
 else: # Receptor
     min_attempts = st.sidebar.slider("Mínimo de Targets:", 0, 200, 50, key="comp_rec")
+if career_view:
+    st.sidebar.caption("En la vista de carrera el mínimo se aplica a los totales de toda la carrera.")
 
-# Filtrar dataframe por año, posición y participación
-year_position_df = player_df[player_df['year'] == selected_year]
-if selected_position == 'Receptor':
-    year_position_df = year_position_df[year_position_df['position'].isin(['WR', 'TE'])]
-    year_position_df = year_position_df[year_position_df['targets'] >= min_attempts]
-elif selected_position == 'QB':
-    year_position_df = year_position_df[year_position_df['position'] == 'QB']
-    year_position_df = year_position_df[year_position_df['attempts'] >= min_attempts]
-else: # RB
-    year_position_df = year_position_df[year_position_df['position'] == 'RB']
-    year_position_df = year_position_df[year_position_df['carries'] >= min_attempts]
+pool_df = position_pool(selected_position, min_attempts, career_view)
 
 # --- Filtros de Jugadores ---
 st.markdown("---")
-if year_position_df.empty:
+if pool_df.empty:
     st.warning("No hay jugadores que cumplan el criterio de participación mínima. Por favor, ajusta el filtro en la barra lateral.")
     st.stop()
 
-col_a1, col_a2, col_b1, col_b2 = st.columns(4)
-with col_a1:
-    team_a_options = ['Todos'] + sorted(year_position_df['team'].dropna().unique())
-    team_a_filter = st.selectbox("Filtrar Equipo A:", team_a_options, key='team_a')
-with col_a2:
-    players_a = year_position_df[year_position_df['team'] == team_a_filter] if team_a_filter != 'Todos' else year_position_df
-    player_a_name = st.selectbox("Selecciona Jugador A:", sorted(players_a['player_name'].unique()))
-with col_b1:
-    team_b_options = ['Todos'] + sorted(year_position_df['team'].dropna().unique())
-    team_b_filter = st.selectbox("Filtrar Equipo B:", team_b_options, key='team_b')
-with col_b2:
-    players_b = year_position_df[year_position_df['team'] == team_b_filter] if team_b_filter != 'Todos' else year_position_df
-    player_b_name = st.selectbox("Selecciona Jugador B:", sorted(players_b['player_name'].unique()), index=1 if len(players_b) > 1 else 0)
+search_index = load_search_index('detailed_player_stats_advanced_2020-2024.csv')
+search_pool = pool_df if year_filter == 'Todas' else pool_df[pool_df['year'] == year_filter]
+query = st.text_input("Buscar Jugador:", placeholder="Escribe parte del nombre...")
+found_players, elsewhere = split_search_results(search_index, query, set(search_pool['player_id']), POSITION_GROUPS[selected_position])
+if elsewhere:
+    st.caption("En otras temporadas o por debajo del mínimo: " + ", ".join(format_entry(entry) for entry in elsewhere[:3]))
+if career_view:
+    labels = dict(zip(pool_df.index, pool_df['player_name'] + ' (' + pool_df['team'].fillna('-') + ', ' + pool_df['first_year'].astype(str) + '-' + pool_df['last_year'].astype(str) + ')'))
+    found_entries = [entry[0] for entry in found_players] #Una opción por carrera
+    session_key = 'compare_careers'
+else:
+    labels = dict(zip(pool_df.index, pool_df['player_name'] + ' (' + pool_df['team'].fillna('-') + ', ' + pool_df['year'].astype(str) + ')'))
+    seasons_by_player = search_pool['year'].groupby(search_pool['player_id'].to_numpy(), sort=False).agg(lambda x: sorted(x, reverse=True))
+    found_entries = [(entry[0], int(year)) for entry in found_players for year in seasons_by_player.get(entry[0], [])] #Una opción por temporada del jugador
+    session_key = 'compare_players'
+
+# Los ya seleccionados se mantienen aunque no aparezcan en la búsqueda actual
+if session_key not in st.session_state:
+    st.session_state[session_key] = found_entries[:2]
+selected_entries = [entry for entry in st.session_state[session_key] if entry in labels]
+options = list(dict.fromkeys(selected_entries + found_entries))
+st.session_state[session_key] = selected_entries
+selection_label = f"Selecciona los Jugadores (hasta {MAX_COMPARED}):" if career_view else f"Selecciona los Jugadores y Temporadas (hasta {MAX_COMPARED}):"
+selected_entries = st.multiselect(selection_label, options, format_func=labels.get, max_selections=MAX_COMPARED, key=session_key)
 
 # --- Lógica de Comparación ---
-if player_a_name == player_b_name:
-    st.warning("Por favor, selecciona dos jugadores diferentes para comparar.")
+if len(selected_entries) < 2:
+    st.warning("Por favor, selecciona al menos dos jugadores (o temporadas) diferentes para comparar.")
 else:
-    radar_metrics = {} #Gráfico de radar, distintas estadísticas dependiendo de la posición, se tienen en cuenta las estadísticas invertidas
-    if selected_position == 'QB':
-        radar_metrics = {'EPA de Pase': ('passing_epa', True), 'EPA de Carrera': ('rushing_epa', True), 'PACR': ('pacr', True), 'DAKOTA': ('dakota', True), 'TDs Totales': ('total_tds', True), 'Primeros Downs': ('total_first_downs', True), 'Sacks': ('sacks', False), 'Pérdidas de Balón': ('total_turnovers', False)}
-    elif selected_position == 'RB':
-        radar_metrics = {'EPA de Carrera': ('rushing_epa', True), 'TDs de Carrera': 'rushing_tds', 'Intentos': 'carries', 'Yardas de Carrera': 'rushing_yards', 'Primeros Downs': 'rushing_first_downs', 'Fumbles': ('rushing_fumbles', False)}
-        radar_metrics = {k: (v, True) if isinstance(v, str) else v for k, v in radar_metrics.items()}
-    elif selected_position == 'Receptor':
-        radar_metrics = {'EPA de Recepción': ('receiving_epa', True), 'TDs de Recepción': 'receiving_tds', 'RACR': ('racr', True), 'Yardas tras Recepción': 'receiving_yards_after_catch', 'Primeros Downs': 'receiving_first_downs', 'Fumbles': ('receiving_fumbles', False)}
-        radar_metrics = {k: (v, True) if isinstance(v, str) else v for k, v in radar_metrics.items()}
-
-    for metric_name, (col_name, higher_is_better) in radar_metrics.items():
-        year_position_df[f'{col_name}_percentile'] = year_position_df[col_name].rank(pct=True) #ranking percentil
-        if not higher_is_better:
-            year_position_df[f'{col_name}_percentile'] = 1 - year_position_df[f'{col_name}_percentile'] #inversión
-        year_position_df[f'{col_name}_percentile'] *= 100
-    
-    player_a_data = year_position_df[year_position_df['player_name'] == player_a_name].iloc[0]
-    player_b_data = year_position_df[year_position_df['player_name'] == player_b_name].iloc[0]
-
-    st.subheader(f"Comparativa de Percentiles: {player_a_name} vs. {player_b_name} ({selected_year})")
-    st.markdown("El gráfico muestra el percentil de cada jugador entre los de su misma posición (un valor más alto siempre es mejor).")
-    fig = go.Figure()
-    fig.add_trace(go.Scatterpolar(r=[player_a_data[f'{col}_percentile'] for col, _ in radar_metrics.values()], theta=list(radar_metrics.keys()), fill='toself', name=player_a_name, hovertemplate='<b>%{theta}</b><br>Percentil: %{r:.1f}<extra></extra>'))
-    fig.add_trace(go.Scatterpolar(r=[player_b_data[f'{col}_percentile'] for col, _ in radar_metrics.values()], theta=list(radar_metrics.keys()), fill='toself', name=player_b_name, hovertemplate='<b>%{theta}</b><br>Percentil: %{r:.1f}<extra></extra>'))
-    fig.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0, 100])), showlegend=True, height=500)
+    radar_metrics = PLAYER_RADAR_METRICS[selected_position]
+    names = [labels[entry] for entry in selected_entries]
+
+    st.subheader(f"Comparativa de Percentiles: {' vs. '.join(names)}")
+    all_time = not career_view and PERCENTILE_SCOPES[st.radio("Percentiles:", list(PERCENTILE_SCOPES), horizontal=True, key='player_percentile_scope')]
+    percentile_matrix = load_percentile_matrix(selected_position, min_attempts, DATA_VERSION, career_view)
+    percentiles, values = percentile_matrix.take(selected_entries, all_time=all_time) #Una sola extracción para todas las entidades
+    if career_view:
+        st.markdown("El gráfico muestra el percentil de los totales de carrera de cada jugador entre las carreras de su posición con la participación mínima (un valor más alto siempre es mejor).")
+    elif all_time:
+        st.markdown("El gráfico muestra el percentil de cada jugador frente a todos los jugadores de su posición (con la participación mínima) de todas las temporadas, así que los percentiles de distintas temporadas son comparables (un valor más alto siempre es mejor).")
+    else:
+        st.markdown("El gráfico muestra el percentil de cada jugador entre los de su misma posición y temporada (un valor más alto siempre es mejor).")
+    radar_filters = (selected_position, min_attempts, tuple(selected_entries), all_time, career_view)
+    fig = cached_figure('player_radar', DATA_VERSION, radar_filters, 'percentiles', lambda: radar_figure(radar_metrics.keys(), dict(zip(names, percentiles)))) #Reutiliza el radar si ya se construyó
     st.plotly_chart(fig, use_container_width=True)
 
     st.divider()
     st.subheader("Estadísticas Detalladas") #Tabla comparativa con las estadísticas
-    table_cols = [col for col, _ in radar_metrics.values()]
-    comparison_df = pd.DataFrame({player_a_name: player_a_data[table_cols], player_b_name: player_b_data[table_cols]})
-    comparison_df.index = list(radar_metrics.keys())
-    col_a, col_b = st.columns(2)
-    with col_a:
-        st.markdown(f"##### {player_a_name}")
-        st.dataframe(comparison_df[[player_a_name]].style.format("{:.2f}"))
-    with col_b:
-        st.markdown(f"##### {player_b_name}")
-        st.dataframe(comparison_df[[player_b_name]].style.format("{:.2f}"))
+    comparison_df = pd.DataFrame(values.T, index=list(radar_metrics.keys()), columns=names)
+    st.dataframe(comparison_df.style.format("{:.2f}"), use_container_width=True)
+
+    # --- Posición entre los jugadores filtrados con incertidumbre ---
+    ci_metric_names = {'cmp_percentage': '% Pases Completados', 'yards_per_attempt': 'Yardas por Intento', 'yards_per_carry': 'Yardas por Carrera',
+                       'catch_rate': '% de Recepción', 'yards_per_target': 'Yardas por Target', 'epa_per_play': 'EPA por Jugada'}
+    ci_metrics = available_metrics(PLAYER_BOOTSTRAP_METRICS[selected_position], load_distribution_store(DISTRIBUTIONS_FILE))
+    if ci_metrics and not career_view: #Los intervalos se calculan por temporada
+        st.divider()
+        st.subheader("🎯 Posición con Intervalos de Confianza")
+        st.markdown(f"Valor, intervalo de confianza del {int(CONFIDENCE * 100)}% (bootstrap sobre las jugadas de cada jugador) y rango de posiciones que podría ocupar entre los jugadores filtrados de su temporada.")
+
+        def format_interval(ci_df, player_id):
+            """Texto 'valor [IC] · posición (rango de posiciones)' de un jugador."""
+            if player_id not in ci_df.index:
+                return '-'
+            row = ci_df.loc[player_id]
+            return f"{row['value']:.2f} [{row['ci_low']:.2f}, {row['ci_high']:.2f}] · {int(row['rank'])}º ({int(row['rank_low'])}º-{int(row['rank_high'])}º)"
+
+        ci_rows = {}
+        for metric_col in ci_metrics:
+            ci_tables = {}
+            for year in {year for _, year in selected_entries}:
+                entities, point, draws = load_bootstrap(year, selected_position, metric_col)
+                in_view = pd.Series(entities).isin(pool_df.loc[pool_df['year'] == year, 'player_id']).to_numpy() #Clasificación entre los jugadores filtrados de la temporada
+                ci_tables[year] = interval_table(entities[in_view], point[in_view], draws[:, in_view]).set_index('entity')
+            ci_rows[ci_metric_names[metric_col]] = {name: format_interval(ci_tables[year], player_id) for (player_id, year), name in zip(selected_entries, names)}
+        st.dataframe(pd.DataFrame(ci_rows).T, use_container_width=True)
 
 st.divider()
 col3, col4, col5 = st.columns(3)
@@ -8,7 +8,13 @@ Created on Aug Tue 12 11:27:54 2025
 import streamlit as st
 import pandas as pd
 import os
-import plotly.express as px
+from utils.players import POSITION_GROUPS
+from utils.search import PlayerSearchIndex, split_search_results, format_entry
+from utils.trends import compute_trends, biggest_movers
+from utils.charts import data_version
+from utils.games import game_results
+from utils.elo import EloRatings
+from utils.models import PARTICIPATION, position_rows
 
 # --- Configuración de la Página ---
 st.set_page_config(
@@ -30,9 +36,14 @@ offensive_df = load_data('offensive_team_stats_advanced_2020-2024.csv')
 defensive_df = load_data('defensive_team_stats_advanced_2020-2024.csv')
 player_df_raw = load_data('detailed_player_stats_advanced_2020-2024.csv')
 
+@st.cache_resource
+def load_search_index(file_path):
+    """Índice de búsqueda de jugadores sobre todas las temporadas (se construye una sola vez)."""
+    return PlayerSearchIndex(load_data(file_path))
+
 # --- Título Principal ---
 st.title("📈 Evolución y Tendencias Temporales")
-st.markdown("Analiza la progresión de dos equipos o jugadores y permite comparar su evolución a lo largo de las temporadas regulares 2020-2024.")
+st.markdown("Analiza la progresión de varios equipos o jugadores a lo largo de las temporadas regulares 2020-2024 y descubre quién mejora o empeora más en toda la liga.")
 st.divider()
 
 # --- Pre-procesamiento y Unión de Datos ---
@@ -45,11 +56,70 @@ team_df = pd.merge(offensive_df, defensive_df, on=['team', 'year', 'conference',
 player_df = player_df_raw.copy()
 
 
+# --- Métricas por tipo de análisis ---
+offensive_total_metrics = {'Yardas Totales': 'total_yards', 'Jugadas Totales': 'total_plays', 'Yardas por Jugada': 'yards_per_play', 'TDs Ofensivos': 'offensive_tds', 'Pérdidas de Balón': 'total_turnovers'}
+offensive_pass_metrics = {'Yardas de Pase': 'passing_yards', 'TDs de Pase': 'passing_tds', 'Pases Completados': 'pass_completions', 'Intentos de Pase': 'pass_attempts', '% Pases Completados': 'cmp_percentage', 'Yardas por Intento de Pase': 'yards_per_pass', 'Yardas Netas por Pase': 'net_yards_per_pass', 'Ratio TD/INT': 'pass_td_int_ratio', 'Intercepciones Lanzadas': 'interceptions', 'Sacks Sufridos': 'sacks_taken'}
+offensive_rush_metrics = {'Yardas de Carrera': 'rushing_yards', 'TDs de Carrera': 'rushing_tds', 'Intentos de Carrera': 'rush_attempts', 'Yardas por Intento de Carrera': 'yards_per_rush', 'Fumbles Perdidos': 'fumbles_lost'}
+
+defensive_total_metrics = {'Yardas Totales Permitidas': 'total_yards_allowed', 'Jugadas Totales Enfrentadas': 'total_plays_faced', 'Yardas por Jugada Permitidas': 'yards_per_play_allowed', 'TDs Ofensivos Permitidos': 'offensive_tds_allowed', 'Pérdidas de Balón Forzadas': 'turnovers_forced'}
+defensive_pass_metrics = {'Yardas de Pase Permitidas': 'passing_yards_allowed', 'TDs de Pase Permitidos': 'passing_tds_allowed', 'Intercepciones Realizadas': 'interceptions_made', 'Sacks Realizados': 'sacks_made', '% Pases Completados del Rival': 'opponent_cmp_percentage', 'Yardas por Intento de Pase Permitidas': 'yards_per_pass_allowed', '% de Sacks por Jugada de Pase': 'sack_rate'}
+defensive_rush_metrics = {'Yardas de Carrera Permitidas': 'rushing_yards_allowed', 'TDs de Carrera Permitidos': 'rushing_tds_allowed', 'Yardas por Intento de Carrera Permitidas': 'yards_per_rush_allowed', 'Fumbles Forzados': 'fumbles_forced'}
+
+# Métricas por jugada y ajustadas por la calidad del rival (solo si las tablas las incluyen)
+offensive_total_metrics.update({name: col for name, col in {'EPA por Jugada': 'epa_per_play', 'Yardas por Jugada (Ajustadas por Rival)': 'adj_yards_per_play', 'EPA por Jugada (Ajustado por Rival)': 'adj_epa_per_play'}.items() if col in team_df.columns})
+defensive_total_metrics.update({name: col for name, col in {'EPA por Jugada Permitido': 'epa_per_play_allowed', 'Yardas por Jugada Permitidas (Ajustadas por Rival)': 'adj_yards_per_play_allowed', 'EPA por Jugada Permitido (Ajustado por Rival)': 'adj_epa_per_play_allowed'}.items() if col in team_df.columns})
+
+team_metrics = {**offensive_total_metrics, **offensive_pass_metrics, **offensive_rush_metrics, **defensive_total_metrics, **defensive_pass_metrics, **defensive_rush_metrics}
+
+player_metrics_by_position = {
+    'QB': {'Yardas de Pase': 'passing_yards', 'TDs de Pase': 'passing_tds', 'EPA de Pase': 'passing_epa', 'Completions': 'completions', 'Intentos': 'attempts', 'Intercepciones': 'interceptions', 'Sacks': 'sacks', 'Yardas Aéreas': 'passing_air_yards', 'Yardas tras Recepción': 'passing_yards_after_catch', 'Primeros Downs de Pase': 'passing_first_downs', 'Conversiones de 2pts': 'passing_2pt_conversions', 'PACR': 'pacr', 'DAKOTA': 'dakota', 'Yardas de Carrera': 'rushing_yards', 'TDs de Carrera': 'rushing_tds', 'EPA de Carrera': 'rushing_epa', 'Intentos de Carrera': 'carries', 'Fumbles en Carrera': 'rushing_fumbles', 'Fumbles Perdidos': 'rushing_fumbles_lost', 'Primeros Downs de Carrera': 'rushing_first_downs', 'Conversiones de 2pts': 'rushing_2pt_conversions'},
+    'RB': {'Yardas de Carrera': 'rushing_yards', 'TDs de Carrera': 'rushing_tds', 'EPA de Carrera': 'rushing_epa', 'Intentos de Carrera': 'carries', 'Fumbles': 'rushing_fumbles', 'Fumbles Perdidos': 'rushing_fumbles_lost', 'Primeros Downs de Carrera': 'rushing_first_downs', 'Conversiones de 2pts': 'rushing_2pt_conversions'},
+    'Receptor': {'Yardas de Recepción': 'receiving_yards', 'TDs de Recepción': 'receiving_tds', 'EPA de Recepción': 'receiving_epa', 'Recepciones': 'receptions', 'Targets': 'targets', 'Yardas Aéreas': 'receiving_air_yards', 'Yardas tras Recepción': 'receiving_yards_after_catch', 'Fumbles': 'receiving_fumbles', 'Fumbles Perdidos': 'receiving_fumbles_lost', 'Primeros Downs de Recepción': 'receiving_first_downs', 'Conversiones de 2pts': 'receiving_2pt_conversions', 'RACR': 'racr', 'Cuota de Targets': 'target_share', 'Cuota de Yardas Aéreas': 'air_yards_share'}
+}
+
+LOWER_IS_BETTER_METRICS = [ #En estas variables un valor más bajo es mejor (importante para las clasificaciones)
+    'total_turnovers', 'interceptions', 'fumbles_lost', 'sacks_taken', 'sacks', 'rushing_fumbles', 'receiving_fumbles',
+    'rushing_fumbles_lost', 'receiving_fumbles_lost',
+    'total_yards_allowed', 'total_plays_faced', 'yards_per_play_allowed',
+    'completions_allowed', 'pass_attempts_faced', 'passing_yards_allowed', 'passing_tds_allowed',
+    'opponent_cmp_percentage', 'yards_per_pass_allowed', 'offensive_tds_allowed',
+    'rush_attempts_faced', 'rushing_yards_allowed', 'rushing_tds_allowed', 'yards_per_rush_allowed',
+    'epa_per_play_allowed', 'adj_yards_per_play_allowed', 'adj_epa_per_play_allowed'
+]
+
+# --- Tablas de tendencias (todas las entidades y métricas de una vez) ---
+@st.cache_data
+def load_team_trends():
+    """Tendencias de todos los equipos en todas las métricas."""
+    return compute_trends(team_df, 'team', list(team_metrics.values()), attribute_columns=['conference', 'division'])
+
+@st.cache_data
+def load_player_trends(position):
+    """Tendencias de los jugadores de una posición, solo con las temporadas que alcanzan la participación mínima de referencia."""
+    metrics = list(player_metrics_by_position[position].values())
+    return compute_trends(position_rows(player_df, position), 'player_id', metrics, attribute_columns=['player_name', 'position', 'team'])
+
+
+# --- Rating Elo (opcional: requiere la tabla de partidos de Data_extraction.py) ---
+TEAM_GAMES_FILE = 'team_game_stats_2020-2024.csv'
+
+@st.cache_resource
+def load_elo_engine():
+    """Motor Elo compartido entre sesiones: la historia se calcula una vez y después solo se añaden las semanas nuevas (o se recalcula si cambian las ya procesadas)."""
+    return EloRatings()
+
+@st.cache_data
+def load_elo_history(version):
+    """Añade al motor los partidos nuevos del fichero (según su versión) y devuelve la serie de ratings por partido."""
+    elo = load_elo_engine()
+    elo.sync(game_results(pd.read_csv(TEAM_GAMES_FILE)))
+    return elo.history
+
+
 # --- Función para crear gráficos de líneas ---
-def create_line_chart(df, entities, metric_col, metric_name, entity_col):
-    """Crea un gráfico de líneas para comparar la evolución de dos entidades."""
-    
-    chart_data = df[df[entity_col].isin(entities)]
+def create_line_chart(chart_data, entities, metric_col, metric_name, entity_col, entity_labels=None):
+    """Crea un gráfico de líneas para comparar la evolución de varias entidades (entity_labels: nombre de cada línea si la columna es un identificador)."""
+    import plotly.express as px #Importación diferida (arranque más rápido)
     
     if chart_data.empty or chart_data.shape[0] < 2: #Mínimo 2 años/temporadas
         st.warning(f"No hay suficientes datos para mostrar la evolución de '{metric_name}'. Uno de los seleccionados podría no tener datos para el rango de años.")
@@ -63,9 +133,11 @@ def create_line_chart(df, entities, metric_col, metric_name, entity_col):
         markers=True,
         labels={'year': 'Temporada', metric_col: metric_name, entity_col: 'Entidad'}
     )
+    if entity_labels is not None:
+        fig.for_each_trace(lambda trace: trace.update(name=entity_labels.get(trace.name, trace.name), legendgroup=trace.name))
     
     fig.update_layout(
-        title=f'Evolución de {metric_name} ({entities[0]} vs. {entities[1]})',
+        title=f'Evolución de {metric_name} ({" vs. ".join(entities)})',
         plot_bgcolor='rgba(0,0,0,0)',
         xaxis=dict(showgrid=False, type='category'), # Tratar años como categorías
         yaxis=dict(showgrid=True, gridcolor='lightgrey'),
@@ -75,57 +147,62 @@ def create_line_chart(df, entities, metric_col, metric_name, entity_col):
 
 
 # --- Selección Principal: Equipo o Jugador ---
-analysis_type = st.selectbox("¿Qué deseas analizar?", ["Equipos", "Jugadores"])
+analysis_type = st.selectbox("¿Qué deseas analizar?", ["Equipos", "Jugadores", "Mayores Cambios de la Liga"])
 st.divider()
 
 # --- LÓGICA PARA ANÁLISIS DE EQUIPOS ---
 if analysis_type == "Equipos":
-    teams = sorted(team_df['team'].unique())
-    col1, col2 = st.columns(2)
-    with col1:
-        team_a = st.selectbox("Selecciona el Equipo A:", teams, index=teams.index('KC') if 'KC' in teams else 0)
-    with col2:
-        team_b = st.selectbox("Selecciona el Equipo B:", teams, index=teams.index('SF') if 'SF' in teams else 1)
+    team_rows = team_df.sort_values('year').set_index('team', drop=False) #Índice por equipo para extraer todas las series de una vez
+    teams = sorted(team_rows.index.unique())
+    selected_teams = st.multiselect("Selecciona los Equipos (hasta 10):", teams, default=[team for team in ['KC', 'SF'] if team in teams], max_selections=10)
 
-    if team_a == team_b:
-        st.warning("Por favor, selecciona dos equipos diferentes.")
+    if not selected_teams:
+        st.warning("Por favor, selecciona al menos un equipo.")
     else:
-        # Definir métricas
-        offensive_total_metrics = {'Yardas Totales': 'total_yards', 'Jugadas Totales': 'total_plays', 'Yardas por Jugada': 'yards_per_play', 'TDs Ofensivos': 'offensive_tds', 'Pérdidas de Balón': 'total_turnovers'}
-        offensive_pass_metrics = {'Yardas de Pase': 'passing_yards', 'TDs de Pase': 'passing_tds', 'Pases Completados': 'pass_completions', 'Intentos de Pase': 'pass_attempts', '% Pases Completados': 'cmp_percentage', 'Yardas por Intento de Pase': 'yards_per_pass', 'Yardas Netas por Pase': 'net_yards_per_pass', 'Ratio TD/INT': 'pass_td_int_ratio', 'Intercepciones Lanzadas': 'interceptions', 'Sacks Sufridos': 'sacks_taken'}
-        offensive_rush_metrics = {'Yardas de Carrera': 'rushing_yards', 'TDs de Carrera': 'rushing_tds', 'Intentos de Carrera': 'rush_attempts', 'Yardas por Intento de Carrera': 'yards_per_rush', 'Fumbles Perdidos': 'fumbles_lost'}
-        
-        defensive_total_metrics = {'Yardas Totales Permitidas': 'total_yards_allowed', 'Jugadas Totales Enfrentadas': 'total_plays_faced', 'Yardas por Jugada Permitidas': 'yards_per_play_allowed', 'TDs Ofensivos Permitidos': 'offensive_tds_allowed', 'Pérdidas de Balón Forzadas': 'turnovers_forced'}
-        defensive_pass_metrics = {'Yardas de Pase Permitidas': 'passing_yards_allowed', 'TDs de Pase Permitidos': 'passing_tds_allowed', 'Intercepciones Realizadas': 'interceptions_made', 'Sacks Realizados': 'sacks_made', '% Pases Completados del Rival': 'opponent_cmp_percentage', 'Yardas por Intento de Pase Permitidas': 'yards_per_pass_allowed', '% de Sacks por Jugada de Pase': 'sack_rate'}
-        defensive_rush_metrics = {'Yardas de Carrera Permitidas': 'rushing_yards_allowed', 'TDs de Carrera Permitidos': 'rushing_tds_allowed', 'Yardas por Intento de Carrera Permitidas': 'yards_per_rush_allowed', 'Fumbles Forzados': 'fumbles_forced'}
-        
+        chart_df = team_rows.loc[selected_teams]
+
         # Visualización en expanders
         with st.expander("📊 Estadísticas Totales", expanded=True):
             off_col, def_col = st.columns(2)
             with off_col:
                 selected_metric_name = st.selectbox("Métrica Ofensiva:", list(offensive_total_metrics.keys()), key='off_total')
-                create_line_chart(team_df, [team_a, team_b], offensive_total_metrics[selected_metric_name], selected_metric_name, 'team')
+                create_line_chart(chart_df, selected_teams, offensive_total_metrics[selected_metric_name], selected_metric_name, 'team')
             with def_col:
                 selected_metric_name = st.selectbox("Métrica Defensiva:", list(defensive_total_metrics.keys()), key='def_total')
-                create_line_chart(team_df, [team_a, team_b], defensive_total_metrics[selected_metric_name], selected_metric_name, 'team')
+                create_line_chart(chart_df, selected_teams, defensive_total_metrics[selected_metric_name], selected_metric_name, 'team')
 
         with st.expander("✈️ Estadísticas de Pase"):
             off_col, def_col = st.columns(2)
             with off_col:
                 selected_metric_name = st.selectbox("Métrica Ofensiva:", list(offensive_pass_metrics.keys()), key='off_pass')
-                create_line_chart(team_df, [team_a, team_b], offensive_pass_metrics[selected_metric_name], selected_metric_name, 'team')
+                create_line_chart(chart_df, selected_teams, offensive_pass_metrics[selected_metric_name], selected_metric_name, 'team')
             with def_col:
                 selected_metric_name = st.selectbox("Métrica Defensiva:", list(defensive_pass_metrics.keys()), key='def_pass')
-                create_line_chart(team_df, [team_a, team_b], defensive_pass_metrics[selected_metric_name], selected_metric_name, 'team')
+                create_line_chart(chart_df, selected_teams, defensive_pass_metrics[selected_metric_name], selected_metric_name, 'team')
 
         with st.expander("🏃‍♂️ Estadísticas de Carrera"):
             off_col, def_col = st.columns(2)
             with off_col:
                 selected_metric_name = st.selectbox("Métrica Ofensiva:", list(offensive_rush_metrics.keys()), key='off_rush')
-                create_line_chart(team_df, [team_a, team_b], offensive_rush_metrics[selected_metric_name], selected_metric_name, 'team')
+                create_line_chart(chart_df, selected_teams, offensive_rush_metrics[selected_metric_name], selected_metric_name, 'team')
             with def_col:
                 selected_metric_name = st.selectbox("Métrica Defensiva:", list(defensive_rush_metrics.keys()), key='def_rush')
-                create_line_chart(team_df, [team_a, team_b], defensive_rush_metrics[selected_metric_name], selected_metric_name, 'team')
+                create_line_chart(chart_df, selected_teams, defensive_rush_metrics[selected_metric_name], selected_metric_name, 'team')
+
+        with st.expander("⚡ Rating Elo"):
+            if os.path.exists(TEAM_GAMES_FILE):
+                import plotly.express as px #Importación diferida (arranque más rápido)
+                elo_df = load_elo_history(data_version(TEAM_GAMES_FILE))
+                elo_df = elo_df[elo_df['team'].isin(selected_teams)].assign(game=lambda df: df['year'].astype(str) + ' S' + df['week'].astype(str).str.zfill(2))
+                fig = px.line(elo_df, x='game', y='elo_post', color='team', hover_data={'opponent': True, 'elo_pre': ':.0f'},
+                              labels={'game': 'Partido (Temporada y Semana)', 'elo_post': 'Elo tras el partido', 'team': 'Equipo', 'opponent': 'Rival', 'elo_pre': 'Elo previo'})
+                fig.update_layout(title=f'Evolución del Rating Elo ({" vs. ".join(selected_teams)})', plot_bgcolor='rgba(0,0,0,0)', legend_title_text='',
+                                  xaxis=dict(showgrid=False, type='category', categoryorder='category ascending'), yaxis=dict(showgrid=True, gridcolor='lightgrey'))
+                fig.add_hline(y=1500, line_dash='dot', line_color='grey') #Equipo medio
+                st.plotly_chart(fig, use_container_width=True)
+                st.caption("Elo partido a partido con el marcador final: ventaja de campo, multiplicador por margen de victoria y regresión de un tercio hacia la media entre temporadas.")
+            else:
+                st.info(f"El rating Elo necesita la tabla de partidos ({TEAM_GAMES_FILE}). Genérala con Data_extraction.py.")
 
 
 # --- LÓGICA PARA ANÁLISIS DE JUGADORES ---
@@ -152,28 +229,62 @@ elif analysis_type == "Jugadores":
     if position_filtered_df.empty:
         st.warning("No hay jugadores que cumplan los filtros. Ajusta el filtro de participación.")
     else:
-        players = sorted(position_filtered_df['player_name'].unique())
-        col1, col2 = st.columns(2)
-        with col1:
-            player_a = st.selectbox("Selecciona el Jugador A:", players)
-        with col2:
-            player_b = st.selectbox("Selecciona el Jugador B:", players, index=1 if len(players) > 1 else 0)
-
-        if player_a == player_b:
-            st.warning("Por favor, selecciona dos jugadores diferentes.")
+        search_index = load_search_index('detailed_player_stats_advanced_2020-2024.csv')
+        player_rows = position_filtered_df.sort_values('year').set_index('player_id', drop=False) #Índice por jugador para extraer todas las series de una vez
+        query = st.text_input("Buscar Jugador:", placeholder="Escribe parte del nombre...")
+        found_players, _ = split_search_results(search_index, query, set(player_rows.index), POSITION_GROUPS[selected_position])
+
+        # Los ya seleccionados se mantienen aunque no aparezcan en la búsqueda actual
+        if 'trend_players' not in st.session_state:
+            st.session_state['trend_players'] = found_players[:2]
+        selected_entries = [entry for entry in st.session_state['trend_players'] if entry[0] in player_rows.index]
+        options = list(dict.fromkeys(selected_entries + found_players))
+        st.session_state['trend_players'] = selected_entries
+        selected_entries = st.multiselect("Selecciona los Jugadores (hasta 10):", options, format_func=format_entry, max_selections=10, key='trend_players')
+
+        if not selected_entries:
+            st.warning("Por favor, selecciona al menos un jugador.")
         else:
-            # Definir métricas por posición
-            player_metrics = {}
-            if selected_position == 'QB':
-                player_metrics = {'Yardas de Pase': 'passing_yards', 'TDs de Pase': 'passing_tds', 'EPA de Pase': 'passing_epa', 'Completions': 'completions', 'Intentos': 'attempts', 'Intercepciones': 'interceptions', 'Sacks': 'sacks', 'Yardas Aéreas': 'passing_air_yards', 'Yardas tras Recepción': 'passing_yards_after_catch', 'Primeros Downs de Pase': 'passing_first_downs', 'Conversiones de 2pts': 'passing_2pt_conversions', 'PACR': 'pacr', 'DAKOTA': 'dakota', 'Yardas de Carrera': 'rushing_yards', 'TDs de Carrera': 'rushing_tds', 'EPA de Carrera': 'rushing_epa', 'Intentos de Carrera': 'carries', 'Fumbles en Carrera': 'rushing_fumbles', 'Fumbles Perdidos': 'rushing_fumbles_lost', 'Primeros Downs de Carrera': 'rushing_first_downs', 'Conversiones de 2pts': 'rushing_2pt_conversions'}
-            elif selected_position == 'RB':
-                player_metrics = {'Yardas de Carrera': 'rushing_yards', 'TDs de Carrera': 'rushing_tds', 'EPA de Carrera': 'rushing_epa', 'Intentos de Carrera': 'carries', 'Fumbles': 'rushing_fumbles', 'Fumbles Perdidos': 'rushing_fumbles_lost', 'Primeros Downs de Carrera': 'rushing_first_downs', 'Conversiones de 2pts': 'rushing_2pt_conversions'}
-            elif selected_position == 'Receptor':
-                player_metrics = {'Yardas de Recepción': 'receiving_yards', 'TDs de Recepción': 'receiving_tds', 'EPA de Recepción': 'receiving_epa', 'Recepciones': 'receptions', 'Targets': 'targets', 'Yardas Aéreas': 'receiving_air_yards', 'Yardas tras Recepción': 'receiving_yards_after_catch', 'Fumbles': 'receiving_fumbles', 'Fumbles Perdidos': 'receiving_fumbles_lost', 'Primeros Downs de Recepción': 'receiving_first_downs', 'Conversiones de 2pts': 'receiving_2pt_conversions', 'RACR': 'racr', 'Cuota de Targets': 'target_share', 'Cuota de Yardas Aéreas': 'air_yards_share'}
-            
+            player_metrics = player_metrics_by_position[selected_position]
             selected_metric_name = st.selectbox("Selecciona una métrica para comparar:", list(player_metrics.keys()))
-            create_line_chart(position_filtered_df, [player_a, player_b], player_metrics[selected_metric_name], selected_metric_name, 'player_name')
+            players_chart_df = player_rows.loc[[entry[0] for entry in selected_entries]] #Selección por identificador
+            create_line_chart(players_chart_df, [entry[1] for entry in selected_entries], player_metrics[selected_metric_name], selected_metric_name, 'player_id',
+                              entity_labels={entry[0]: format_entry(entry) for entry in selected_entries}) #Una línea por jugador aunque compartan nombre
+
+
+# --- LÓGICA PARA LAS CLASIFICACIONES DE LA LIGA ---
+elif analysis_type == "Mayores Cambios de la Liga":
+    st.markdown("Clasificación de toda la liga según la tendencia de cada equipo o jugador: pendiente por mínimos cuadrados a lo largo de las temporadas o variación respecto a la temporada anterior.")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        entity_type = st.selectbox("Entidades:", ['Equipos', 'QB', 'RB', 'Receptor'])
+    if entity_type == 'Equipos':
+        trends_df, metric_options, entity_label = load_team_trends(), team_metrics, 'team'
+    else:
+        trends_df = load_player_trends(entity_type)
+        metric_options, entity_label = player_metrics_by_position[entity_type], 'player_name'
+        participation_column, min_participation = PARTICIPATION[entity_type]
+        st.caption(f"Solo cuentan las temporadas con al menos {min_participation} {participation_column} (el mismo mínimo de referencia que el modelado).")
+    with col2:
+        selected_metric_name = st.selectbox("Métrica:", list(metric_options.keys()), key='movers_metric')
+    with col3:
+        trend_criteria = {'Pendiente (todas las temporadas)': 'slope', 'Variación Última Temporada': 'last_delta'}
+        selected_criteria = st.selectbox("Criterio:", list(trend_criteria.keys()))
+    min_seasons = st.sidebar.slider("Mínimo de Temporadas con Datos:", 2, 5, 3)
+
+    metric_col = metric_options[selected_metric_name]
+    improving, declining = biggest_movers(trends_df, metric_col, by=trend_criteria[selected_criteria], lower_is_better=metric_col in LOWER_IS_BETTER_METRICS, min_seasons=min_seasons)
+    display_cols = [entity_label, 'first_year', 'last_year', 'first_value', 'last_value', 'last_delta', 'slope', 'volatility']
+    column_names = {entity_label: 'Entidad', 'first_year': 'Desde', 'last_year': 'Hasta', 'first_value': 'Valor Inicial', 'last_value': 'Valor Final', 'last_delta': 'Variación Última', 'slope': 'Pendiente/Año', 'volatility': 'Volatilidad'}
+    number_format = {col: "{:.2f}" for col in ['first_value', 'last_value', 'last_delta', 'slope', 'volatility']}
 
+    col_up, col_down = st.columns(2, gap="large")
+    with col_up:
+        st.subheader(f"📈 Mayor Mejora en {selected_metric_name}")
+        st.dataframe(improving[display_cols].style.format(number_format).background_gradient(cmap='Greens', subset=[trend_criteria[selected_criteria]]).relabel_index(list(column_names.values()), axis=1), hide_index=True)
+    with col_down:
+        st.subheader(f"📉 Mayor Empeoramiento en {selected_metric_name}")
+        st.dataframe(declining[display_cols].style.format(number_format).background_gradient(cmap='Reds', subset=[trend_criteria[selected_criteria]]).relabel_index(list(column_names.values()), axis=1), hide_index=True)
 
 st.divider()
 col3, col4, col5 = st.columns(3)
@@ -8,14 +8,16 @@ Created on Aug Mon 18 22:31:24 2025
 import streamlit as st
 import pandas as pd
 import os
-import plotly.express as px
-import plotly.graph_objects as go
 import numpy as np
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
-from sklearn.metrics.pairwise import euclidean_distances
+from utils.players import POSITION_GROUPS, player_labels
+from utils.search import PlayerSearchIndex, split_search_results, format_entry
+from utils.export import export_button
+from utils.charts import cached_figure, cached_result, data_version, scatter_render_mode
+from utils.prefetch import PRIORITY_ADJACENT_SEASON, PRIORITY_OTHER_POSITION, PRIORITY_DEFAULT_THRESHOLD, get_prefetcher, session_scope, show_prefetch_stats
+from utils.consensus import N_RUNS, SUBSAMPLE, co_association, stability_scores
+from utils.careers import per_season
+from utils.models import (MODEL_FEATURES, PARTICIPATION, MODEL_DIR, add_derived_features, position_rows, load_or_fit_model_store, load_or_build_feature_matrices,
+                          clustering_scores, kmeans_labels, weighted_neighbours)
 
 # --- Configuración de la Página ---
 st.set_page_config(
@@ -34,6 +36,15 @@ def load_data(file_path):
         return None
 
 player_df_raw = load_data('detailed_player_stats_advanced_2020-2024.csv')
+CAREERS_FILE = 'player_career_stats_2020-2024.csv' #Fichero opcional generado por Data_extraction.py
+career_df_raw = load_data(CAREERS_FILE) if os.path.exists(CAREERS_FILE) else None
+DATA_VERSION = data_version('detailed_player_stats_advanced_2020-2024.csv') #Invalida las figuras guardadas si cambian los ficheros
+CAREER_VERSION = data_version('detailed_player_stats_advanced_2020-2024.csv', CAREERS_FILE)
+
+@st.cache_resource
+def load_search_index(file_path):
+    """Índice de búsqueda de jugadores sobre todas las temporadas (se construye una sola vez)."""
+    return PlayerSearchIndex(load_data(file_path))
 
 # --- Título Principal ---
 st.title("🧠 Modelado Analítico de Jugadores")
@@ -45,86 +56,128 @@ if player_df_raw is None:
     st.warning("No se pudieron cargar los datos. Por favor, verifica la ruta del fichero CSV.")
     st.stop()
 
-metrics_to_check = ['passing_tds', 'rushing_tds', 'passing_first_downs', 'rushing_first_downs', 'interceptions', 'rushing_fumbles_lost', 'sack_fumbles_lost']
-for col in metrics_to_check:
-    if col not in player_df_raw.columns:
-        player_df_raw[col] = 0
-player_df_raw[metrics_to_check] = player_df_raw[metrics_to_check].fillna(0) 
+player_df_raw = add_derived_features(player_df_raw)
+if career_df_raw is not None:
+    career_df_raw = add_derived_features(career_df_raw)
 
-player_df_raw['total_tds'] = player_df_raw['passing_tds'] + player_df_raw['rushing_tds']
-player_df_raw['total_first_downs'] = player_df_raw['passing_first_downs'] + player_df_raw['rushing_first_downs']
-player_df_raw['total_turnovers'] = player_df_raw['interceptions'] + player_df_raw['rushing_fumbles_lost'] + player_df_raw['sack_fumbles_lost']
+@st.cache_resource
+def load_model_store(version):
+    """Escalado y PCA por posición ajustados sobre todas las temporadas (se cargan de disco si la versión coincide)."""
+    return load_or_fit_model_store(player_df_raw, version, os.path.join(MODEL_DIR, 'player_models_2020-2024.npz'))
 
 # --- Funciones del Modelo ---
-def get_scaled_features(df, features):
-    """Escala las características seleccionadas y devuelve el array y el dataframe limpio."""
-    model_df = df[features + ['player_name', 'team']].copy().reset_index(drop=True)
+@st.cache_resource
+def load_feature_matrices(version):
+    """Matrices float32 de características escaladas abiertas con memmap (compartidas entre procesos, None si no se pueden escribir)."""
+    return load_or_build_feature_matrices(player_df_raw, load_model_store(version), os.path.join(MODEL_DIR, 'features_2020-2024'))
+
+def get_scaled_features(df, model, position, year, min_attempts, matrices=None):
+    """Características escaladas de los jugadores filtrados y el dataframe limpio (de las matrices compartidas si existen)."""
+    if matrices is not None:
+        rows, scaled_features = matrices.select(position, year, min_attempts) #Solo se copian las filas del filtro
+        df = player_df_raw.iloc[rows]
+    else:
+        scaled_features = model.scale_features(df) #Misma escala para todas las temporadas y filtros
+    model_df = df[model.features + ['player_id', 'player_name', 'team']].copy().reset_index(drop=True)
     model_df.fillna(0, inplace=True)
-    
-    scaler = StandardScaler() #Escalado estándar
-    scaled_features = scaler.fit_transform(model_df[features])
     return model_df, scaled_features
 
-def get_clustering_scores(scaled_features):
-    """Calcula la inercia y el silhouette score para un rango de clústeres."""
-    inertias = []
-    silhouette_scores = []
-    k_range = range(2, 9) #k-means, bucle de 2 a 8 clústers
-    for k in k_range:
-        kmeans = KMeans(n_clusters=k, random_state=23, n_init=10)
-        kmeans.fit(scaled_features)
-        inertias.append(kmeans.inertia_)
-        silhouette_scores.append(silhouette_score(scaled_features, kmeans.labels_))
-    return k_range, inertias, silhouette_scores
-
-def run_full_model(model_df, scaled_features, n_clusters):
-    """Ejecuta PCA y K-Means con un número de clústeres definido."""
-    pca = PCA(n_components=2) #PCA con 2 componentes para graficar
-    principal_components = pca.fit_transform(scaled_features)
+def get_clustering_scores(filters, scaled_features, prefetch=False):
+    """Calcula la inercia y el silhouette score para un rango de clústeres (k-means de 2 a 8 clústers), guardados por vista."""
+    return cached_result('clustering_scores', DATA_VERSION, filters, None, lambda: clustering_scores(scaled_features, range(2, 9)), prefetch)
+
+def run_full_model(model_df, scaled_features, n_clusters, model, filters, prefetch=False):
+    """Proyecta sobre las componentes principales de la posición y ejecuta K-Means con un número de clústeres definido."""
+    principal_components = model.project(scaled_features) #PCA ya ajustado: solo un producto matricial
     model_df['PC1'] = principal_components[:, 0]
     model_df['PC2'] = principal_components[:, 1]
-    
-    kmeans = KMeans(n_clusters=n_clusters, random_state=23, n_init=10)
-    model_df['cluster'] = kmeans.fit_predict(scaled_features)
-    
+    model_df['cluster'] = cached_result('kmeans_labels', DATA_VERSION, filters, n_clusters, lambda: kmeans_labels(scaled_features, n_clusters), prefetch)
     return model_df
 
+def cluster_figure(model_results_df, position, year, n_clusters, model):
+    """Jugadores por clúster sobre las 2 primeras componentes (sin llamadas a Streamlit: también se usa en la precarga)."""
+    import plotly.express as px #Importación diferida (arranque más rápido)
+    plot_df = model_results_df.copy()
+    plot_df['cluster'] = plot_df['cluster'].astype(str)
+    fig_cluster = px.scatter(
+        plot_df, x='PC1', y='PC2', color='cluster', hover_name='player_name',
+        hover_data={'team': True, 'cluster': True, 'PC1': False, 'PC2': False},
+        title=f'Clústeres de {position} ({year}) con k={n_clusters}',
+        render_mode=scatter_render_mode(len(plot_df)) #WebGL automático con muchos puntos
+    )
+    pc1, pc2 = 100 * model.explained_variance_ratio[:2]
+    fig_cluster.update_layout(xaxis_title=f"Componente Principal 1 ({pc1:.0f}% var.)", yaxis_title=f"Componente Principal 2 ({pc2:.0f}% var.)", legend_title_text='Clúster')
+    return fig_cluster
+
+def prefetch_view(year, position, min_attempts, model_store, matrices):
+    """
+    Tarea de precarga de una vista por temporada: escalado, puntuaciones de k y clústeres con la k recomendada.
+    Recibe el almacén de modelos y las matrices ya cargados (los cargadores de st.cache_resource necesitan el hilo de la página)
+    """
+    def task():
+        view_df = position_rows(player_df_raw, position, min_attempts)
+        view_df = view_df[view_df['year'] == year]
+        if view_df.shape[0] < 10:
+            return
+        model = model_store[position]
+        filters = (year, position, min_attempts)
+        view_model_df, view_scaled = get_scaled_features(view_df, model, position, year, min_attempts, matrices)
+        k_range, _, silhouette_scores = get_clustering_scores(filters, view_scaled, prefetch=True)
+        k = k_range[np.argmax(silhouette_scores)]
+        results_df = run_full_model(view_model_df, view_scaled, k, model, filters, prefetch=True)
+        cached_figure('cluster_scatter', DATA_VERSION, filters, k, lambda: cluster_figure(results_df, position, year, k, model), prefetch=True)
+    return task
+
+@st.cache_data
+def run_consensus(filters, n_clusters, n_runs, version, _scaled_features, _labels):
+    """Co-asociación de muchos K-Means sobre submuestras, cacheada por vista (filtros, k y nº de ajustes)."""
+    matrix = co_association(_scaled_features, n_clusters, n_runs)
+    return stability_scores(matrix, _labels)
+
+prefetcher = get_prefetcher()
+prefetch_scope = session_scope('player_models')
+prefetcher.foreground(prefetch_scope) #Cancela la precarga pendiente de esta sesión y le da prioridad a esta ejecución
+
 # --- Barra Lateral de Filtros ---
 st.sidebar.header("Filtros del Modelo")
-selected_year = st.sidebar.selectbox('Selecciona una Temporada', options=sorted(player_df_raw['year'].unique(), reverse=True))
+career_view = career_df_raw is not None and st.sidebar.radio('Granularidad', ['Temporada', 'Carrera'], horizontal=True) == 'Carrera' #Tabla de carreras precalculada
+if career_view:
+    selected_year = 'Carrera'
+    st.sidebar.caption("Cada jugador se representa con la media por temporada de su carrera, en la misma escala que las temporadas.")
+else:
+    years = sorted(player_df_raw['year'].unique(), reverse=True)
+    selected_year = st.sidebar.selectbox('Selecciona una Temporada', options=years)
 selected_position = st.sidebar.selectbox('Selecciona una Posición', options=['QB', 'RB', 'Receptor'])
 
 st.sidebar.markdown("---")
 st.sidebar.subheader("Filtro de Participación Mínima")
-if selected_position == 'QB':
-    min_attempts = st.sidebar.slider("Mínimo de Intentos de Pase:", 0, 600, 150)
-    filtered_df = player_df_raw[(player_df_raw['position'] == 'QB') & (player_df_raw['attempts'] >= min_attempts)]
-elif selected_position == 'RB':
-    min_attempts = st.sidebar.slider("Mínimo de Intentos de Carrera:", 0, 400, 75)
-    filtered_df = player_df_raw[(player_df_raw['position'] == 'RB') & (player_df_raw['carries'] >= min_attempts)]
-else: # Receptor
-    min_attempts = st.sidebar.slider("Mínimo de Targets:", 0, 200, 60)
-    filtered_df = player_df_raw[(player_df_raw['position'].isin(['WR', 'TE'])) & (player_df_raw['targets'] >= min_attempts)]
-
-filtered_df = filtered_df[filtered_df['year'] == selected_year]
-
-features_dict = {
-    'QB': ['passing_epa', 'rushing_epa', 'pacr', 'dakota', 'total_tds', 'total_first_downs', 'sacks', 'total_turnovers', 'passing_yards', 'rushing_yards'],
-    'RB': ['rushing_epa', 'rushing_tds', 'carries', 'rushing_yards', 'rushing_first_downs', 'rushing_fumbles'],
-    'Receptor': ['receiving_epa', 'receiving_tds', 'racr', 'receiving_yards_after_catch', 'receiving_first_downs', 'receiving_fumbles', 'receiving_yards']
-}
-features = features_dict[selected_position]
+participation_labels = {'QB': ("Mínimo de Intentos de Pase:", 600), 'RB': ("Mínimo de Intentos de Carrera:", 400), 'Receptor': ("Mínimo de Targets:", 200)}
+slider_label, slider_max = participation_labels[selected_position]
+min_attempts = st.sidebar.slider(slider_label, 0, slider_max, PARTICIPATION[selected_position][1])
+if career_view: #Media por temporada: el mínimo de participación significa lo mismo que en la vista por temporada
+    career_df = per_season(career_df_raw, MODEL_FEATURES[selected_position] + [PARTICIPATION[selected_position][0]])
+    filtered_df = position_rows(career_df, selected_position, min_attempts)
+else:
+    filtered_df = position_rows(player_df_raw, selected_position, min_attempts)
+    filtered_df = filtered_df[filtered_df['year'] == selected_year]
+
+features = MODEL_FEATURES[selected_position]
+model_store = load_model_store(DATA_VERSION)
+model = model_store[selected_position]
 
 if filtered_df.shape[0] < 10:
     st.warning("No hay suficientes jugadores que cumplan los filtros para ejecutar el modelo. Por favor, ajusta los filtros.")
     st.stop()
 
 # --- Ejecución Modular del Modelo ---
-model_df, scaled_features = get_scaled_features(filtered_df, features)
-k_range, inertias, silhouette_scores = get_clustering_scores(scaled_features)
+matrices = None if career_view else load_feature_matrices(DATA_VERSION) #Las matrices compartidas son de jugador-temporadas
+model_df, scaled_features = get_scaled_features(filtered_df, model, selected_position, selected_year, min_attempts, matrices)
+model_filters = (selected_year, selected_position, min_attempts) + ((CAREER_VERSION,) if career_view else ()) #Clave de la vista para reutilizar figuras
+k_range, inertias, silhouette_scores = get_clustering_scores(model_filters, scaled_features)
 recommended_k = k_range[np.argmax(silhouette_scores)] # número de k clusters en función del silhouete
 
 # --- Pestañas de Visualización ---
+import plotly.express as px #Importación diferida: solo cuando ya hay datos que dibujar
 tab1, tab2 = st.tabs(["Clustering de Jugadores", "Buscador de Jugadores Similares"])
 
 with tab1: #Clusters
@@ -134,65 +187,98 @@ with tab1: #Clusters
         st.markdown("Estos gráficos se actualizan dinámicamente según los filtros seleccionados.")
         col1, col2 = st.columns(2)
         with col1:
-            fig_inertia = px.line(x=k_range, y=inertias, title='Método del Codo (Inertia)', markers=True, labels={'x':'Número de Clústeres (k)', 'y':'Inercia'})
+            fig_inertia = cached_figure('elbow', DATA_VERSION, model_filters, 'inertia', lambda: px.line(x=k_range, y=inertias, title='Método del Codo (Inertia)', markers=True, labels={'x':'Número de Clústeres (k)', 'y':'Inercia'}))
             st.plotly_chart(fig_inertia, use_container_width=True) #Gráfico del codo para la inercia
         with col2:
-            fig_silhouette = px.line(x=k_range, y=silhouette_scores, title='Coeficiente de Silueta', markers=True, labels={'x':'Número de Clústeres (k)', 'y':'Silhouette Score'})
+            fig_silhouette = cached_figure('elbow', DATA_VERSION, model_filters, 'silhouette', lambda: px.line(x=k_range, y=silhouette_scores, title='Coeficiente de Silueta', markers=True, labels={'x':'Número de Clústeres (k)', 'y':'Silhouette Score'}))
             st.plotly_chart(fig_silhouette, use_container_width=True) #Gráfico del codo para el silhouette
         st.success(f"**Recomendación:** El número óptimo de clústeres según el Silhouette Score es **{recommended_k}**.")
 
     st.markdown("---")
     selected_k = st.slider("Selecciona el número de clústeres para visualizar:", min_value=1, max_value=8, value=recommended_k)
     
-    model_results_df = run_full_model(model_df, scaled_features, selected_k)
-    
-    plot_df = model_results_df.copy()
-    plot_df['cluster'] = plot_df['cluster'].astype(str)
-    fig_cluster = px.scatter( #Representación de jugadores por cluster sobre las 2 primeras componentes
-        plot_df, x='PC1', y='PC2', color='cluster', hover_name='player_name',
-        hover_data={'team': True, 'cluster': True, 'PC1': False, 'PC2': False},
-        title=f'Clústeres de {selected_position} ({selected_year}) con k={selected_k}'
-    )
-    fig_cluster.update_layout(xaxis_title="Componente Principal 1", yaxis_title="Componente Principal 2", legend_title_text='Clúster')
+    model_results_df = run_full_model(model_df, scaled_features, selected_k, model, model_filters)
+    fig_cluster = cached_figure('cluster_scatter', DATA_VERSION, model_filters, selected_k, lambda: cluster_figure(model_results_df, selected_position, selected_year, selected_k, model)) #Representación de jugadores por cluster sobre las 2 primeras componentes
     st.plotly_chart(fig_cluster, use_container_width=True)
+    st.caption("Las componentes principales se ajustan una sola vez por posición con todas las temporadas, así que los ejes son comparables entre años y filtros.")
 
     st.markdown("---")
     st.subheader("Caracterización de Arquetipos") #Tabla con las estadísticas medias de cada cluster
     st.markdown("La siguiente tabla muestra el valor medio de cada métrica para los jugadores de cada clúster, permitiendo definir cada arquetipo.")
     cluster_summary = model_results_df.groupby('cluster')[features].mean().T
-    st.dataframe(cluster_summary.style.format("{:.2f}").background_gradient(cmap='Blues', axis=1)) #Escala de color azul gradual
+    consensus_mode = st.toggle("Modo consenso (estabilidad de los arquetipos)", help=f"Repite K-Means {N_RUNS} veces sobre submuestras del {int(SUBSAMPLE * 100)}% de los jugadores y mide con qué frecuencia cada jugador sigue agrupado con los de su clúster.", disabled=selected_k < 2)
+    if consensus_mode and selected_k >= 2:
+        player_stability, cluster_robustness = run_consensus(model_filters, selected_k, N_RUNS, DATA_VERSION, scaled_features, model_results_df['cluster'].to_numpy())
+        col_summary, col_robustness = st.columns([3, 1])
+        with col_summary:
+            st.dataframe(cluster_summary.style.format("{:.2f}").background_gradient(cmap='Blues', axis=1))
+        with col_robustness:
+            st.dataframe(cluster_robustness.style.format({'robustness': "{:.0%}"}).background_gradient(cmap='Greens', subset=['robustness'], vmin=0, vmax=1)
+                         .relabel_index(['Clúster', 'Jugadores', 'Robustez'], axis=1), hide_index=True)
+        stability_df = model_results_df[['player_name', 'team', 'cluster']].assign(stability=player_stability).sort_values('stability')
+        st.markdown("**Jugadores con asignación menos estable** (comparten clúster con sus compañeros de arquetipo en menos ajustes):")
+        st.dataframe(stability_df.head(10).style.format({'stability': "{:.0%}"}).background_gradient(cmap='RdYlGn', subset=['stability'], vmin=0, vmax=1)
+                     .relabel_index(['Jugador', 'Equipo', 'Clúster', 'Estabilidad'], axis=1), hide_index=True)
+    else:
+        st.dataframe(cluster_summary.style.format("{:.2f}").background_gradient(cmap='Blues', axis=1)) #Escala de color azul gradual
+    assignments_df = model_results_df.drop(columns=['PC1', 'PC2']).assign(PC1=model_results_df['PC1'], PC2=model_results_df['PC2']) #Asignación de cada jugador (con sus coordenadas)
+    if consensus_mode and selected_k >= 2:
+        assignments_df['stability'] = player_stability
+    export_button(assignments_df, f"clusters_{selected_position}_{selected_year}_k{selected_k}", 'cluster_export', label="📥 Exportar Asignaciones")
 
 
 with tab2: #Similitud
     st.header(f"Buscador de Jugadores Similares ({selected_position} en {selected_year})")
     st.markdown("Selecciona un jugador para encontrar los perfiles estadísticos más parecidos en la liga.")
 
-    player_list = sorted(model_df['player_name'].unique())
-    selected_player = st.selectbox("Selecciona un jugador:", player_list)
+    labels = player_labels(model_df)
+    player_rows = pd.Series(model_df.index, index=model_df['player_id']) #player_id -> fila de la matriz escalada
+    search_index = load_search_index('detailed_player_stats_advanced_2020-2024.csv')
+    query = st.text_input("Buscar jugador:", placeholder="Escribe parte del nombre...")
+    in_model, elsewhere = split_search_results(search_index, query, set(player_rows.index), POSITION_GROUPS[selected_position])
+    if elsewhere:
+        st.caption("Fuera de los filtros actuales: " + ", ".join(format_entry(entry) for entry in elsewhere[:3]))
+    selected_player_id = st.selectbox("Selecciona un jugador:", [entry[0] for entry in in_model], format_func=labels.get)
 
-    if selected_player and selected_player in model_df['player_name'].values:
-        player_index = model_df[model_df['player_name'] == selected_player].index[0]
-        player_vector = scaled_features[player_index].reshape(1, -1) #Vector 2D (1, n)
-        distances = euclidean_distances(scaled_features, player_vector) #Distancias euclideas del resto de jugadores al jugador seleccionado
-        
-        similarity_df = model_df.copy()
-        similarity_df['distance'] = distances
-        similarity_df['similarity_score'] = (1 / (1 + similarity_df['distance'])) * 100 #Formula de similitud (de 1 a 100) en función de la distancia (cuanto más cerca mayor similitud)
-        
-        similar_players = similarity_df[similarity_df['player_name'] != selected_player].sort_values(by='distance', ascending=True)
+    with st.expander("⚖️ Ponderación de las métricas"):
+        st.markdown("Da más o menos peso a cada métrica en la similitud (0 la ignora). Los pesos se aplican sobre las características ya estandarizadas, así que el ranking se recalcula al instante sin reajustar el modelo.")
+        weight_columns = st.columns(3)
+        feature_weights = [weight_columns[i % 3].slider(feature, 0.0, 3.0, 1.0, 0.25, key=f'weight_{selected_position}_{feature}') for i, feature in enumerate(features)]
+
+    if not any(feature_weights):
+        st.warning("Todas las métricas tienen peso 0. Da peso a al menos una métrica para calcular la similitud.")
+    elif selected_player_id is not None and selected_player_id in player_rows.index:
+        selected_player = labels[selected_player_id]
+        player_index = player_rows[selected_player_id]
+        exclude = np.flatnonzero(model_df['player_id'].to_numpy() == selected_player_id) #Otras filas del mismo jugador (vista de carrera)
+        rows, distances = weighted_neighbours(scaled_features, [player_index], feature_weights, k=10, exclude=exclude)
+        rows, distances = rows[0][np.isfinite(distances[0])], distances[0][np.isfinite(distances[0])]
+
+        similar_players = model_df.iloc[rows].assign(distance=distances)
+        similar_players['similarity_score'] = (1 / (1 + similar_players['distance'])) * 100 #Formula de similitud (de 1 a 100) en función de la distancia (cuanto más cerca mayor similitud)
 
         st.markdown("---")
         st.subheader(f"Top 10 Jugadores más similares a {selected_player}:") #Tabla con los 10 jugadores más similares
         
         display_cols = ['player_name', 'team', 'similarity_score'] + features
         st.dataframe(
-            similar_players[display_cols].head(10).style.format({'similarity_score': "{:.1f}%"}, subset=['similarity_score'])
+            similar_players[display_cols].style.format({'similarity_score': "{:.1f}%"}, subset=['similarity_score'])
                                                           .format("{:.2f}", subset=features)
                                                           .background_gradient(cmap='Greens', subset=['similarity_score']) #Score de similitud en escala gradual de verdes
         )
+        export_button(similar_players[display_cols], f"similares_{selected_player_id}_{selected_year}", 'similarity_export', label="📥 Exportar Similares")
     else:
         st.warning("El jugador seleccionado no se encuentra en el conjunto de datos filtrado. Por favor, selecciona otro jugador.")
 
+# --- Precarga de las vistas contiguas ---
+prefetch_tasks = []
+if not career_view: #Las vistas contiguas son por temporada
+    prefetch_tasks += [(PRIORITY_ADJACENT_SEASON, prefetch_view(year, selected_position, min_attempts, model_store, matrices)) for year in (selected_year - 1, selected_year + 1) if year in years]
+    prefetch_tasks += [(PRIORITY_OTHER_POSITION, prefetch_view(selected_year, position, PARTICIPATION[position][1], model_store, matrices)) for position in MODEL_FEATURES if position != selected_position]
+    if min_attempts != PARTICIPATION[selected_position][1]:
+        prefetch_tasks.append((PRIORITY_DEFAULT_THRESHOLD, prefetch_view(selected_year, selected_position, PARTICIPATION[selected_position][1], model_store, matrices)))
+prefetcher.schedule(prefetch_scope, prefetch_tasks)
+show_prefetch_stats()
 
 st.divider()
 col3, col4, col5 = st.columns(3)
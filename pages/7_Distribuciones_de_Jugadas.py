@@ -0,0 +1,186 @@
+# Imporamos las librerías
+import streamlit as st
+import pandas as pd
+import numpy as np
+import os
+from utils.search import PlayerSearchIndex, split_search_results, format_entry
+from utils.distributions import DistributionStore, EPA_BINS, YARDS_BINS, FIELD_BINS, FIELD_EPA_BINS, bin_centers, histogram_summary
+from utils.charts import cached_figure, data_version
+
+# --- Configuración de la Página ---
+st.set_page_config(
+    page_title="Distribuciones de Jugadas",
+    page_icon="📉",
+    layout="wide"
+)
+
+DISTRIBUTIONS_FILE = 'play_distributions_2020-2024.csv'
+PLAYER_FILE = 'detailed_player_stats_advanced_2020-2024.csv'
+DATA_VERSION = data_version(DISTRIBUTIONS_FILE)
+
+# --- Carga de Datos ---
+@st.cache_data
+def load_data(file_path):
+    if os.path.exists(file_path):
+        return pd.read_csv(file_path)
+    else:
+        st.error(f"Error: No se encontró el fichero en la ruta: {file_path}")
+        return None
+
+@st.cache_resource
+def load_distribution_store(file_path):
+    """Conteos por bin precalculados en Data_extraction.py, separados por tipo de entidad e histograma."""
+    return DistributionStore(load_data(file_path))
+
+@st.cache_resource
+def load_search_index(file_path):
+    """Índice de búsqueda de jugadores sobre todas las temporadas (se construye una sola vez)."""
+    return PlayerSearchIndex(load_data(file_path))
+
+# --- Título Principal ---
+st.title("📉 Distribuciones de Jugadas")
+st.markdown("Explora cómo se reparten el EPA y las yardas de cada jugada de un equipo o jugador, y en qué zonas del campo genera (o pierde) valor, frente al conjunto de la liga.")
+st.divider()
+
+if not os.path.exists(DISTRIBUTIONS_FILE):
+    st.warning(f"No se encontró el fichero '{DISTRIBUTIONS_FILE}'. Ejecuta Data_extraction.py para generar las distribuciones de jugadas.")
+    st.stop()
+
+store = load_distribution_store(DISTRIBUTIONS_FILE)
+
+# --- Filtros ---
+entity_types = {'Equipos': 'team', 'Pasadores': 'passer', 'Corredores': 'rusher', 'Receptores': 'receiver'}
+play_type_options = {'Pase y Carrera': ['pass', 'run'], 'Pase': ['pass'], 'Carrera': ['run']}
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    selected_entity_type = st.selectbox("Tipo de Entidad:", list(entity_types.keys()))
+entity_type = entity_types[selected_entity_type]
+with col2:
+    season_options = store.years() #Temporadas presentes en el fichero de distribuciones
+    year_range = st.select_slider("Rango de Temporadas:", options=season_options, value=(season_options[0], season_options[-1]))
+years = [year for year in season_options if year_range[0] <= year <= year_range[1]]
+with col3:
+    if entity_type == 'team':
+        selected_play_type = st.selectbox("Tipo de Jugada:", list(play_type_options.keys()))
+    else:
+        selected_play_type = {'passer': 'Pase', 'rusher': 'Carrera', 'receiver': 'Pase'}[entity_type]
+        st.selectbox("Tipo de Jugada:", [selected_play_type], disabled=True)
+play_types = play_type_options[selected_play_type]
+
+available = set(store.entities(entity_type))
+if entity_type == 'team':
+    teams = sorted(available)
+    selected_entities = st.multiselect("Selecciona los Equipos (se combinan en una sola distribución):", teams, default=[team for team in ['KC'] if team in teams])
+    selection_label = ', '.join(selected_entities)
+else:
+    search_index = load_search_index(PLAYER_FILE)
+    query = st.text_input("Buscar Jugador:", placeholder="Escribe parte del nombre...")
+    positions = {entry[2] for entry in search_index.entries}
+    found_players, _ = split_search_results(search_index, query, available, positions)
+
+    # Los ya seleccionados se mantienen aunque no aparezcan en la búsqueda actual
+    if 'distribution_players' not in st.session_state:
+        st.session_state['distribution_players'] = found_players[:1]
+    selected_entries = [entry for entry in st.session_state['distribution_players'] if entry[0] in available]
+    options = list(dict.fromkeys(selected_entries + found_players))
+    st.session_state['distribution_players'] = selected_entries
+    selected_entries = st.multiselect("Selecciona los Jugadores (se combinan en una sola distribución):", options, format_func=format_entry, key='distribution_players')
+    selected_entities = [entry[0] for entry in selected_entries]
+    selection_label = ', '.join(entry[1] for entry in selected_entries)
+
+if not selected_entities:
+    st.warning("Por favor, selecciona al menos un equipo o jugador.")
+    st.stop()
+
+view_filters = (entity_type, tuple(sorted(selected_entities)), tuple(years), tuple(play_types))
+
+# --- Combinación de histogramas (suma de conteos precalculados) ---
+selection_epa = store.merge(entity_type, 'epa', selected_entities, years, play_types)
+league_epa = store.merge(entity_type, 'epa', None, years, play_types)
+selection_yards = store.merge(entity_type, 'yards', selected_entities, years, play_types)
+league_yards = store.merge(entity_type, 'yards', None, years, play_types)
+
+if selection_epa.sum() == 0:
+    st.warning("No hay jugadas para la selección en el rango de temporadas elegido.")
+    st.stop()
+
+# --- KPIs ---
+epa_summary = histogram_summary(selection_epa, EPA_BINS)
+league_epa_summary = histogram_summary(league_epa, EPA_BINS)
+yards_summary = histogram_summary(selection_yards, YARDS_BINS)
+kpi1, kpi2, kpi3, kpi4 = st.columns(4)
+kpi1.metric("Jugadas", f"{epa_summary['plays']:,}")
+kpi2.metric("EPA Medio (aprox.)", f"{epa_summary['mean']:.3f}", delta=f"{epa_summary['mean'] - league_epa_summary['mean']:.3f} vs. liga")
+kpi3.metric("% Jugadas con EPA > 0", f"{100 * selection_epa[bin_centers(EPA_BINS) > 0].sum() / epa_summary['plays']:.1f}%")
+kpi4.metric("Yardas Medianas (aprox.)", f"{yards_summary['median']:.0f}")
+st.caption("Las medias y medianas se calculan a partir de los centros de los bins, por lo que son aproximadas.")
+
+
+# --- Función para crear histogramas ---
+def create_histogram(selection_counts, league_counts, edges, metric_name):
+    """Histograma normalizado de la selección frente a la distribución de toda la liga."""
+    import plotly.graph_objects as go #Importación diferida (arranque más rápido)
+
+    centers = bin_centers(edges)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=centers, y=100 * selection_counts / max(selection_counts.sum(), 1), width=np.diff(edges), name=selection_label, marker_color='#013369', opacity=0.8))
+    fig.add_trace(go.Scatter(x=centers, y=100 * league_counts / max(league_counts.sum(), 1), mode='lines', name='Liga', line=dict(color='#D50A0A', width=2)))
+    fig.update_layout(
+        title=f'Distribución de {metric_name}',
+        xaxis_title=metric_name,
+        yaxis_title='% de Jugadas',
+        plot_bgcolor='rgba(0,0,0,0)',
+        bargap=0,
+        yaxis=dict(showgrid=True, gridcolor='lightgrey'),
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1)
+    )
+    return fig
+
+
+col_epa, col_yards = st.columns(2)
+with col_epa:
+    fig = cached_figure('epa_histogram', DATA_VERSION, view_filters, 'epa', lambda: create_histogram(selection_epa, league_epa, EPA_BINS, 'EPA por Jugada'))
+    st.plotly_chart(fig, use_container_width=True)
+with col_yards:
+    fig = cached_figure('yards_histogram', DATA_VERSION, view_filters, 'yards', lambda: create_histogram(selection_yards, league_yards, YARDS_BINS, 'Yardas Ganadas'))
+    st.plotly_chart(fig, use_container_width=True)
+
+
+# --- Mapa de densidad 2-D: posición en el campo x EPA ---
+st.subheader("🗺️ EPA según la Posición en el Campo")
+
+def build_field_heatmap():
+    import plotly.graph_objects as go
+
+    counts = store.merge(entity_type, 'field_epa', selected_entities, years, play_types)
+    share = 100 * counts / counts.sum(axis=1, keepdims=True).clip(min=1) #% de jugadas de cada zona del campo
+    fig = go.Figure(go.Heatmap(
+        x=bin_centers(FIELD_EPA_BINS),
+        y=bin_centers(FIELD_BINS),
+        z=share,
+        colorscale='Blues',
+        colorbar=dict(title='% de la zona'),
+        customdata=np.repeat(counts.sum(axis=1, keepdims=True), counts.shape[1], axis=1),
+        hovertemplate='Yardas hasta la end zone: %{y}<br>EPA: %{x}<br>%{z:.1f}% de %{customdata} jugadas<extra></extra>'
+    ))
+    fig.update_layout(
+        xaxis_title='EPA por Jugada',
+        yaxis_title='Yardas hasta la End Zone',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+st.plotly_chart(cached_figure('field_epa_heatmap', DATA_VERSION, view_filters, 'field_epa', build_field_heatmap), use_container_width=True)
+
+st.divider()
+col3, col4, col5 = st.columns(3)
+with col3:
+    st.image('./Images/logo_sdc.png', width=250)
+with col4:
+    st.image('./Images/logo_nfl.png', width=120)
+with col5:
+    st.image('./Images/logo_ucam.jpg', width=100)
+st.caption('Trabajo de Fin de Master - Master en Big Data Deportivo')
+st.caption('NFL Analytics Hub')
+st.caption('Juan Marcos Díaz')
@@ -0,0 +1,119 @@
+# Imporamos las librerías
+import streamlit as st
+import pandas as pd
+import os
+from utils.charts import cached_figure, data_version
+from utils.simulation import (team_strengths, rotation_schedule, games_schedule, simulate_season,
+                              N_SIMULATIONS, REGRESSION_TO_MEAN, MARGIN_SD, N_DIVISION_WINNERS, N_WILD_CARDS)
+
+# --- Configuración de la Página ---
+st.set_page_config(
+    page_title="Simulador de Temporada",
+    page_icon="🎲",
+    layout="wide"
+)
+
+TEAM_GAMES_FILE = 'team_game_stats_2020-2024.csv' #Fichero opcional generado por Data_extraction.py
+DATA_VERSION = data_version('offensive_team_stats_advanced_2020-2024.csv', 'defensive_team_stats_advanced_2020-2024.csv', TEAM_GAMES_FILE)
+
+# --- Carga de Datos ---
+@st.cache_data
+def load_data(file_path):
+    if os.path.exists(file_path):
+        return pd.read_csv(file_path)
+    else:
+        st.error(f"Error: No se encontró el fichero en la ruta: {file_path}")
+        return None
+
+offensive_df = load_data('offensive_team_stats_advanced_2020-2024.csv')
+defensive_df = load_data('defensive_team_stats_advanced_2020-2024.csv')
+team_games = load_data(TEAM_GAMES_FILE) if os.path.exists(TEAM_GAMES_FILE) else None
+
+@st.cache_data
+def run_simulation(year, mode, from_week, n_simulations, version):
+    """Simulación cacheada por entrada (temporada, modo, semana, nº de simulaciones y versión de los datos)."""
+    strengths = team_strengths(offensive_df, defensive_df, year, team_games, from_week=from_week if mode == 'remaining' else None)
+    if mode == 'projection': #Temporada siguiente: la fuerza regresa parcialmente a la media
+        strengths = strengths * (1 - REGRESSION_TO_MEAN)
+        return simulate_season(rotation_schedule(year + 1, strengths), strengths, n_simulations)
+    if team_games is not None and (team_games['year'] == year).any():
+        schedule = games_schedule(team_games, year) #Calendario real
+    else:
+        schedule = rotation_schedule(year, strengths)
+    return simulate_season(schedule, strengths, n_simulations, from_week=from_week if mode == 'remaining' else None)
+
+# --- Título Principal ---
+st.title("🎲 Simulador de Temporada")
+st.markdown("Simula miles de temporadas a partir de la fuerza de cada equipo y estima sus probabilidades de ganar la división, entrar en playoffs y obtener cada cabeza de serie.")
+st.divider()
+
+if offensive_df is None or defensive_df is None:
+    st.warning("No se pudieron cargar los datos. Por favor, verifica la ruta de los ficheros CSV.")
+    st.stop()
+
+# --- Filtros ---
+years = sorted(offensive_df['year'].unique(), reverse=True)
+mode_options = {'Temporada completa': 'full', 'Proyección de la temporada siguiente': 'projection'}
+if team_games is not None:
+    mode_options['Partidos restantes desde una semana'] = 'remaining' #Requiere los resultados reales de cada partido
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    selected_year = st.selectbox("Selecciona una Temporada:", years)
+with col2:
+    selected_mode = st.selectbox("Tipo de Simulación:", list(mode_options.keys()))
+with col3:
+    n_simulations = st.select_slider("Número de Simulaciones:", options=[10_000, 25_000, 50_000, N_SIMULATIONS], value=N_SIMULATIONS)
+
+mode = mode_options[selected_mode]
+from_week = None
+if mode == 'remaining':
+    from_week = st.slider("Simular desde la semana:", 1, int(team_games.loc[team_games['year'] == selected_year, 'week'].max()), 10)
+
+if mode == 'projection':
+    st.caption(f"Calendario de {selected_year + 1} con la fórmula de rotación de la NFL y la fuerza de {selected_year} regresada un {int(REGRESSION_TO_MEAN * 100)}% hacia la media.")
+elif team_games is None:
+    st.caption("Sin el fichero de partidos, el calendario se genera con la fórmula de rotación de la NFL y la fuerza se estima con la diferencia de TDs por partido.")
+
+simulation_df = run_simulation(selected_year, mode, from_week, n_simulations, DATA_VERSION)
+simulation_filters = (selected_year, mode, from_week, n_simulations)
+
+# --- Resultados por Conferencia ---
+seed_cols = [f'seed_{s}_prob' for s in range(1, N_DIVISION_WINNERS + N_WILD_CARDS + 1)]
+column_names = {'team': 'Equipo', 'division': 'División', 'strength': 'Fuerza (pts/partido)', 'expected_wins': 'Victorias Esperadas',
+                'division_prob': '% División', 'playoff_prob': '% Playoffs', 'seed_1_prob': '% Cabeza de Serie 1'}
+
+def build_seed_chart(conference_df, conference):
+    """Barras apiladas con la probabilidad de cada cabeza de serie por equipo."""
+    import plotly.express as px #Importación diferida (arranque más rápido)
+    chart_data = conference_df.melt(id_vars='team', value_vars=seed_cols, var_name='seed', value_name='prob')
+    chart_data['seed'] = chart_data['seed'].str.extract(r'(\d)')[0].map(lambda s: f'Seed {s}')
+    fig = px.bar(chart_data, x='prob', y='team', color='seed', orientation='h', labels={'prob': '% de Simulaciones', 'team': 'Equipo', 'seed': ''},
+                 category_orders={'team': conference_df['team'].tolist()}, color_discrete_sequence=px.colors.sequential.Blues_r)
+    fig.update_layout(title=f'Cabezas de Serie - {conference}', plot_bgcolor='rgba(0,0,0,0)', xaxis=dict(range=[0, 100], showgrid=True, gridcolor='lightgrey'), height=550, barmode='stack')
+    return fig
+
+for tab, conference in zip(st.tabs(sorted(simulation_df['conference'].unique())), sorted(simulation_df['conference'].unique())):
+    with tab:
+        conference_df = simulation_df[simulation_df['conference'] == conference].sort_values('playoff_prob', ascending=False)
+        col_table, col_chart = st.columns([3, 2], gap="large")
+        with col_table:
+            st.dataframe(conference_df[list(column_names)].style.format({col: "{:.1f}" for col in ['strength', 'expected_wins', 'division_prob', 'playoff_prob', 'seed_1_prob']})
+                         .background_gradient(cmap='Greens', subset=['playoff_prob', 'division_prob']).relabel_index(list(column_names.values()), axis=1), hide_index=True, height=600)
+        with col_chart:
+            fig = cached_figure('seed_chart', DATA_VERSION, simulation_filters, conference, lambda: build_seed_chart(conference_df, conference))
+            st.plotly_chart(fig, use_container_width=True)
+
+st.caption(f"Desempates aproximados: victorias, victorias de división y fuerza del equipo. La probabilidad de cada partido se obtiene del margen esperado (diferencia de fuerzas + ventaja de campo) con una desviación típica de {MARGIN_SD} puntos.")
+
+st.divider()
+col3, col4, col5 = st.columns(3)
+with col3:
+    st.image('./Images/logo_sdc.png', width=250)
+with col4:
+    st.image('./Images/logo_nfl.png', width=120)
+with col5:
+    st.image('./Images/logo_ucam.jpg', width=100)
+st.caption('Trabajo de Fin de Master - Master en Big Data Deportivo')
+st.caption('NFL Analytics Hub')
+st.caption('Juan Marcos Díaz')
@@ -0,0 +1,106 @@
+# Importamos las librerías
+import streamlit as st
+import pandas as pd
+import os
+from utils.players import POSITION_GROUPS
+from utils.charts import data_version
+from utils.export import export_button
+from utils.screener import ScreenerIndex
+
+# --- Configuración de la Página ---
+st.set_page_config(
+    page_title="Buscador de Jugadores",
+    page_icon="🔎",
+    layout="wide"
+)
+
+# --- Carga de Datos ---
+@st.cache_data
+def load_data(file_path):
+    if os.path.exists(file_path):
+        return pd.read_csv(file_path)
+    else:
+        st.error(f"Error: No se encontró el fichero en la ruta: {file_path}")
+        return None
+
+player_df_raw = load_data('detailed_player_stats_advanced_2020-2024.csv')
+DATA_VERSION = data_version('detailed_player_stats_advanced_2020-2024.csv')
+
+@st.cache_resource
+def load_screener_index(version):
+    """Índices ordenados de todas las columnas numéricas (se construyen una sola vez por versión de los datos)."""
+    return ScreenerIndex(player_df_raw)
+
+# --- Título Principal ---
+st.title("🔎 Buscador de Jugadores")
+st.markdown("Combina tantas condiciones como quieras sobre cualquier estadística (por ejemplo, targets ≥ 80, RACR ≥ 1.1 y EPA de recepción ≥ 20) y encuentra los jugador-temporadas que las cumplen todas.")
+st.divider()
+
+if player_df_raw is None:
+    st.warning("No se pudieron cargar los datos.")
+    st.stop()
+
+screener = load_screener_index(DATA_VERSION)
+
+# --- Barra Lateral de Filtros ---
+st.sidebar.header("Filtros Generales")
+years = sorted(player_df_raw['year'].unique())
+start_year, end_year = st.sidebar.select_slider('Rango de Temporadas', options=years, value=(years[0], years[-1]))
+selected_groups = st.sidebar.multiselect('Posiciones', list(POSITION_GROUPS), default=list(POSITION_GROUPS))
+
+# --- Condiciones ---
+st.subheader("Condiciones")
+st.markdown("Añade, edita o elimina filas: cada fila es una condición `mínimo ≤ métrica ≤ máximo` (deja un extremo vacío para no acotarlo).")
+metric_options = [column for column in screener.columns if column != 'year']
+default_conditions = pd.DataFrame({
+    'Métrica': ['targets', 'racr', 'receiving_epa'],
+    'Mínimo': [80.0, 1.1, 20.0],
+    'Máximo': [None, None, None]
+})
+conditions_df = st.data_editor(
+    default_conditions, num_rows='dynamic', use_container_width=True, hide_index=True, key='screener_conditions',
+    column_config={
+        'Métrica': st.column_config.SelectboxColumn('Métrica', options=metric_options, required=True),
+        'Mínimo': st.column_config.NumberColumn('Mínimo', format="%.2f"),
+        'Máximo': st.column_config.NumberColumn('Máximo', format="%.2f")
+    }
+)
+
+conditions = [('year', start_year, end_year)]
+for metric, low, high in conditions_df[['Métrica', 'Mínimo', 'Máximo']].itertuples(index=False, name=None):
+    if metric in metric_options and not (pd.isna(low) and pd.isna(high)): #Filas incompletas o sin límites: se ignoran
+        conditions.append((metric, None if pd.isna(low) else low, None if pd.isna(high) else high))
+positions = [position for group in selected_groups for position in POSITION_GROUPS[group]]
+
+# --- Resultados ---
+rows = screener.query(conditions, {'position': positions})
+condition_metrics = list(dict.fromkeys(metric for metric, _, _ in conditions[1:]))
+st.divider()
+st.subheader(f"Resultados: {len(rows)} jugador-temporadas")
+with st.expander("Jugador-temporadas que cumple cada condición por separado"):
+    st.dataframe(pd.DataFrame([{
+        'Condición': f"{'' if low is None else f'{low:g} ≤ '}{metric}{'' if high is None else f' ≤ {high:g}'}",
+        'Jugador-temporadas': screener.count(metric, low, high)
+    } for metric, low, high in conditions]), hide_index=True, use_container_width=True)
+
+if len(rows) == 0:
+    st.info("Ningún jugador cumple todas las condiciones. Prueba a relajar alguno de los límites.")
+else:
+    results_df = screener.df.iloc[rows][['player_name', 'position', 'team', 'year'] + condition_metrics]
+    if condition_metrics:
+        results_df = results_df.sort_values(condition_metrics[0], ascending=False)
+    st.dataframe(results_df, hide_index=True, use_container_width=True,
+                 column_config={'player_name': 'Jugador', 'position': 'Posición', 'team': 'Equipo', 'year': st.column_config.NumberColumn('Temporada', format="%d")})
+    export_button(results_df, f'buscador_jugadores_{start_year}-{end_year}', key='screener_export')
+
+st.divider()
+col3, col4, col5 = st.columns(3)
+with col3:
+    st.image('./Images/logo_sdc.png', width=250)
+with col4:
+    st.image('./Images/logo_nfl.png', width=120)
+with col5:
+    st.image('./Images/logo_ucam.jpg', width=100)
+st.caption('Trabajo de Fin de Master - Master en Big Data Deportivo')
+st.caption('NFL Analytics Hub')
+st.caption('Juan Marcos Díaz')
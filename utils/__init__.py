@@ -0,0 +1,3 @@
+"""
+Funciones auxiliares compartidas por el ETL (Data_extraction.py) y las páginas de la aplicación.
+"""
@@ -0,0 +1,65 @@
+# Importamos las librerías
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import lsqr
+
+# Métricas ajustadas por rival: nombre de la métrica -> columna de la tabla de partidos (se divide entre las jugadas)
+ADJUSTED_METRICS = {'yards_per_play': 'yards', 'epa_per_play': 'epa'}
+RIDGE_DAMP = 1.0 #Regularización suave: reparte la constante entre ataque y defensa y estabiliza equipos con pocos partidos
+
+
+def opponent_adjusted_ratings(team_games, value_col, weight_col='plays', damp=RIDGE_DAMP):
+    """
+    Resuelve a la vez, para todas las temporadas, el modelo por partido
+        valor/jugada = media de la temporada + ataque[equipo] + defensa[rival] + local x ventaja de campo
+    ponderado por el número de jugadas. Cada temporada es un bloque independiente de una única matriz
+    dispersa (una fila por equipo y partido) que se resuelve con mínimos cuadrados iterativos (LSQR)
+    """
+    games = team_games[team_games[weight_col] > 0]
+    years, year_idx = np.unique(games['year'].to_numpy(), return_inverse=True)
+    team_seasons = pd.MultiIndex.from_arrays([games['year'], games['team']]).unique()
+    off_idx = team_seasons.get_indexer(pd.MultiIndex.from_arrays([games['year'], games['team']]))
+    def_idx = team_seasons.get_indexer(pd.MultiIndex.from_arrays([games['year'], games['opponent']]))
+    n_rows, n_teams = len(games), len(team_seasons)
+
+    weights = games[weight_col].to_numpy(dtype=float)
+    y = games[value_col].to_numpy(dtype=float) / weights
+    season_mean = np.bincount(year_idx, weights * y) / np.bincount(year_idx, weights)
+    sqrt_w = np.sqrt(weights)
+
+    # Columnas: ataque por (temporada, equipo) | defensa por (temporada, equipo) | ventaja de campo por temporada
+    rows = np.repeat(np.arange(n_rows), 3)
+    cols = np.column_stack([off_idx, n_teams + np.where(def_idx >= 0, def_idx, 0), 2 * n_teams + year_idx]).ravel()
+    vals = np.column_stack([sqrt_w, np.where(def_idx >= 0, sqrt_w, 0), sqrt_w * games['home'].to_numpy(dtype=float)]).ravel()
+    design = sparse.csr_matrix((vals, (rows, cols)), shape=(n_rows, 2 * n_teams + len(years)))
+    coefs = lsqr(design, sqrt_w * (y - season_mean[year_idx]), damp=damp, atol=1e-10, btol=1e-10)[0]
+
+    team_years = team_seasons.get_level_values(0).to_numpy()
+    mean_by_team = season_mean[np.searchsorted(years, team_years)]
+    return pd.DataFrame({
+        'team': team_seasons.get_level_values(1), 'year': team_years,
+        'offense': mean_by_team + coefs[:n_teams], #Rendimiento esperado ante una defensa media en campo neutral
+        'defense': mean_by_team + coefs[n_teams:2 * n_teams], #Lo que concedería ante un ataque medio
+        'home_advantage': coefs[2 * n_teams + np.searchsorted(years, team_years)]
+    })
+
+
+def add_adjusted_columns(offensive_df, defensive_df, team_games):
+    """
+    Añade a las tablas de equipos el EPA por jugada y las métricas ajustadas por rival:
+    adj_<métrica> en la ofensiva y adj_<métrica>_allowed en la defensiva
+    """
+    totals = team_games.groupby(['team', 'year'])[['plays', 'epa']].sum()
+    allowed = team_games.groupby(['opponent', 'year'])[['plays', 'epa']].sum().rename_axis(['team', 'year'])
+    offense = (totals['epa'] / totals['plays']).rename('epa_per_play').to_frame()
+    defense = (allowed['epa'] / allowed['plays']).rename('epa_per_play_allowed').to_frame()
+
+    for metric, value_col in ADJUSTED_METRICS.items():
+        ratings = opponent_adjusted_ratings(team_games, value_col).set_index(['team', 'year'])
+        offense[f'adj_{metric}'] = ratings['offense']
+        defense[f'adj_{metric}_allowed'] = ratings['defense']
+
+    offensive_df = offensive_df.merge(offense.reset_index(), on=['team', 'year'], how='left')
+    defensive_df = defensive_df.merge(defense.reset_index(), on=['team', 'year'], how='left')
+    return offensive_df, defensive_df
@@ -0,0 +1,122 @@
+# Importamos las librerías
+import numpy as np
+import pandas as pd
+from utils.distributions import HISTOGRAM_KINDS, bin_centers
+from utils.parallel import run_in_chunks
+
+N_BOOTSTRAP = 1000 #Réplicas por métrica y temporada
+CONFIDENCE = 0.90 #Nivel de los intervalos
+CHUNK_SIZE = 250 #Réplicas por bloque (cada bloque tiene su propia semilla, el resultado no depende del número de procesos)
+PARALLEL_MIN_CELLS = 5_000_000 #Por debajo de este volumen (réplicas x entidades x bins) no compensa lanzar procesos
+
+
+def proportion_metric(successes, trials, scale=100):
+    """Métrica de proporción (p. ej. % de pases completados): se remuestrea con una binomial por entidad."""
+    return {'kind': 'proportion', 'successes': successes, 'trials': trials, 'scale': scale}
+
+
+def histogram_metric(entity_type, histogram, play_types, numerator=None, denominator=None):
+    """
+    Media por jugada remuestreada a partir de los histogramas precalculados (multinomial sobre los bins).
+    Si se indican numerador y denominador, el valor puntual es su cociente y el bootstrap aporta la dispersión
+    """
+    return {'kind': 'histogram', 'entity_type': entity_type, 'histogram': histogram, 'play_types': play_types, 'numerator': numerator, 'denominator': denominator}
+
+
+# Métricas con intervalo de confianza: columna de la tabla -> cómo se remuestrea
+TEAM_BOOTSTRAP_METRICS = {
+    'cmp_percentage': proportion_metric('pass_completions', 'pass_attempts'),
+    'yards_per_pass': histogram_metric('team', 'yards', ['pass'], 'passing_yards', 'pass_attempts'),
+    'epa_per_play': histogram_metric('team', 'epa', ['pass', 'run'])
+}
+
+PLAYER_BOOTSTRAP_METRICS = {
+    'QB': {
+        'cmp_percentage': proportion_metric('completions', 'attempts'),
+        'yards_per_attempt': histogram_metric('passer', 'yards', ['pass'], 'passing_yards', 'attempts'),
+        'epa_per_play': histogram_metric('passer', 'epa', ['pass'])
+    },
+    'RB': {
+        'yards_per_carry': histogram_metric('rusher', 'yards', ['run'], 'rushing_yards', 'carries'),
+        'epa_per_play': histogram_metric('rusher', 'epa', ['run'])
+    },
+    'Receptor': {
+        'catch_rate': proportion_metric('receptions', 'targets'),
+        'yards_per_target': histogram_metric('receiver', 'yards', ['pass'], 'receiving_yards', 'targets'),
+        'epa_per_play': histogram_metric('receiver', 'epa', ['pass'])
+    }
+}
+
+
+def available_metrics(metrics, store):
+    """Métricas que se pueden calcular: las de histograma solo si existen las distribuciones de jugadas."""
+    return {col: spec for col, spec in metrics.items() if spec['kind'] == 'proportion' or store is not None}
+
+
+# --- Bloques de réplicas (funciones de módulo para poder ejecutarlas en otros procesos) ---
+def _proportion_chunk(seed, size, successes, trials):
+    rng = np.random.default_rng(seed)
+    p = np.divide(successes, trials, out=np.zeros(len(trials)), where=trials > 0)
+    return rng.binomial(trials, p, size=(size, len(trials))) / np.where(trials > 0, trials, np.nan)
+
+
+def _histogram_chunk(seed, size, counts, centers):
+    rng = np.random.default_rng(seed)
+    n = counts.sum(axis=1)
+    p = counts / np.maximum(n, 1)[:, None]
+    p[n == 0, 0] = 1.0 #Entidades sin jugadas: distribución degenerada (su resultado se descarta con NaN)
+    draws = rng.multinomial(n, p, size=(size, len(n))) #(réplica x entidad x bin): remuestreo de las jugadas de cada entidad
+    return (draws @ centers) / np.where(n > 0, n, np.nan)
+
+
+def _run_chunks(worker, args, n_boot, seed, work_cells):
+    """Réplicas por bloques; solo se lanza un pool de procesos si el volumen lo justifica."""
+    return np.concatenate(run_in_chunks(worker, args, n_boot, CHUNK_SIZE, seed, parallel=work_cells >= PARALLEL_MIN_CELLS))
+
+
+def bootstrap_metric(spec, season_df, entity_col, store=None, year=None, n_boot=N_BOOTSTRAP, seed=0):
+    """
+    Valor puntual y réplicas bootstrap (réplica x entidad) de una métrica para todas las entidades
+    de una temporada a la vez. Devuelve (entidades, valor puntual, réplicas)
+    """
+    entities = season_df[entity_col].to_numpy()
+    if spec['kind'] == 'proportion':
+        successes = season_df[spec['successes']].fillna(0).to_numpy(dtype=np.int64)
+        trials = season_df[spec['trials']].fillna(0).to_numpy(dtype=np.int64)
+        draws = _run_chunks(_proportion_chunk, (successes, trials), n_boot, seed, n_boot * len(entities)) * spec['scale']
+        point = np.divide(successes, trials, out=np.full(len(trials), np.nan), where=trials > 0) * spec['scale']
+        return entities, point, draws
+
+    edges = HISTOGRAM_KINDS[spec['histogram']]
+    centers = bin_centers(edges)
+    counts = store.matrix(spec['entity_type'], spec['histogram'], list(entities), [year] if year is not None else None, spec['play_types'])
+    draws = _run_chunks(_histogram_chunk, (counts, centers), n_boot, seed, n_boot * counts.size)
+    n = counts.sum(axis=1)
+    histogram_mean = (counts @ centers) / np.where(n > 0, n, np.nan)
+    if spec['numerator'] is None:
+        return entities, histogram_mean, draws
+
+    # Valor puntual exacto de la tabla; el bootstrap aporta la dispersión alrededor de la media de los bins
+    point = (season_df[spec['numerator']] / season_df[spec['denominator']].replace(0, np.nan)).to_numpy(dtype=float)
+    return entities, point, draws - histogram_mean + point
+
+
+def interval_table(entities, point, draws, lower_is_better=False, confidence=CONFIDENCE):
+    """
+    Intervalo de confianza de cada entidad y el intervalo de su posición en la clasificación:
+    en cada réplica se ordenan todas las entidades a la vez (matriz réplica x entidad)
+    """
+    valid = ~np.isnan(point) & ~np.isnan(draws).any(axis=0)
+    entities, point, draws = np.asarray(entities)[valid], point[valid], draws[:, valid]
+    alpha = (1 - confidence) / 2
+    ci_low, ci_high = np.quantile(draws, [alpha, 1 - alpha], axis=0)
+
+    sign = 1 if lower_is_better else -1 #Posición 1 = mejor valor
+    ranks = (sign * draws).argsort(axis=1).argsort(axis=1) + 1
+    rank_low, rank_high = np.quantile(ranks, [alpha, 1 - alpha], axis=0)
+    point_rank = (sign * point).argsort().argsort() + 1
+
+    return pd.DataFrame({
+        'entity': entities, 'value': point, 'ci_low': ci_low, 'ci_high': ci_high,
+        'rank': point_rank, 'rank_low': np.floor(rank_low).astype(int), 'rank_high': np.ceil(rank_high).astype(int)
+    }).sort_values('rank').reset_index(drop=True)
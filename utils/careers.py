@@ -0,0 +1,62 @@
+# Importamos las librerías
+from utils.ranges import PLAYER_RATES, PLAYER_WEIGHTED, numeric_sum_columns, _ratio
+
+PEAK_METRIC = 'fantasy_points_ppr' #Métrica común a todas las posiciones para elegir la mejor temporada
+CAREER_ATTRIBUTES = ['player_name', 'position', 'team'] #Los de la última temporada
+
+
+def _season_components(player_df):
+    """Cada jugador-temporada como una carrera de una sola temporada: sumas, productos valor*peso, años y pico."""
+    sum_columns = numeric_sum_columns(player_df, list(PLAYER_RATES) + list(PLAYER_WEIGHTED))
+    weighted = {col: w for col, w in PLAYER_WEIGHTED.items() if col in player_df.columns and w in player_df.columns}
+    components = player_df[['player_id'] + sum_columns].copy()
+    components[sum_columns] = components[sum_columns].fillna(0)
+    for col, weight_col in weighted.items():
+        components[f'_weighted_{col}'] = player_df[col].fillna(0) * player_df[weight_col].fillna(0)
+    components['seasons'] = 1
+    components['first_year'] = components['last_year'] = components['peak_year'] = player_df['year']
+    components[f'peak_{PEAK_METRIC}'] = player_df[PEAK_METRIC].fillna(0)
+    for col in CAREER_ATTRIBUTES:
+        components[col] = player_df[col]
+    return components
+
+
+def _reduce(components):
+    """Una sola reducción agrupada por jugador; los ratios se recalculan a partir de las sumas."""
+    components = components.sort_values('last_year', kind='stable').reset_index(drop=True) #Los atributos 'last' son los de la temporada más reciente
+    peak_column = f'peak_{PEAK_METRIC}'
+    special = {'player_id', 'seasons', 'first_year', 'last_year', 'peak_year', peak_column, *CAREER_ATTRIBUTES}
+    sum_columns = [col for col in components.columns if col not in special]
+    aggregations = {col: (col, 'sum') for col in sum_columns}
+    aggregations.update({col: (col, 'last') for col in CAREER_ATTRIBUTES})
+    aggregations.update(seasons=('seasons', 'sum'), first_year=('first_year', 'min'), last_year=('last_year', 'max'), peak_row=(peak_column, 'idxmax'))
+    career_df = components.groupby('player_id', sort=False).agg(**aggregations)
+
+    peak_rows = career_df.pop('peak_row').to_numpy()
+    career_df['peak_year'] = components['peak_year'].to_numpy()[peak_rows]
+    career_df[peak_column] = components[peak_column].to_numpy()[peak_rows]
+    for col in [col for col in sum_columns if col.startswith('_weighted_')]:
+        name = col[len('_weighted_'):]
+        career_df[name] = _ratio(career_df.pop(col), career_df[PLAYER_WEIGHTED[name]])
+    for name, formula in PLAYER_RATES.items():
+        career_df[name] = formula(career_df)
+
+    front = CAREER_ATTRIBUTES + ['seasons', 'first_year', 'last_year', 'peak_year', peak_column]
+    career_df = career_df.reset_index()
+    return career_df[['player_id'] + front + [col for col in career_df.columns if col not in front and col != 'player_id']]
+
+
+def build_career_table(player_df):
+    """
+    Tabla de carreras: una fila por player_id con las estadísticas acumulables sumadas, los ratios recalculados
+    a partir de las sumas (o medias ponderadas), temporadas jugadas, primera y última temporada y mejor temporada
+    """
+    return _reduce(_season_components(player_df))
+
+
+def per_season(career_df, columns):
+    """Copia de la tabla con las columnas acumulables indicadas divididas entre las temporadas jugadas (los ratios no cambian)."""
+    career_df = career_df.copy()
+    counting = [col for col in columns if col not in PLAYER_RATES and col not in PLAYER_WEIGHTED]
+    career_df[counting] = career_df[counting].div(career_df['seasons'], axis=0)
+    return career_df
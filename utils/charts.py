@@ -0,0 +1,72 @@
+# Importamos las librerías
+import os
+import threading
+from collections import OrderedDict
+
+FIGURE_CACHE_SIZE = 256 #Número máximo de figuras (y resultados) guardados por proceso
+WEBGL_POINT_THRESHOLD = 1000 #A partir de este número de puntos los scatter se dibujan con WebGL
+
+_figure_cache = OrderedDict()
+_prefetched = set() #Entradas calculadas en segundo plano que aún no se han consultado
+_cache_lock = threading.Lock()
+cache_stats = {'hits': 0, 'misses': 0, 'prefetched': 0, 'prefetch_hits': 0}
+
+
+def data_version(*file_paths):
+    """Versión de los datos de origen (fecha de modificación y tamaño de cada fichero)."""
+    return tuple((os.path.getmtime(p), os.path.getsize(p)) if os.path.exists(p) else None for p in file_paths)
+
+
+def cached_result(kind, version, filters, metric, builder, prefetch=False):
+    """
+    Devuelve el resultado (figura, tabla, puntuaciones...) asociado a (tipo, versión de datos, filtros, métrica).
+    Si ya se calculó en este proceso se reutiliza; si no, se calcula con `builder()` y se guarda.
+    La caché es compartida por todas las sesiones y descarta los resultados menos usados (LRU).
+    Con prefetch=True (precarga en segundo plano) no cuenta en los aciertos y fallos de la vista actual
+    """
+    key = (kind, version, tuple(filters), metric)
+    with _cache_lock:
+        result = _figure_cache.get(key)
+        if result is not None:
+            _figure_cache.move_to_end(key)
+            if not prefetch:
+                cache_stats['hits'] += 1
+                if key in _prefetched: #La precarga acertó
+                    _prefetched.discard(key)
+                    cache_stats['prefetch_hits'] += 1
+            return result
+
+    result = builder()
+    with _cache_lock:
+        _figure_cache[key] = result
+        if prefetch:
+            _prefetched.add(key)
+            cache_stats['prefetched'] += 1
+        else:
+            cache_stats['misses'] += 1
+        while len(_figure_cache) > FIGURE_CACHE_SIZE:
+            evicted, _ = _figure_cache.popitem(last=False)
+            _prefetched.discard(evicted)
+    return result
+
+
+def cached_figure(chart_type, version, filters, metric, builder, prefetch=False):
+    """Figura de Plotly asociada a (tipo de gráfico, versión de datos, filtros, métrica), guardada en la caché de resultados."""
+    return cached_result(chart_type, version, filters, metric, builder, prefetch)
+
+
+def scatter_render_mode(n_points):
+    """Modo de dibujo de un scatter: WebGL para nubes grandes de puntos, SVG para el resto."""
+    return 'webgl' if n_points > WEBGL_POINT_THRESHOLD else 'svg'
+
+
+def radar_figure(axes, series, height=550):
+    """Radar de percentiles (0-100) con una traza por entidad; series es {nombre: percentiles en el orden de axes}."""
+    import plotly.graph_objects as go #Importación diferida (arranque más rápido)
+    fig = go.Figure()
+    opacity = 0.6 if len(series) <= 2 else 0.25 #Con muchas entidades el relleno se aclara para que se vean todas
+    for name, values in series.items():
+        fig.add_trace(go.Scatterpolar(r=list(values), theta=list(axes), fill='toself', opacity=opacity, name=name,
+                                      hovertemplate='<b>%{theta}</b><br>Percentil: %{r:.1f}<extra></extra>'))
+    fig.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0, 100])), showlegend=True, height=height)
+    return fig
@@ -0,0 +1,58 @@
+# Importamos las librerías
+import numpy as np
+import pandas as pd
+from utils.parallel import run_in_chunks
+
+N_RUNS = 100 #Ajustes de K-Means por consenso
+SUBSAMPLE = 0.8 #Fracción de jugadores de cada ajuste (submuestreo sin reemplazo)
+CHUNK_SIZE = 20 #Ajustes por bloque (cada bloque tiene su propia semilla)
+PARALLEL_MIN_WORK = 200_000 #Por debajo de este volumen (ajustes x jugadores) no compensa lanzar procesos
+
+
+def _consensus_chunk(seed, size, scaled_features, n_clusters):
+    """
+    Ajusta `size` K-Means sobre submuestras y devuelve, por pareja de jugadores, cuántas veces han caído
+    en el mismo clúster y cuántas veces han estado juntos en la submuestra
+    """
+    from sklearn.cluster import KMeans #Importación diferida: scikit-learn solo se carga al modelar
+    rng = np.random.default_rng(seed)
+    n = len(scaled_features)
+    together = np.zeros((n, n), dtype=np.int32)
+    sampled = np.zeros((n, n), dtype=np.int32)
+    for _ in range(size):
+        rows = np.sort(rng.choice(n, size=max(n_clusters, int(SUBSAMPLE * n)), replace=False))
+        labels = KMeans(n_clusters=n_clusters, n_init=1, random_state=int(rng.integers(2**31))).fit_predict(scaled_features[rows])
+        onehot = np.zeros((len(rows), n_clusters), dtype=np.int32)
+        onehot[np.arange(len(rows)), labels] = 1
+        together[np.ix_(rows, rows)] += onehot @ onehot.T #Mismo clúster en este ajuste
+        sampled[np.ix_(rows, rows)] += 1
+    return together, sampled
+
+
+def co_association(scaled_features, n_clusters, n_runs=N_RUNS, seed=0):
+    """Matriz de co-asociación: proporción de ajustes en que cada pareja (muestreada a la vez) comparte clúster."""
+    results = run_in_chunks(_consensus_chunk, (scaled_features, n_clusters), n_runs, CHUNK_SIZE, seed,
+                            parallel=n_runs * len(scaled_features) >= PARALLEL_MIN_WORK)
+    together = sum(result[0] for result in results)
+    sampled = sum(result[1] for result in results)
+    return np.divide(together, sampled, out=np.zeros(together.shape), where=sampled > 0)
+
+
+def stability_scores(matrix, labels):
+    """
+    Estabilidad de cada jugador (co-asociación media con los demás miembros de su clúster) y robustez de cada
+    clúster (co-asociación media entre sus miembros) para una asignación de referencia
+    """
+    labels = np.asarray(labels)
+    same = labels[:, None] == labels[None, :]
+    np.fill_diagonal(same, False)
+    members = same.sum(axis=1)
+    player_stability = np.divide((matrix * same).sum(axis=1), members, out=np.ones(len(labels)), where=members > 0) #Clúster de un solo jugador: estable por definición
+
+    clusters = np.unique(labels)
+    robustness = pd.DataFrame({
+        'cluster': clusters,
+        'players': [int((labels == c).sum()) for c in clusters],
+        'robustness': [player_stability[labels == c].mean() for c in clusters]
+    })
+    return player_stability, robustness
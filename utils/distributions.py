@@ -0,0 +1,118 @@
+# Importamos las librerías
+import numpy as np
+import pandas as pd
+
+# Bordes fijos de los histogramas (los valores fuera de rango se acumulan en los bins extremos)
+EPA_BINS = np.linspace(-8, 8, 65) #Bins de 0.25 EPA
+YARDS_BINS = np.arange(-15, 82, 1) #Bins de 1 yarda
+FIELD_BINS = np.arange(0, 105, 5) #Posición en el campo (yardas hasta la end zone), bins de 5 yardas
+FIELD_EPA_BINS = np.linspace(-8, 8, 33) #EPA del mapa de densidad 2-D, bins de 0.5
+
+# Histogramas disponibles: variable -> bordes (los 2-D combinan posición en el campo y EPA)
+HISTOGRAM_KINDS = {'epa': EPA_BINS, 'yards': YARDS_BINS, 'field_epa': (FIELD_BINS, FIELD_EPA_BINS)}
+
+# Columna del play by play que identifica a cada tipo de entidad
+ENTITY_COLUMNS = {'team': 'posteam', 'passer': 'passer_player_id', 'rusher': 'rusher_player_id', 'receiver': 'receiver_player_id'}
+
+
+def bin_index(values, edges):
+    """Índice de bin de cada valor (-1 si es nulo), acotando los valores extremos al primer/último bin."""
+    values = np.asarray(values, dtype=float)
+    idx = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, len(edges) - 2)
+    return np.where(np.isnan(values), -1, idx)
+
+
+def bin_centers(edges):
+    return (edges[:-1] + edges[1:]) / 2
+
+
+def build_play_distributions(pbp_data):
+    """
+    Precalcula los conteos por bin de EPA, yardas y del mapa 2-D (posición en el campo x EPA)
+    para cada (tipo de entidad, entidad, temporada, tipo de jugada). Solo se guardan los bins
+    con jugadas, de modo que el tamaño no depende del número de jugadas sino de los bins ocupados
+    """
+    plays = pbp_data[pbp_data['play_type'].isin(['pass', 'run'])].copy()
+    plays['epa_bin'] = bin_index(plays['epa'], EPA_BINS)
+    plays['yards_bin'] = bin_index(plays['yards_gained'], YARDS_BINS)
+    field_bin = bin_index(plays['yardline_100'], FIELD_BINS)
+    epa_bin_2d = bin_index(plays['epa'], FIELD_EPA_BINS)
+    plays['field_epa_bin'] = np.where((field_bin >= 0) & (epa_bin_2d >= 0), field_bin * (len(FIELD_EPA_BINS) - 1) + epa_bin_2d, -1) #Índice 2-D aplanado
+
+    frames = []
+    for entity_type, entity_col in ENTITY_COLUMNS.items():
+        if entity_col not in plays.columns:
+            continue
+        for kind in HISTOGRAM_KINDS:
+            bin_col = f'{kind}_bin'
+            subset = plays.loc[plays[entity_col].notna() & (plays[bin_col] >= 0), [entity_col, 'season', 'play_type', bin_col]]
+            counts = subset.groupby([entity_col, 'season', 'play_type', bin_col]).size().rename('count').reset_index()
+            counts = counts.rename(columns={entity_col: 'entity', bin_col: 'bin', 'season': 'year'})
+            counts.insert(0, 'kind', kind)
+            counts.insert(0, 'entity_type', entity_type)
+            frames.append(counts)
+    return pd.concat(frames, ignore_index=True)
+
+
+class DistributionStore:
+    """Conteos por bin separados por (tipo de entidad, histograma) para combinarlos al momento."""
+
+    def __init__(self, distributions_df):
+        self._tables = {key: table.reset_index(drop=True) for key, table in distributions_df.groupby(['entity_type', 'kind'])}
+
+    def entities(self, entity_type):
+        table = self._tables.get((entity_type, 'epa'))
+        return [] if table is None else sorted(table['entity'].unique())
+
+    def years(self):
+        return sorted({int(year) for table in self._tables.values() for year in table['year'].unique()})
+
+    def merge(self, entity_type, kind, entities=None, years=None, play_types=None):
+        """
+        Suma los conteos de las entidades, temporadas y tipos de jugada indicados (None = todos)
+        y devuelve el histograma denso (matriz 2-D para 'field_epa')
+        """
+        edges = HISTOGRAM_KINDS[kind]
+        shape = (len(edges[0]) - 1, len(edges[1]) - 1) if isinstance(edges, tuple) else (len(edges) - 1,)
+        table = self._tables.get((entity_type, kind))
+        counts = np.zeros(int(np.prod(shape)), dtype=np.int64)
+        if table is None:
+            return counts.reshape(shape)
+
+        mask = np.ones(len(table), dtype=bool)
+        if entities is not None:
+            mask &= table['entity'].isin(entities).to_numpy()
+        if years is not None:
+            mask &= table['year'].isin(years).to_numpy()
+        if play_types is not None:
+            mask &= table['play_type'].isin(play_types).to_numpy()
+        selected = table.loc[mask]
+        np.add.at(counts, selected['bin'].to_numpy(dtype=np.int64), selected['count'].to_numpy(dtype=np.int64)) #Combinación de histogramas = suma de conteos
+        return counts.reshape(shape)
+
+    def matrix(self, entity_type, kind, entities, years=None, play_types=None):
+        """Histograma 1-D de cada entidad por separado: matriz (entidad x bin), con ceros si no tiene jugadas."""
+        edges = HISTOGRAM_KINDS[kind]
+        counts = np.zeros((len(entities), len(edges) - 1), dtype=np.int64)
+        table = self._tables.get((entity_type, kind))
+        if table is None:
+            return counts
+
+        rows = pd.Index(entities).get_indexer(table['entity'])
+        mask = rows >= 0
+        if years is not None:
+            mask &= table['year'].isin(years).to_numpy()
+        if play_types is not None:
+            mask &= table['play_type'].isin(play_types).to_numpy()
+        np.add.at(counts, (rows[mask], table['bin'].to_numpy(dtype=np.int64)[mask]), table['count'].to_numpy(dtype=np.int64)[mask])
+        return counts
+
+
+def histogram_summary(counts, edges):
+    """Número de jugadas, media y mediana aproximadas a partir de un histograma 1-D."""
+    total = counts.sum()
+    if total == 0:
+        return {'plays': 0, 'mean': np.nan, 'median': np.nan}
+    centers = bin_centers(edges)
+    median_bin = np.searchsorted(np.cumsum(counts), total / 2)
+    return {'plays': int(total), 'mean': float((centers * counts).sum() / total), 'median': float(centers[median_bin])}
@@ -0,0 +1,142 @@
+# Importamos las librerías
+import threading
+import numpy as np
+import pandas as pd
+
+INITIAL_RATING = 1500
+K_FACTOR = 20
+HOME_FIELD_ELO = 48 #Ventaja de jugar en casa en puntos Elo (~1.5 puntos de marcador)
+SEASON_REGRESSION = 1 / 3 #Fracción del rating que vuelve a la media entre temporadas
+GAME_COLUMNS = ['year', 'week', 'home_team', 'away_team', 'home_points', 'away_points'] #Lo que determina el rating
+
+
+class EloRatings:
+    """
+    Rating Elo de los equipos partido a partido. Los ratings se guardan en un array y se actualizan
+    por semanas: dentro de una semana cada equipo juega normalmente una vez, así que todos los partidos
+    de la semana se actualizan a la vez con operaciones vectorizadas. El mismo método sirve para
+    construir toda la historia y para añadir solo las semanas nuevas sin recalcular lo anterior
+    """
+
+    def __init__(self, k_factor=K_FACTOR, home_field=HOME_FIELD_ELO, season_regression=SEASON_REGRESSION, initial_rating=INITIAL_RATING):
+        self.k_factor = k_factor
+        self.home_field = home_field
+        self.season_regression = season_regression
+        self.initial_rating = initial_rating
+        self._lock = threading.RLock() #La instancia se comparte entre sesiones (st.cache_resource)
+        self._reset()
+
+    def _reset(self):
+        self.teams = {} #Equipo -> posición en el array de ratings
+        self.ratings = np.empty(0)
+        self.last_played = None #(temporada, semana) del último partido procesado
+        self._history = []
+        self._processed = [] #Partidos procesados (GAME_COLUMNS), para detectar si cambian
+
+    def _team_index(self, teams):
+        for team in pd.unique(teams):
+            if team not in self.teams:
+                self.teams[team] = len(self.teams)
+                self.ratings = np.append(self.ratings, self.initial_rating)
+        return np.array([self.teams[team] for team in teams], dtype=int)
+
+    def update(self, games):
+        """
+        Procesa partidos (una fila por partido: year, week, home_team, away_team, home_points, away_points y
+        opcionalmente neutral) posteriores al último ya procesado. Devuelve el número de partidos añadidos
+        """
+        games = games.sort_values(['year', 'week']).reset_index(drop=True)
+        if games.empty:
+            return 0
+        with self._lock:
+            first = tuple(games[['year', 'week']].iloc[0])
+            if self.last_played is not None and first <= self.last_played:
+                raise ValueError(f"Los partidos deben ser posteriores a la última semana procesada {self.last_played}.")
+
+            home_idx = self._team_index(games['home_team'].to_numpy())
+            away_idx = self._team_index(games['away_team'].to_numpy())
+            margin = (games['home_points'] - games['away_points']).to_numpy(dtype=float)
+            home_field = np.where(games['neutral'].to_numpy(dtype=bool), 0, self.home_field) if 'neutral' in games.columns else np.full(len(games), self.home_field)
+            years, weeks = games['year'].to_numpy(), games['week'].to_numpy()
+            pre_home, pre_away = np.empty(len(games)), np.empty(len(games))
+            post_home, post_away = np.empty(len(games)), np.empty(len(games))
+
+            boundaries = np.flatnonzero(np.diff(years * 100 + weeks)) + 1 #Cortes entre semanas
+            last_year = self.last_played[0] if self.last_played is not None else None
+            for start, end in zip(np.r_[0, boundaries], np.r_[boundaries, len(games)]):
+                if last_year is not None and years[start] != last_year: #Nueva temporada: regresión a la media
+                    self.ratings += self.season_regression * (self.ratings.mean() - self.ratings)
+                last_year = years[start]
+
+                h, a = home_idx[start:end], away_idx[start:end]
+                pre_home[start:end], pre_away[start:end] = self.ratings[h], self.ratings[a]
+                diff = self.ratings[h] + home_field[start:end] - self.ratings[a]
+                expected = 1 / (1 + 10 ** (-diff / 400))
+                result = np.sign(margin[start:end]) * 0.5 + 0.5 #1 victoria local, 0.5 empate, 0 derrota
+                winner_diff = np.where(margin[start:end] >= 0, diff, -diff)
+                mov_multiplier = np.log(np.abs(margin[start:end]) + 1) * 2.2 / (winner_diff * 0.001 + 2.2) #Margen de victoria (corrige la autocorrelación de los favoritos)
+                shift = self.k_factor * mov_multiplier * (result - expected)
+                np.add.at(self.ratings, h, shift) #Acumula aunque un equipo aparezca dos veces en la semana (filas duplicadas o aplazadas)
+                np.add.at(self.ratings, a, -shift)
+                post_home[start:end], post_away[start:end] = self.ratings[h], self.ratings[a]
+
+            self.last_played = (int(years[-1]), int(weeks[-1]))
+            self._processed.append(games[GAME_COLUMNS])
+            self._history.append(pd.DataFrame({
+                'game_id': games['game_id'].to_numpy() if 'game_id' in games.columns else np.arange(len(games)),
+                'year': years, 'week': weeks,
+                'home_team': games['home_team'].to_numpy(), 'away_team': games['away_team'].to_numpy(),
+                'home_elo_pre': pre_home, 'away_elo_pre': pre_away, 'home_elo_post': post_home, 'away_elo_post': post_away
+            }))
+            return len(games)
+
+    def new_games(self, games):
+        """Partidos posteriores a la última semana procesada (los que faltan por añadir)."""
+        if self.last_played is None:
+            return games
+        return games[games['year'].gt(self.last_played[0]) | (games['year'].eq(self.last_played[0]) & games['week'].gt(self.last_played[1]))]
+
+    def update_new(self, games):
+        """Añade solo los partidos que faltan; el filtro y la actualización se hacen bajo el mismo cerrojo (sesiones concurrentes)."""
+        with self._lock:
+            return self.update(self.new_games(games))
+
+    def sync(self, games):
+        """
+        Pone el motor al día con la tabla completa de partidos: si los partidos ya procesados no han cambiado solo se
+        añaden las semanas nuevas; si han cambiado (marcadores corregidos, una temporada anterior añadida) se recalcula todo
+        """
+        with self._lock:
+            new_games = self.new_games(games)
+            if self._processed:
+                key = ['year', 'week', 'home_team']
+                seen = games.drop(new_games.index)[GAME_COLUMNS].sort_values(key).reset_index(drop=True)
+                processed = pd.concat(self._processed, ignore_index=True).sort_values(key).reset_index(drop=True)
+                if not seen.equals(processed):
+                    self._reset()
+                    new_games = games
+            return self.update(new_games)
+
+    @property
+    def history(self):
+        """Serie de ratings por equipo y partido (rating antes y después de cada partido)."""
+        if not self._history:
+            return pd.DataFrame(columns=['game_id', 'year', 'week', 'team', 'opponent', 'elo_pre', 'elo_post'])
+        games = pd.concat(self._history, ignore_index=True)
+        sides = []
+        for side, other in [('home', 'away'), ('away', 'home')]:
+            sides.append(games[['game_id', 'year', 'week']].assign(
+                team=games[f'{side}_team'], opponent=games[f'{other}_team'], elo_pre=games[f'{side}_elo_pre'], elo_post=games[f'{side}_elo_post']))
+        return pd.concat(sides, ignore_index=True).sort_values(['year', 'week', 'team']).reset_index(drop=True)
+
+    def current(self):
+        """Rating actual de cada equipo, de mayor a menor."""
+        return pd.Series(self.ratings, index=list(self.teams), name='elo').sort_values(ascending=False)
+
+
+def build_elo(team_games, **params):
+    """Construye el Elo de toda la historia de la tabla de partidos por equipo."""
+    from utils.games import game_results
+    elo = EloRatings(**params)
+    elo.update(game_results(team_games))
+    return elo
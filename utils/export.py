@@ -0,0 +1,56 @@
+# Importamos las librerías
+import tempfile
+import streamlit as st
+
+CHUNK_ROWS = 50_000 #Filas por bloque al escribir
+SPOOL_MAX_SIZE = 32 * 1024 * 1024 #Por encima de este tamaño el fichero se vuelca a disco en lugar de quedarse en memoria
+
+# Formato -> (extensión, tipo MIME)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'Arrow IPC': ('arrow', 'application/vnd.apache.arrow.stream')
+}
+
+
+def iter_chunks(df, chunk_rows=CHUNK_ROWS):
+    """Bloques consecutivos de filas de la tabla (vistas con iloc, sin copiar la tabla entera)."""
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def write_export(df, export_format, chunk_rows=CHUNK_ROWS):
+    """
+    Escribe la tabla bloque a bloque en un fichero temporal (en memoria si es pequeño, en disco si crece) y lo
+    devuelve listo para leer: nunca se materializa una segunda copia completa de la tabla ya convertida
+    """
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    if export_format == 'CSV':
+        for i, chunk in enumerate(iter_chunks(df, chunk_rows)):
+            out.write(chunk.to_csv(index=False, header=i == 0).encode('utf-8'))
+        if len(df) == 0:
+            out.write(df.to_csv(index=False).encode('utf-8')) #Solo la cabecera
+    else:
+        import pyarrow as pa #Importación diferida: solo al exportar
+        schema = pa.Schema.from_pandas(df.iloc[:chunk_rows], preserve_index=False)
+        if export_format == 'Parquet':
+            import pyarrow.parquet as pq
+            writer = pq.ParquetWriter(out, schema) #Un grupo de filas por bloque
+        else:
+            writer = pa.ipc.new_stream(out, schema) #Un record batch por bloque
+        for chunk in iter_chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        writer.close()
+    out.seek(0)
+    return out
+
+
+def export_button(df, file_stem, key, label="📥 Exportar"):
+    """Selector de formato + botón de descarga. El fichero se genera al pulsar, en otro hilo (no bloquea la página)."""
+    col_format, col_button = st.columns([2, 1], vertical_alignment='bottom')
+    with col_format:
+        export_format = st.selectbox("Formato:", list(EXPORT_FORMATS), key=f'{key}_format')
+    extension, mime = EXPORT_FORMATS[export_format]
+    with col_button:
+        st.download_button(label, data=lambda: write_export(df, export_format), file_name=f'{file_stem}.{extension}', mime=mime,
+                           key=f'{key}_download', on_click='ignore', disabled=df.empty)
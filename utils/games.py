@@ -0,0 +1,37 @@
+# Importamos las librerías
+import numpy as np
+import pandas as pd
+
+
+def build_team_games(pbp_data):
+    """
+    Una fila por equipo y partido con sus jugadas ofensivas (pase + carrera), yardas, EPA y el marcador final.
+    Es la base de los ajustes por rival, del Elo y de las simulaciones de temporada
+    """
+    plays = pbp_data[(pbp_data['pass_attempt'] == 1) | (pbp_data['rush_attempt'] == 1)].copy()
+    plays['yards'] = plays['passing_yards'].fillna(0) + plays['rushing_yards'].fillna(0) #Misma definición que total_yards
+    team_games = plays.groupby(['game_id', 'season', 'week', 'posteam', 'defteam']).agg(
+        plays=('play_id', 'size'), yards=('yards', 'sum'), epa=('epa', 'sum')
+    ).reset_index()
+
+    # Datos del partido (local, sede neutral y marcador final), una fila por game_id
+    game_cols = ['game_id', 'home_team', 'away_team', 'home_score', 'away_score'] + (['location'] if 'location' in pbp_data.columns else [])
+    games = pbp_data[game_cols].drop_duplicates('game_id')
+    team_games = team_games.merge(games, on='game_id', how='left', validate='many_to_one')
+
+    is_home = team_games['posteam'] == team_games['home_team']
+    neutral = team_games['location'].eq('Neutral') if 'location' in team_games.columns else False
+    team_games['home'] = np.where(neutral, 0, np.where(is_home, 1, -1)) #1 local, -1 visitante, 0 sede neutral
+    team_games['points_for'] = np.where(is_home, team_games['home_score'], team_games['away_score'])
+    team_games['points_against'] = np.where(is_home, team_games['away_score'], team_games['home_score'])
+
+    team_games = team_games.rename(columns={'posteam': 'team', 'defteam': 'opponent', 'season': 'year'})
+    return team_games[['game_id', 'year', 'week', 'team', 'opponent', 'home', 'plays', 'yards', 'epa', 'points_for', 'points_against']]
+
+
+def game_results(team_games):
+    """Una fila por partido (local, visitante, marcador y sede neutral) a partir de la tabla de partidos por equipo."""
+    games = team_games[team_games['home'] >= 0].drop_duplicates('game_id') #La fila del local (o la primera en sede neutral)
+    games = games.rename(columns={'team': 'home_team', 'opponent': 'away_team', 'points_for': 'home_points', 'points_against': 'away_points'})
+    games['neutral'] = games['home'] == 0
+    return games[['game_id', 'year', 'week', 'home_team', 'away_team', 'home_points', 'away_points', 'neutral']].sort_values(['year', 'week', 'game_id']).reset_index(drop=True)
@@ -0,0 +1,292 @@
+# Importamos las librerías
+import os
+import numpy as np
+from utils.players import POSITION_GROUPS
+
+MODEL_DIR = 'models' #Modelos ajustados sobre todas las temporadas (se regeneran si cambian los datos)
+INCREMENTAL_MIN_ROWS = 20_000 #A partir de este número de jugador-temporadas se ajusta por bloques (partial_fit)
+FIT_BATCH_SIZE = 5_000
+N_COMPONENTS = 2 #Componentes principales para los mapas de clústeres
+
+# Características del modelo por posición
+MODEL_FEATURES = {
+    'QB': ['passing_epa', 'rushing_epa', 'pacr', 'dakota', 'total_tds', 'total_first_downs', 'sacks', 'total_turnovers', 'passing_yards', 'rushing_yards'],
+    'RB': ['rushing_epa', 'rushing_tds', 'carries', 'rushing_yards', 'rushing_first_downs', 'rushing_fumbles'],
+    'Receptor': ['receiving_epa', 'receiving_tds', 'racr', 'receiving_yards_after_catch', 'receiving_first_downs', 'receiving_fumbles', 'receiving_yards']
+}
+
+# Características del modelo de equipos (ataque + defensa), estandarizadas con todas las temporadas
+TEAM_FEATURES = ['offensive_tds', 'net_yards_per_pass', 'yards_per_rush', 'total_turnovers', 'cmp_percentage',
+                 'offensive_tds_allowed', 'yards_per_pass_allowed', 'yards_per_rush_allowed', 'sack_rate', 'turnovers_forced']
+
+# Participación mínima por posición: (columna, valor por defecto del filtro). El modelo de referencia se ajusta con este mínimo
+PARTICIPATION = {'QB': ('attempts', 150), 'RB': ('carries', 75), 'Receptor': ('targets', 60)}
+
+
+def add_derived_features(player_df):
+    """Añade las métricas combinadas del modelo (TDs, primeros downs y pérdidas de balón totales)."""
+    metrics_to_check = ['passing_tds', 'rushing_tds', 'passing_first_downs', 'rushing_first_downs', 'interceptions', 'rushing_fumbles_lost', 'sack_fumbles_lost']
+    for col in metrics_to_check:
+        if col not in player_df.columns:
+            player_df[col] = 0
+    player_df[metrics_to_check] = player_df[metrics_to_check].fillna(0)
+
+    player_df['total_tds'] = player_df['passing_tds'] + player_df['rushing_tds']
+    player_df['total_first_downs'] = player_df['passing_first_downs'] + player_df['rushing_first_downs']
+    player_df['total_turnovers'] = player_df['interceptions'] + player_df['rushing_fumbles_lost'] + player_df['sack_fumbles_lost']
+    return player_df
+
+
+def position_rows(player_df, position, min_participation=None):
+    """Jugador-temporadas de una posición con la participación mínima (por defecto, la del modelo de referencia)."""
+    column, default = PARTICIPATION[position]
+    min_participation = default if min_participation is None else min_participation
+    return player_df[player_df['position'].isin(POSITION_GROUPS[position]) & (player_df[column] >= min_participation)]
+
+
+class PositionModel:
+    """
+    Escalado estándar + PCA de una posición ajustados sobre todas las temporadas. Guarda solo las medias,
+    escalas y componentes, así que proyectar cualquier subconjunto es una resta y un producto matricial
+    y los ejes significan lo mismo en todas las temporadas y filtros
+    """
+
+    def __init__(self, features, mean, scale, pca_mean, components, explained_variance_ratio):
+        self.features = list(features)
+        self.mean = np.asarray(mean, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.pca_mean = np.asarray(pca_mean, dtype=float)
+        self.components = np.asarray(components, dtype=float)
+        self.explained_variance_ratio = np.asarray(explained_variance_ratio, dtype=float)
+
+    @classmethod
+    def fit(cls, df, features, n_components=N_COMPONENTS):
+        """Ajusta el modelo; con muchos datos, por bloques (StandardScaler.partial_fit + IncrementalPCA)."""
+        from sklearn.preprocessing import StandardScaler #Importación diferida: scikit-learn solo se carga al ajustar
+        from sklearn.decomposition import PCA, IncrementalPCA
+        X = df[features].fillna(0).to_numpy(dtype=float)
+        scaler = StandardScaler()
+        if len(X) >= INCREMENTAL_MIN_ROWS:
+            for start in range(0, len(X), FIT_BATCH_SIZE):
+                scaler.partial_fit(X[start:start + FIT_BATCH_SIZE])
+            pca = IncrementalPCA(n_components=n_components, batch_size=FIT_BATCH_SIZE)
+            for start in range(0, len(X), FIT_BATCH_SIZE):
+                batch = scaler.transform(X[start:start + FIT_BATCH_SIZE])
+                if len(batch) >= n_components: #IncrementalPCA necesita al menos n_components filas por bloque
+                    pca.partial_fit(batch)
+        else:
+            scaler.fit(X)
+            pca = PCA(n_components=n_components).fit(scaler.transform(X))
+        return cls(features, scaler.mean_, scaler.scale_, pca.mean_, pca.components_, pca.explained_variance_ratio_)
+
+    def scale_features(self, df):
+        """Características escaladas con las medias y desviaciones de todas las temporadas."""
+        return (df[self.features].fillna(0).to_numpy(dtype=float) - self.mean) / self.scale
+
+    def project(self, scaled_features):
+        """Coordenadas en las componentes principales de la posición."""
+        return (scaled_features - self.pca_mean) @ self.components.T
+
+
+class ModelStore:
+    """Modelos por posición con la versión de los datos con la que se ajustaron (se guardan en un .npz)."""
+
+    def __init__(self, models, version):
+        self.models = models
+        self.version = str(version)
+
+    def __getitem__(self, position):
+        return self.models[position]
+
+    @classmethod
+    def fit(cls, player_df, version):
+        """Ajusta un modelo por posición con todos los jugador-temporadas que cumplen la participación de referencia."""
+        models = {position: PositionModel.fit(position_rows(player_df, position), features) for position, features in MODEL_FEATURES.items()}
+        return cls(models, version)
+
+    def save(self, file_path):
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        arrays = {'version': np.array(self.version)}
+        for position, model in self.models.items():
+            arrays[f'{position}__features'] = np.array(model.features)
+            for name in ['mean', 'scale', 'pca_mean', 'components', 'explained_variance_ratio']:
+                arrays[f'{position}__{name}'] = getattr(model, name)
+        np.savez(file_path, **arrays)
+
+    @classmethod
+    def load(cls, file_path):
+        with np.load(file_path) as arrays:
+            models = {}
+            for position in MODEL_FEATURES:
+                models[position] = PositionModel(*(arrays[f'{position}__{name}'] for name in ['features', 'mean', 'scale', 'pca_mean', 'components', 'explained_variance_ratio']))
+            return cls(models, arrays['version'].item())
+
+
+def load_or_fit_model_store(player_df, version, file_path):
+    """Carga los modelos guardados si corresponden a la versión de los datos; si no, los ajusta y los guarda."""
+    if os.path.exists(file_path):
+        try:
+            store = ModelStore.load(file_path)
+            if store.version == str(version):
+                return store
+        except (OSError, KeyError, ValueError): #Fichero incompleto o de otro formato: se vuelve a ajustar
+            pass
+    store = ModelStore.fit(player_df, version)
+    try:
+        store.save(file_path)
+    except OSError: #Sin permisos de escritura: el modelo se usa solo en memoria
+        pass
+    return store
+
+
+class FeatureMatrices:
+    """
+    Características escaladas (float32) de todos los jugador-temporadas de cada posición en ficheros .npy
+    que cada proceso abre en solo lectura con np.load(mmap_mode='r'): el sistema operativo comparte las
+    páginas entre procesos y cada vista solo copia las filas que filtra. Junto a cada matriz se guardan
+    los índices para filtrar sin tocar la tabla (fila en la tabla de jugadores, temporada y participación)
+    """
+
+    ARRAYS = ['features', 'rows', 'year', 'participation']
+
+    def __init__(self, directory, arrays, version):
+        self.directory = directory
+        self.arrays = arrays #{posición: {nombre: memmap}}
+        self.version = version
+
+    def __getitem__(self, position):
+        return self.arrays[position]
+
+    @staticmethod
+    def write(player_df, store, directory):
+        """Escribe las matrices de todas las posiciones (cada fichero se escribe aparte y se renombra al terminar)."""
+        os.makedirs(directory, exist_ok=True)
+        version_path = os.path.join(directory, 'version.txt')
+        if os.path.exists(version_path): #Mientras se reescriben, las matrices no son válidas para ninguna versión
+            os.remove(version_path)
+        positions = np.arange(len(player_df))
+        for position, model in store.models.items():
+            mask = player_df['position'].isin(POSITION_GROUPS[position]).to_numpy()
+            df = player_df[mask]
+            arrays = {
+                'features': model.scale_features(df).astype(np.float32),
+                'rows': positions[mask].astype(np.int32),
+                'year': df['year'].to_numpy(dtype=np.int16),
+                'participation': df[PARTICIPATION[position][0]].fillna(0).to_numpy(dtype=np.float32)
+            }
+            for name, array in arrays.items():
+                path = os.path.join(directory, f'{position}_{name}.npy')
+                tmp_path = f'{path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'wb') as f: #Los procesos que ya lo tienen abierto no ven un fichero a medias
+                    np.save(f, array)
+                os.replace(tmp_path, path)
+        with open(version_path, 'w') as f: #Se escribe al final: marca las matrices como completas
+            f.write(store.version)
+
+    @classmethod
+    def open(cls, directory, version):
+        """Abre las matrices en solo lectura si existen y corresponden a la versión de los datos (si no, None)."""
+        try:
+            with open(os.path.join(directory, 'version.txt')) as f:
+                if f.read() != str(version):
+                    return None
+            arrays = {position: {name: np.load(os.path.join(directory, f'{position}_{name}.npy'), mmap_mode='r') for name in cls.ARRAYS} for position in MODEL_FEATURES}
+        except (OSError, ValueError):
+            return None
+        return cls(directory, arrays, str(version))
+
+    def select(self, position, year=None, min_participation=0):
+        """Filas de la tabla de jugadores y características escaladas de un filtro (copia solo las filas seleccionadas)."""
+        arrays = self.arrays[position]
+        mask = np.asarray(arrays['participation']) >= min_participation
+        if year is not None:
+            mask &= np.asarray(arrays['year']) == year
+        selected = np.flatnonzero(mask)
+        return np.asarray(arrays['rows'][selected]), np.asarray(arrays['features'][selected])
+
+
+def load_or_build_feature_matrices(player_df, store, directory):
+    """Abre las matrices compartidas de la versión del modelo; si no existen o son de otra versión, las escribe."""
+    matrices = FeatureMatrices.open(directory, store.version)
+    if matrices is None:
+        try:
+            FeatureMatrices.write(player_df, store, directory)
+            matrices = FeatureMatrices.open(directory, store.version)
+        except OSError: #Sin permisos de escritura: se devuelve None y la página escala en memoria
+            return None
+    return matrices
+
+
+class NeighbourIndex:
+    """
+    Índice de vecinos precalculado: las distancias euclídeas de todas las filas entre sí se calculan una vez
+    (un producto matricial) y se guarda, para cada fila, el orden de sus vecinos más cercanos con su distancia.
+    Consultar los similares de cualquier fila es leer una fila del índice, sin recalcular nada
+    """
+
+    def __init__(self, scaled_features, n_neighbours=None):
+        X = np.asarray(scaled_features, dtype=float)
+        squared = (X ** 2).sum(axis=1)
+        distances = np.maximum(squared[:, None] + squared[None, :] - 2 * X @ X.T, 0) #|a-b|² = |a|² + |b|² - 2ab
+        np.fill_diagonal(distances, np.inf) #La propia fila no es vecina de sí misma
+        n = len(X) - 1 if n_neighbours is None else min(n_neighbours, len(X) - 1)
+        if n < len(X) - 1:
+            order = np.argpartition(distances, n - 1, axis=1)[:, :n]
+        else:
+            order = np.tile(np.arange(len(X)), (len(X), 1))
+        rows = np.arange(len(X))[:, None]
+        order = np.take_along_axis(order, np.argsort(distances[rows, order], axis=1), axis=1)[:, :n]
+        self.neighbours = order
+        self.distances = np.sqrt(distances[rows, order])
+
+    def query(self, row, k=10, exclude=None):
+        """Filas y distancias de los k vecinos más cercanos de una fila (sin las filas de `exclude`)."""
+        neighbours, distances = self.neighbours[row], self.distances[row]
+        if exclude is not None:
+            keep = ~np.isin(neighbours, list(exclude))
+            neighbours, distances = neighbours[keep], distances[keep]
+        return neighbours[:k], distances[:k]
+
+
+def weighted_neighbours(scaled_features, query_rows, weights=None, k=10, exclude=None):
+    """
+    Vecinos más cercanos de un lote de filas con una distancia euclídea ponderada por característica. Los pesos
+    se aplican como un escalado diagonal de la matriz ya estandarizada (X·diag(√w)), así que cambiar los pesos no
+    reajusta el escalado, la PCA ni K-Means: es un producto matricial del lote contra la matriz y una selección
+    parcial de los k menores. Los pesos se normalizan a media 1 (con pesos iguales la distancia es la de siempre;
+    si todos son 0 se usan pesos iguales).
+    Devuelve matrices (filas del lote, k) de vecinos y distancias; las filas excluidas quedan con distancia infinita
+    """
+    X = np.asarray(scaled_features, dtype=float)
+    query_rows = np.atleast_1d(query_rows)
+    if weights is not None:
+        weights = np.asarray(weights, dtype=float)
+        weights = weights * len(weights) / weights.sum() if weights.sum() > 0 else np.ones_like(weights) #Con todos a 0 todas las distancias serían 0
+        X = X * np.sqrt(weights)
+    Q = X[query_rows]
+    distances = np.maximum((Q ** 2).sum(axis=1)[:, None] + (X ** 2).sum(axis=1)[None, :] - 2 * Q @ X.T, 0) #|a-b|² = |a|² + |b|² - 2ab
+    distances[np.arange(len(query_rows)), query_rows] = np.inf #La propia fila no es vecina de sí misma
+    if exclude is not None:
+        distances[:, list(exclude)] = np.inf
+    k = min(k, len(X))
+    order = np.argpartition(distances, k - 1, axis=1)[:, :k] if k < len(X) else np.tile(np.arange(len(X)), (len(query_rows), 1))
+    order = np.take_along_axis(order, np.argsort(np.take_along_axis(distances, order, axis=1), axis=1), axis=1)
+    return order, np.sqrt(np.take_along_axis(distances, order, axis=1))
+
+
+def clustering_scores(scaled_features, k_range=range(2, 9)):
+    """Inercia y silhouette score de K-Means para un rango de clústeres."""
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import silhouette_score
+    inertias, silhouettes = [], []
+    for k in k_range:
+        kmeans = KMeans(n_clusters=k, random_state=23, n_init=10).fit(scaled_features)
+        inertias.append(kmeans.inertia_)
+        silhouettes.append(silhouette_score(scaled_features, kmeans.labels_))
+    return k_range, inertias, silhouettes
+
+
+def kmeans_labels(scaled_features, n_clusters):
+    """Clúster de cada fila con K-Means (misma semilla en toda la aplicación)."""
+    from sklearn.cluster import KMeans
+    return KMeans(n_clusters=n_clusters, random_state=23, n_init=10).fit_predict(scaled_features)
@@ -0,0 +1,23 @@
+# Importamos las librerías
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+
+
+def run_in_chunks(worker, args, n_items, chunk_size, seed=0, parallel=True):
+    """
+    Reparte n_items (réplicas, simulaciones...) en bloques de chunk_size, cada uno con su propia semilla,
+    y devuelve la lista de resultados de worker(semilla, tamaño, *args). Los bloques y semillas no dependen
+    del número de procesos, así que el resultado es el mismo en paralelo o en un solo proceso
+    """
+    sizes = [min(chunk_size, n_items - start) for start in range(0, n_items, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    workers = min(os.cpu_count() or 1, len(sizes))
+    if not parallel or workers == 1:
+        return [worker(s, size, *args) for s, size in zip(seeds, sizes)]
+
+    # 'spawn' evita duplicar con fork un proceso con hilos (el servidor de Streamlit)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return list(pool.map(worker, seeds, sizes, *[repeat(arg) for arg in args]))
@@ -0,0 +1,94 @@
+# Importamos las librerías
+import numpy as np
+import pandas as pd
+
+MAX_COMPARED = 10 #Entidades por comparación
+
+# Métricas del radar: nombre -> (columna, si un valor mayor es mejor)
+TEAM_RADAR_METRICS = {
+    'TDs Ofensivos': ('offensive_tds', True),
+    'Yardas/Pase Netas': ('net_yards_per_pass', True),
+    'Yardas/Carrera': ('yards_per_rush', True),
+    'Turnovers Forzados': ('turnovers_forced', True),
+    'Yardas/Pase Permitidas': ('yards_per_pass_allowed', False),
+    'Yardas/Carrera Permitidas': ('yards_per_rush_allowed', False)
+}
+
+PLAYER_RADAR_METRICS = {
+    'QB': {'EPA de Pase': ('passing_epa', True), 'EPA de Carrera': ('rushing_epa', True), 'PACR': ('pacr', True), 'DAKOTA': ('dakota', True), 'TDs Totales': ('total_tds', True), 'Primeros Downs': ('total_first_downs', True), 'Sacks': ('sacks', False), 'Pérdidas de Balón': ('total_turnovers', False)},
+    'RB': {'EPA de Carrera': ('rushing_epa', True), 'TDs de Carrera': ('rushing_tds', True), 'Intentos': ('carries', True), 'Yardas de Carrera': ('rushing_yards', True), 'Primeros Downs': ('rushing_first_downs', True), 'Fumbles': ('rushing_fumbles', False)},
+    'Receptor': {'EPA de Recepción': ('receiving_epa', True), 'TDs de Recepción': ('receiving_tds', True), 'RACR': ('racr', True), 'Yardas tras Recepción': ('receiving_yards_after_catch', True), 'Primeros Downs': ('receiving_first_downs', True), 'Fumbles': ('receiving_fumbles', False)}
+}
+
+
+def radar_columns(radar_metrics):
+    """{columna: si un valor mayor es mejor} a partir de las métricas del radar."""
+    return {col: higher for col, higher in radar_metrics.values()}
+
+
+# Modos de percentil de los radares: etiqueta -> si se compara con todas las temporadas
+PERCENTILE_SCOPES = {'Por temporada': False, 'Histórico (todas las temporadas)': True}
+
+
+class ReferenceDistributions:
+    """
+    Distribución de referencia de cada métrica: los valores de todas las temporadas del grupo de comparación,
+    ordenados una sola vez. Cualquier valor (también uno hipotético) se convierte en su percentil histórico con
+    una búsqueda binaria vectorizada: porcentaje de valores por debajo más la mitad de los empates
+    """
+
+    def __init__(self, df, metrics):
+        self.metrics = dict(metrics)
+        self.sorted_values = {}
+        for col in self.metrics:
+            values = df[col].to_numpy(dtype=float)
+            self.sorted_values[col] = np.sort(values[~np.isnan(values)])
+
+    def percentile(self, col, values):
+        """Percentiles históricos (0-100, mayor siempre es mejor) de un array de valores de una métrica."""
+        reference = self.sorted_values[col]
+        values = np.asarray(values, dtype=float)
+        if len(reference) == 0:
+            return np.full(values.shape, np.nan)
+        below = np.searchsorted(reference, values, side='left')
+        below_or_equal = np.searchsorted(reference, values, side='right')
+        percentiles = 100 * (below + below_or_equal) / (2 * len(reference))
+        percentiles = percentiles if self.metrics[col] else 100 - percentiles
+        return np.where(np.isnan(values), np.nan, percentiles)
+
+    def percentiles(self, values):
+        """Percentiles históricos de una matriz (entidad x métrica) con las columnas en el orden de las métricas."""
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        return np.column_stack([self.percentile(col, values[:, i]) for i, col in enumerate(self.metrics)])
+
+
+class PercentileMatrix:
+    """
+    Matriz (entidad x métrica) de valores y percentiles de un grupo de comparación, calculada de una vez.
+    Los percentiles se calculan dentro de cada temporada (group_column; con None, en un único grupo) y se
+    invierten en las métricas en las que un valor menor es mejor, así que un percentil alto siempre es mejor.
+    Las filas de las entidades seleccionadas se extraen con un único acceso por posición. También guarda los
+    percentiles históricos (frente a todas las temporadas del grupo), de modo que ambos modos cuestan lo mismo
+    """
+
+    def __init__(self, df, key_columns, metrics, group_column='year'):
+        self.columns = list(metrics)
+        groups = df[group_column].to_numpy() if group_column is not None else np.zeros(len(df)) #Sin columna de grupo: un único grupo (p. ej. carreras)
+        ranks = df[self.columns].groupby(groups).rank(pct=True).to_numpy(dtype=float)
+        lower_is_better = np.array([not metrics[col] for col in self.columns])
+        ranks[:, lower_is_better] = 1 - ranks[:, lower_is_better]
+        self.percentiles = 100 * ranks
+        self.values = df[self.columns].to_numpy(dtype=float)
+        self.reference = ReferenceDistributions(df, {col: metrics[col] for col in self.columns})
+        self.all_time_percentiles = self.reference.percentiles(self.values)
+        self.index = pd.MultiIndex.from_frame(df[key_columns]) if len(key_columns) > 1 else pd.Index(df[key_columns[0]])
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def take(self, keys, all_time=False):
+        """Percentiles (de su temporada o históricos) y valores (entidad x métrica) de las entidades indicadas, en el mismo orden."""
+        rows = self.index.get_indexer(keys)
+        if (rows < 0).any():
+            raise KeyError([key for key, row in zip(keys, rows) if row < 0])
+        return (self.all_time_percentiles if all_time else self.percentiles)[rows], self.values[rows]
@@ -0,0 +1,35 @@
+# Importamos las librerías
+import pandas as pd
+
+# Posiciones de la tabla de jugadores que se agrupan en cada opción de los filtros
+POSITION_GROUPS = {'QB': ['QB'], 'RB': ['RB'], 'Receptor': ['WR', 'TE']}
+# Posiciones de la tabla defensiva (generales del roster y detalladas): deja fuera a atacantes que placan tras un turnover y a especialistas
+DEFENSIVE_POSITIONS = ['DL', 'DE', 'DT', 'NT', 'LB', 'ILB', 'OLB', 'MLB', 'DB', 'CB', 'S', 'SS', 'FS', 'SAF']
+
+
+def build_player_dimension(roster_df):
+    """
+    Construye la dimensión de jugadores: una única fila por (player_id, season) con el
+    equipo principal resuelto y la lista de equipos por los que ha pasado en la temporada
+    """
+    roster_df = roster_df.dropna(subset=['player_id', 'team'])
+    if 'week' in roster_df.columns: #Orden cronológico si el roster es semanal
+        roster_df = roster_df.sort_values(['season', 'week'], kind='stable')
+
+    stints = roster_df.groupby(['player_id', 'season', 'team'], sort=False).size().rename('n_rows').reset_index() #Una fila por etapa (jugador, temporada, equipo)
+    stints['order'] = range(len(stints)) #Orden de aparición para desempatar
+
+    # Equipo principal: el de más apariciones y, en caso de empate, el más reciente
+    primary = stints.sort_values(['n_rows', 'order'], ascending=[False, False]).drop_duplicates(['player_id', 'season'])
+    primary = primary.set_index(['player_id', 'season'])['team']
+    teams = stints.groupby(['player_id', 'season'], sort=False)['team'].agg('|'.join).rename('teams') #Lista de equipos separada por '|'
+
+    info = roster_df.groupby(['player_id', 'season'], sort=False)[['player_name', 'position']].last()
+    player_dim = info.join(primary).join(teams).reset_index()
+    return player_dim
+
+
+def player_labels(df):
+    """Devuelve una Serie player_id -> 'Nombre (EQUIPO)' para mostrar en los selectores."""
+    labels = df.drop_duplicates('player_id').set_index('player_id')
+    return labels['player_name'] + ' (' + labels['team'].fillna('-') + ')'
@@ -0,0 +1,108 @@
+# Importamos las librerías
+import itertools
+import queue
+import threading
+import time
+import uuid
+import streamlit as st
+from utils.charts import cache_stats
+
+PREFETCH_WORKERS = 2 #Hilos de precarga por proceso (0 la desactiva)
+FOREGROUND_GRACE = 5.0 #Segundos máximos que una ejecución de página pausa la precarga (por si termina con st.stop)
+PREFETCH_DELAY = 0.5 #Espera tras una ejecución antes de precargar (para no competir con el envío de la página al navegador)
+
+# Prioridades de la precarga (menor = antes)
+PRIORITY_ADJACENT_SEASON = 0
+PRIORITY_OTHER_POSITION = 1
+PRIORITY_DEFAULT_THRESHOLD = 2
+
+
+class Prefetcher:
+    """
+    Precarga especulativa de las vistas que probablemente se pidan después (temporada contigua, otras
+    posiciones, umbral por defecto) con un pequeño pool de hilos en segundo plano. Cada tarea pertenece a un
+    ámbito (sesión y página): al empezar una nueva ejecución del ámbito se cancelan sus tareas pendientes y,
+    mientras haya ejecuciones en primer plano, los hilos no empiezan tareas nuevas. Las tareas escriben en la
+    caché de resultados, así que una vista precargada se sirve sin recalcular
+    """
+
+    def __init__(self, workers=PREFETCH_WORKERS):
+        self._queue = queue.PriorityQueue()
+        self._order = itertools.count() #Desempate FIFO entre tareas de la misma prioridad
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._generations = {} #ámbito -> generación actual (las tareas de generaciones anteriores se descartan)
+        self._foreground = {} #ámbito -> fin máximo de la ejecución en primer plano
+        self.stats = {'scheduled': 0, 'completed': 0, 'cancelled': 0, 'failed': 0}
+        self.workers = workers
+        for i in range(workers):
+            threading.Thread(target=self._run, name=f'prefetch-{i}', daemon=True).start()
+
+    def foreground(self, scope):
+        """Inicio de una ejecución de la página: cancela las tareas pendientes del ámbito y pausa la precarga."""
+        with self._lock:
+            self._generations[scope] = self._generations.get(scope, 0) + 1
+            self._foreground[scope] = time.monotonic() + FOREGROUND_GRACE
+
+    def schedule(self, scope, tasks):
+        """Fin de la ejecución en primer plano: encola las tareas [(prioridad, función sin argumentos), ...]."""
+        with self._lock:
+            self._foreground[scope] = time.monotonic() + PREFETCH_DELAY
+            if self.workers:
+                generation = self._generations.get(scope, 0)
+                for priority, task in tasks:
+                    self._queue.put((priority, next(self._order), scope, generation, task))
+                    self.stats['scheduled'] += 1
+            self._idle.notify_all()
+
+    def _foreground_active(self):
+        now = time.monotonic()
+        for scope in [scope for scope, deadline in self._foreground.items() if deadline <= now]:
+            del self._foreground[scope]
+        return bool(self._foreground)
+
+    def _run(self):
+        while True:
+            _, _, scope, generation, task = self._queue.get()
+            with self._lock:
+                while self._foreground_active(): #Las ejecuciones en primer plano tienen preferencia
+                    self._idle.wait(timeout=0.05)
+                if generation != self._generations.get(scope, 0): #El usuario ya ha cambiado de vista
+                    self.stats['cancelled'] += 1
+                    continue
+            try:
+                task()
+                outcome = 'completed'
+            except Exception: #Una precarga fallida no debe afectar a la página
+                outcome = 'failed'
+            with self._lock: #Los contadores se comparten entre los hilos de precarga
+                self.stats[outcome] += 1
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher():
+    """Pool de precarga compartido por todas las sesiones del proceso (se crea la primera vez)."""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher()
+        return _prefetcher
+
+
+def session_scope(page):
+    """Ámbito de precarga de la sesión actual en una página."""
+    if 'prefetch_session' not in st.session_state:
+        st.session_state['prefetch_session'] = uuid.uuid4().hex
+    return (st.session_state['prefetch_session'], page)
+
+
+def show_prefetch_stats():
+    """Contadores de la caché de resultados y de la precarga en la barra lateral (para ajustar la precarga)."""
+    stats = get_prefetcher().stats
+    with st.sidebar.expander("⚙️ Caché y precarga"):
+        st.caption(f"Caché: {cache_stats['hits']} aciertos / {cache_stats['misses']} fallos")
+        st.caption(f"Precarga: {cache_stats['prefetched']} vistas calculadas, {cache_stats['prefetch_hits']} aprovechadas")
+        st.caption(f"Tareas: {stats['scheduled']} encoladas, {stats['completed']} completadas, {stats['cancelled']} canceladas, {stats['failed']} con error")
@@ -0,0 +1,102 @@
+# Importamos las librerías
+import numpy as np
+import pandas as pd
+
+
+def _ratio(num, den, scale=1.0):
+    """División segura: devuelve NaN cuando el denominador es 0."""
+    return (num / den.replace(0, np.nan)) * scale
+
+
+# Métricas de ratio recalculadas a partir de los componentes sumados (mismas fórmulas que en Data_extraction.py)
+TEAM_OFFENSE_RATES = {
+    'yards_per_play': lambda df: _ratio(df['total_yards'], df['total_plays']),
+    'cmp_percentage': lambda df: _ratio(df['pass_completions'], df['pass_attempts'], 100),
+    'yards_per_pass': lambda df: _ratio(df['passing_yards'], df['pass_attempts']),
+    'yards_per_rush': lambda df: _ratio(df['rushing_yards'], df['rush_attempts']),
+    'net_yards_per_pass': lambda df: _ratio(df['passing_yards'], df['pass_attempts'] + df['sacks_taken']),
+    'pass_td_int_ratio': lambda df: df['passing_tds'] / df['interceptions'].replace(0, 1)
+}
+
+TEAM_DEFENSE_RATES = {
+    'yards_per_play_allowed': lambda df: _ratio(df['total_yards_allowed'], df['total_plays_faced']),
+    'opponent_cmp_percentage': lambda df: _ratio(df['completions_allowed'], df['pass_attempts_faced'], 100),
+    'yards_per_pass_allowed': lambda df: _ratio(df['passing_yards_allowed'], df['pass_attempts_faced']),
+    'yards_per_rush_allowed': lambda df: _ratio(df['rushing_yards_allowed'], df['rush_attempts_faced']),
+    'sack_rate': lambda df: _ratio(df['sacks_made'], df['pass_attempts_faced'], 100)
+}
+
+PLAYER_RATES = {
+    'pacr': lambda df: _ratio(df['passing_yards'], df['passing_air_yards']),
+    'racr': lambda df: _ratio(df['receiving_yards'], df['receiving_air_yards'])
+}
+
+# Métricas que no se pueden recomponer con sumas: media ponderada por la columna indicada
+TEAM_OFFENSE_WEIGHTED = {'epa_per_play': 'total_plays', 'adj_yards_per_play': 'total_plays', 'adj_epa_per_play': 'total_plays'}
+TEAM_DEFENSE_WEIGHTED = {'epa_per_play_allowed': 'total_plays_faced', 'adj_yards_per_play_allowed': 'total_plays_faced', 'adj_epa_per_play_allowed': 'total_plays_faced'}
+
+PLAYER_WEIGHTED = {
+    'dakota': 'attempts', 'target_share': 'games', 'air_yards_share': 'games', 'wopr_x': 'games',
+    'tgt_sh': 'games', 'ay_sh': 'games', 'yac_sh': 'games', 'wopr_y': 'games', 'ry_sh': 'games', 'rtd_sh': 'games',
+    'rfd_sh': 'games', 'rtdfd_sh': 'games', 'dom': 'games', 'w8dom': 'games', 'yptmpa': 'games', 'ppr_sh': 'games'
+}
+
+
+class RangeAggregator:
+    """
+    Agregados por rango de temporadas. Precalcula una única vez las sumas acumuladas por
+    año de cada entidad (equipo o jugador), de modo que los totales de cualquier rango
+    [inicio, fin] se obtienen con una resta de dos columnas, sin volver a recorrer filas
+    """
+
+    def __init__(self, df, entity_col, sum_columns, rate_formulas=None, weighted_columns=None, attribute_columns=(), year_col='year'):
+        self.entity_col = entity_col
+        self.sum_columns = list(sum_columns)
+        self.rate_formulas = rate_formulas or {}
+        self.weighted_columns = {col: w for col, w in (weighted_columns or {}).items() if col in df.columns and w in df.columns}
+        self.attribute_columns = list(attribute_columns)
+
+        self.years = np.sort(df[year_col].unique())
+        self.entities = pd.Index(df[entity_col].unique())
+        entity_idx = self.entities.get_indexer(df[entity_col])
+        year_idx = np.searchsorted(self.years, df[year_col])
+
+        # Componentes: columnas sumables + productos valor*peso + contador de temporadas
+        components = [df[col].fillna(0).to_numpy(dtype=float) for col in self.sum_columns]
+        components += [(df[col].fillna(0) * df[w].fillna(0)).to_numpy(dtype=float) for col, w in self.weighted_columns.items()]
+        components.append(np.ones(len(df)))
+        values = np.zeros((len(self.entities), len(self.years), len(components)))
+        np.add.at(values, (entity_idx, year_idx), np.column_stack(components))
+
+        self._cumsum = np.concatenate([np.zeros((len(self.entities), 1, len(components))), values.cumsum(axis=1)], axis=1) #Columna 0 = acumulado antes del primer año
+
+        # Atributos (equipo, posición...) del último año disponible hasta cada temporada
+        self._attributes = {}
+        for col in self.attribute_columns:
+            grid = np.full((len(self.entities), len(self.years)), None, dtype=object)
+            grid[entity_idx, year_idx] = df[col].to_numpy(dtype=object)
+            self._attributes[col] = pd.DataFrame(grid).ffill(axis=1).to_numpy()
+
+    def query(self, start_year, end_year):
+        """Devuelve un DataFrame con los totales y los ratios recalculados de todas las entidades en el rango."""
+        i0 = np.searchsorted(self.years, start_year, side='left')
+        i1 = np.searchsorted(self.years, end_year, side='right')
+        totals = self._cumsum[:, i1] - self._cumsum[:, i0]
+
+        n_sum = len(self.sum_columns)
+        range_df = pd.DataFrame(totals[:, :n_sum], columns=self.sum_columns)
+        range_df.insert(0, self.entity_col, self.entities)
+        for k, (col, weight_col) in enumerate(self.weighted_columns.items()):
+            range_df[col] = _ratio(pd.Series(totals[:, n_sum + k]), range_df[weight_col])
+        range_df['seasons'] = totals[:, -1].astype(int)
+        for col, grid in self._attributes.items():
+            range_df[col] = grid[:, max(i1 - 1, 0)] if i1 > 0 else None
+        for name, formula in self.rate_formulas.items():
+            range_df[name] = formula(range_df)
+
+        return range_df[range_df['seasons'] > 0].reset_index(drop=True) #Solo entidades con datos en el rango
+
+
+def numeric_sum_columns(df, exclude=()):
+    """Columnas numéricas sumables de una tabla (excluye el año y las columnas indicadas)."""
+    return [col for col in df.select_dtypes('number').columns if col != 'year' and col not in exclude]
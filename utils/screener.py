@@ -0,0 +1,87 @@
+# Importamos las librerías
+import numpy as np
+import pandas as pd
+
+
+class ScreenerIndex:
+    """
+    Índices por columna para filtrar jugador-temporadas con varias condiciones de rango. Para cada columna
+    numérica se guardan los valores ordenados, las filas en ese orden y el rango de cada fila dentro del orden;
+    para las categóricas, las filas de cada valor. Una condición es una búsqueda binaria (un tramo del orden)
+    y las condiciones se cruzan partiendo del conjunto de candidatos más pequeño, así que el coste depende del
+    número de candidatos y no del tamaño de la tabla
+    """
+
+    def __init__(self, df, columns=None, category_columns=('position', 'team')):
+        self.df = df.reset_index(drop=True)
+        if columns is None:
+            columns = self.df.select_dtypes('number').columns
+        self.columns = list(columns)
+        self._sorted, self._order, self._rank = {}, {}, {}
+        for column in self.columns:
+            values = self.df[column].to_numpy(dtype=float)
+            order = np.argsort(values, kind='stable')
+            order = order[~np.isnan(values[order])] #Los valores nulos no cumplen ninguna condición
+            rank = np.full(len(values), -1, dtype=np.int32)
+            rank[order] = np.arange(len(order), dtype=np.int32)
+            self._sorted[column], self._order[column], self._rank[column] = values[order], order.astype(np.int32), rank
+
+        self._codes, self._category_rows = {}, {}
+        for column in category_columns:
+            codes, uniques = pd.factorize(self.df[column])
+            self._codes[column] = {value: code for code, value in enumerate(uniques)}
+            self._category_rows[column] = (codes, [np.flatnonzero(codes == code) for code in range(len(uniques))])
+
+    def __len__(self):
+        return len(self.df)
+
+    def _span(self, column, low=None, high=None):
+        """Tramo [lo, hi) del orden de la columna con low <= valor <= high."""
+        values = self._sorted[column]
+        lo = 0 if low is None else int(np.searchsorted(values, low, side='left'))
+        hi = len(values) if high is None else int(np.searchsorted(values, high, side='right'))
+        return lo, max(lo, hi)
+
+    def query(self, conditions, categories=None):
+        """
+        Filas (ordenadas) que cumplen todas las condiciones. `conditions` es una lista de (columna, mínimo, máximo)
+        con None para no acotar y `categories` un diccionario {columna: valores admitidos}
+        """
+        spans = [(column, *self._span(column, low, high)) for column, low, high in conditions]
+        candidate_sets = [(hi - lo, 'range', (column, lo, hi)) for column, lo, hi in spans]
+        for column, values in (categories or {}).items():
+            codes = [self._codes[column][value] for value in values if value in self._codes[column]]
+            candidate_sets.append((sum(len(self._category_rows[column][1][code]) for code in codes), 'category', (column, codes)))
+        if not candidate_sets:
+            return np.arange(len(self.df))
+
+        candidate_sets.sort(key=lambda item: item[0]) #Primero el conjunto más selectivo
+        size, kind, spec = candidate_sets[0]
+        if kind == 'range':
+            column, lo, hi = spec
+            rows = self._order[column][lo:hi]
+        else:
+            column, codes = spec
+            rows = np.concatenate([self._category_rows[column][1][code] for code in codes]) if codes else np.array([], dtype=np.int64)
+
+        for size, kind, spec in candidate_sets[1:]: #El resto se comprueba solo sobre los candidatos que quedan
+            if len(rows) == 0:
+                break
+            if kind == 'range':
+                column, lo, hi = spec
+                rank = self._rank[column][rows]
+                rows = rows[(rank >= lo) & (rank < hi)]
+            else:
+                column, codes = spec
+                rows = rows[np.isin(self._category_rows[column][0][rows], codes)]
+        return np.sort(rows)
+
+    def count(self, column, low=None, high=None):
+        """Número de filas que cumplen una sola condición (sin construir el conjunto)."""
+        lo, hi = self._span(column, low, high)
+        return hi - lo
+
+    def bounds(self, column):
+        """Mínimo y máximo (sin nulos) de una columna."""
+        values = self._sorted[column]
+        return (float(values[0]), float(values[-1])) if len(values) else (0.0, 0.0)
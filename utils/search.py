@@ -0,0 +1,105 @@
+# Importamos las librerías
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+
+def normalize_name(name):
+    """Normaliza un nombre: sin tildes, en minúsculas y sin signos de puntuación."""
+    name = unicodedata.normalize('NFKD', str(name))
+    name = ''.join(c for c in name if not unicodedata.combining(c)) #Quitamos tildes y diacríticos
+    name = ''.join(c if c.isalnum() else ' ' for c in name.lower())
+    return ' '.join(name.split())
+
+
+def _trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PlayerSearchIndex:
+    """
+    Índice de búsqueda de jugadores sobre todas las temporadas. Combina un índice de prefijos
+    (lista ordenada de tokens + búsqueda binaria) con un índice de trigramas para búsquedas
+    aproximadas, de forma que cada consulta no depende del tamaño total del dataset
+    """
+
+    def __init__(self, player_df):
+        players = player_df.dropna(subset=['player_id', 'player_name']).sort_values('year')
+        players = players.groupby('player_id', sort=False).agg( #Una entrada por jugador con todas sus temporadas
+            player_name=('player_name', 'last'), position=('position', 'last'), seasons=('year', lambda x: tuple(sorted(set(int(y) for y in x))))
+        ).reset_index().sort_values('player_name').reset_index(drop=True)
+        self.entries = list(players[['player_id', 'player_name', 'position', 'seasons']].itertuples(index=False, name=None))
+
+        keys = []
+        self._trigram_index = defaultdict(set)
+        for row, (_, name, _, _) in enumerate(self.entries):
+            normalized = normalize_name(name)
+            keys.append((normalized, row)) #Nombre completo
+            keys.extend((token, row) for token in normalized.split()) #Cada palabra del nombre (apellido, etc.)
+            keys.append((normalized.replace(' ', ''), row)) #Nombre compacto: "jamarr" encuentra a "Ja'Marr"
+            for trigram in _trigrams(normalized):
+                self._trigram_index[trigram].add(row)
+        keys = sorted(set(keys))
+        self._keys = [key for key, _ in keys]
+        self._rows = [row for _, row in keys]
+        self._by_positions = {} #Listas por grupo de posiciones, se calculan una sola vez
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _prefix_rows(self, prefix):
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + '\uffff')
+        return self._rows[lo:hi]
+
+    def search(self, query, limit=20, positions=None):
+        """Devuelve hasta `limit` tuplas (player_id, nombre, posición, temporadas) que encajan con la consulta."""
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+
+        candidates = None
+        for token in normalized.split(): #Todas las palabras deben ser prefijo de alguna palabra del nombre
+            token_rows = set(self._prefix_rows(token))
+            candidates = token_rows if candidates is None else candidates & token_rows
+        matches = sorted(candidates) #Orden alfabético (las entradas están ordenadas por nombre)
+
+        if len(matches) < limit and len(normalized) >= 3: #Completamos con coincidencias aproximadas por trigramas
+            query_trigrams = _trigrams(normalized)
+            scores = Counter()
+            for trigram in query_trigrams:
+                scores.update(self._trigram_index.get(trigram, ()))
+            min_score = max(2, len(query_trigrams) // 2)
+            already = set(matches)
+            matches += [row for row, score in sorted(scores.items(), key=lambda x: (-x[1], x[0])) if score >= min_score and row not in already]
+
+        results = (self.entries[row] for row in matches)
+        if positions is not None:
+            results = (entry for entry in results if entry[2] in positions)
+        return [entry for _, entry in zip(range(limit), results)]
+
+    def players_for_positions(self, positions):
+        """Lista de entradas de unas posiciones, ya ordenada por nombre (para poblar selectores sin consulta)."""
+        key = frozenset(positions)
+        if key not in self._by_positions:
+            self._by_positions[key] = [entry for entry in self.entries if entry[2] in key]
+        return self._by_positions[key]
+
+
+def split_search_results(index, query, pool_ids, positions, limit=50):
+    """
+    Busca en el índice y separa los resultados entre los que están en el conjunto actual
+    (pool_ids, p. ej. la temporada filtrada) y los que solo aparecen en otras temporadas
+    """
+    matches = index.search(query, limit, positions) if query else index.players_for_positions(positions)
+    in_pool = [entry for entry in matches if entry[0] in pool_ids]
+    elsewhere = [entry for entry in matches if entry[0] not in pool_ids] if query else []
+    return in_pool, elsewhere
+
+
+def format_entry(entry):
+    """Texto de una entrada del índice para los selectores: 'Nombre (POS, 2020-2024)'."""
+    _, name, position, seasons = entry
+    years = f'{seasons[0]}-{seasons[-1]}' if len(seasons) > 1 else f'{seasons[0]}'
+    return f'{name} ({position}, {years})'
@@ -0,0 +1,157 @@
+# Importamos las librerías
+import math
+import numpy as np
+import pandas as pd
+from utils.teams import TEAM_INFO_MAP
+from utils.parallel import run_in_chunks
+from utils.games import game_results
+
+N_SIMULATIONS = 100_000
+CHUNK_SIZE = 10_000 #Temporadas por bloque (cada bloque tiene su propia semilla)
+PARALLEL_MIN_SIMULATIONS = 1_000_000 #Lanzar procesos (spawn) cuesta segundos y 100.000 temporadas en serie tardan menos de 1 s: la página siempre simula en serie
+MARGIN_SD = 13.5 #Desviación típica del margen de un partido de NFL (puntos)
+HOME_FIELD_POINTS = 1.5 #Ventaja de jugar en casa (puntos)
+REGRESSION_TO_MEAN = 0.3 #Fracción de la fuerza que se pierde de cara a una nueva temporada simulada
+N_DIVISION_WINNERS, N_WILD_CARDS = 4, 3 #Por conferencia: 4 campeones de división (cabezas de serie 1-4) + 3 comodines (5-7)
+
+CONFERENCES = sorted({info['conference'] for info in TEAM_INFO_MAP.values()})
+DIVISIONS = sorted({info['division'] for info in TEAM_INFO_MAP.values()})
+TEAMS = sorted(TEAM_INFO_MAP, key=lambda team: (TEAM_INFO_MAP[team]['division'], team)) #Equipos agrupados por división (8 x 4)
+TEAM_INDEX = {team: i for i, team in enumerate(TEAMS)}
+DIVISION_OF_TEAM = np.array([DIVISIONS.index(TEAM_INFO_MAP[team]['division']) for team in TEAMS])
+CONFERENCE_OF_TEAM = np.array([CONFERENCES.index(TEAM_INFO_MAP[team]['conference']) for team in TEAMS])
+
+
+def team_strengths(offensive_df, defensive_df, year, team_games=None, from_week=None):
+    """
+    Fuerza de cada equipo en puntos de margen por partido. Con la tabla de partidos se usa el margen real
+    (con from_week, solo el de los partidos anteriores a esa semana, para no conocer los que se simulan);
+    si no, se aproxima con la diferencia de TDs ofensivos anotados y permitidos por partido (7 puntos por TD)
+    """
+    season = team_games[team_games['year'] == year] if team_games is not None else None
+    if season is not None and from_week is not None:
+        season = season[season['week'] < from_week]
+    if season is not None and not season.empty:
+        margin = (season['points_for'] - season['points_against']).groupby(season['team']).mean()
+    else:
+        games = 16 if year < 2021 else 17 #Temporadas de 16 partidos hasta 2020
+        off = offensive_df[offensive_df['year'] == year].set_index('team')['offensive_tds']
+        allowed = defensive_df[defensive_df['year'] == year].set_index('team')['offensive_tds_allowed']
+        margin = 7 * (off - allowed) / games
+    return margin.reindex(TEAMS).fillna(0).to_numpy(dtype=float)
+
+
+def rotation_schedule(year, strengths):
+    """
+    Calendario de 17 partidos con la fórmula de rotación de la NFL: 6 de división, 4 contra una división de la
+    misma conferencia, 4 contra una de la otra conferencia, 2 contra los equipos de la misma posición de las otras
+    divisiones de su conferencia y 1 más contra la misma posición de otra división de la otra conferencia.
+    La posición en la división (de la temporada anterior en la NFL) se aproxima con la fuerza del equipo
+    """
+    division_teams = np.arange(len(TEAMS)).reshape(len(DIVISIONS), 4) #Índices (división x equipo)
+    order = np.argsort(-strengths[division_teams], axis=1)
+    placed = np.take_along_axis(division_teams, order, axis=1) #Equipos de cada división ordenados por posición
+    conference_divisions = [[DIVISIONS.index(d) for d in DIVISIONS if d.startswith(conf)] for conf in CONFERENCES]
+
+    games = []
+    for div in division_teams: #División: ida y vuelta
+        games += [(home, away) for home in div for away in div if home != away]
+    partner = 1 + year % 3 #Misma conferencia: emparejamiento rotativo de divisiones cada 3 años
+    full_pairs = [(0, partner), tuple(d for d in range(1, 4) if d != partner)]
+    same_place_pairs = [(x, y) for x in range(4) for y in range(x + 1, 4) if (x, y) not in full_pairs] #Las otras dos divisiones de la conferencia
+    for conf_divs in conference_divisions:
+        for a, b in full_pairs:
+            div_a, div_b = division_teams[conf_divs[a]], division_teams[conf_divs[b]]
+            games += [(div_a[i], div_b[j]) if (i + j) % 2 == 0 else (div_b[j], div_a[i]) for i in range(4) for j in range(4)]
+        for k, (a, b) in enumerate(same_place_pairs): #Misma posición en la división
+            games += [(placed[conf_divs[a], p], placed[conf_divs[b], p]) if (p + k) % 2 == 0 else (placed[conf_divs[b], p], placed[conf_divs[a], p]) for p in range(4)]
+    afc, nfc = conference_divisions
+    for i in range(4): #Otra conferencia: rotación cada 4 años + partido 17 contra la misma posición
+        div_a, div_b = division_teams[afc[i]], division_teams[nfc[(i + year) % 4]]
+        games += [(div_a[x], div_b[y]) if (x + y + year) % 2 == 0 else (div_b[y], div_a[x]) for x in range(4) for y in range(4)]
+        extra_a, extra_b = placed[afc[i]], placed[nfc[(i + year + 2) % 4]]
+        games += [(extra_a[p], extra_b[p]) if year % 2 == 0 else (extra_b[p], extra_a[p]) for p in range(4)]
+
+    home, away = np.array(games).T
+    return pd.DataFrame({'home': home, 'away': away, 'week': 0, 'home_win': np.nan})
+
+
+def games_schedule(team_games, year):
+    """Calendario real de una temporada (una fila por partido) a partir de la tabla de partidos por equipo."""
+    games = game_results(team_games[team_games['year'] == year])
+    home_win = np.where(games['home_points'] > games['away_points'], 1.0, np.where(games['home_points'] < games['away_points'], 0.0, 0.5))
+    return pd.DataFrame({
+        'home': games['home_team'].map(TEAM_INDEX), 'away': games['away_team'].map(TEAM_INDEX),
+        'week': games['week'], 'home_win': home_win, 'neutral': games['neutral']
+    }).dropna(subset=['home', 'away']).astype({'home': int, 'away': int})
+
+
+def _simulate_chunk(seed, size, home, away, p_home, fixed_result, tiebreak):
+    """
+    Simula `size` temporadas a la vez (matriz simulación x partido) y devuelve los conteos por equipo de
+    victorias, títulos de división, clasificaciones y cabezas de serie
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = len(TEAMS)
+    played = ~np.isnan(fixed_result)
+    home_win = np.where(played, fixed_result, rng.random((size, len(home))) < p_home) #Los partidos ya jugados conservan su resultado
+
+    # Victorias y victorias de división por equipo (productos matriciales con las matrices de incidencia partido x equipo)
+    home_onehot = np.zeros((len(home), n_teams)); home_onehot[np.arange(len(home)), home] = 1
+    away_onehot = np.zeros((len(away), n_teams)); away_onehot[np.arange(len(away)), away] = 1
+    wins = home_win @ home_onehot + (1 - home_win) @ away_onehot
+    division_game = DIVISION_OF_TEAM[home] == DIVISION_OF_TEAM[away]
+    division_wins = home_win[:, division_game] @ home_onehot[division_game] + (1 - home_win[:, division_game]) @ away_onehot[division_game]
+
+    # Desempates aproximados: victorias > victorias de división > fuerza del equipo > sorteo
+    key = wins + 1e-2 * division_wins / 7 + 1e-4 * tiebreak + 1e-6 * rng.random((size, n_teams))
+    by_division = key.reshape(size, len(DIVISIONS), 4)
+    division_winner = np.zeros((size, n_teams), dtype=bool)
+    winner_idx = np.arange(len(DIVISIONS)) * 4 + by_division.argmax(axis=2)
+    np.put_along_axis(division_winner, winner_idx, True, axis=1)
+
+    seeds = np.zeros((size, n_teams), dtype=np.int8) #0 = fuera de playoffs
+    for conf in range(len(CONFERENCES)):
+        conf_teams = np.flatnonzero(CONFERENCE_OF_TEAM == conf)
+        conf_key, conf_winner = key[:, conf_teams], division_winner[:, conf_teams]
+        winners_order = np.argsort(-np.where(conf_winner, conf_key, -np.inf), axis=1)[:, :N_DIVISION_WINNERS]
+        wildcard_order = np.argsort(-np.where(conf_winner, -np.inf, conf_key), axis=1)[:, :N_WILD_CARDS]
+        order = np.concatenate([winners_order, wildcard_order], axis=1) #Cabezas de serie 1..7
+        conf_seeds = np.zeros((size, len(conf_teams)), dtype=np.int8)
+        np.put_along_axis(conf_seeds, order, np.arange(1, N_DIVISION_WINNERS + N_WILD_CARDS + 1, dtype=np.int8)[None, :], axis=1)
+        seeds[:, conf_teams] = conf_seeds
+
+    seed_counts = np.stack([(seeds == s).sum(axis=0) for s in range(1, N_DIVISION_WINNERS + N_WILD_CARDS + 1)], axis=1)
+    return {'wins': wins.sum(axis=0), 'division': division_winner.sum(axis=0), 'playoffs': (seeds > 0).sum(axis=0), 'seeds': seed_counts}
+
+
+def simulate_season(schedule, strengths, n_simulations=N_SIMULATIONS, from_week=None, seed=0):
+    """
+    Simula la temporada n_simulations veces. Con from_week se mantienen los resultados reales anteriores a esa
+    semana y solo se simulan los partidos restantes. Devuelve un DataFrame con las probabilidades por equipo
+    """
+    home, away = schedule['home'].to_numpy(), schedule['away'].to_numpy()
+    neutral = schedule['neutral'].to_numpy() if 'neutral' in schedule.columns else np.zeros(len(schedule), dtype=bool)
+    margin = strengths[home] - strengths[away] + np.where(neutral, 0, HOME_FIELD_POINTS)
+    p_home = 0.5 * (1 + np.vectorize(math.erf)(margin / (MARGIN_SD * math.sqrt(2)))) #Probabilidad de victoria local (margen ~ Normal)
+    fixed_result = schedule['home_win'].to_numpy(dtype=float) if from_week is not None else np.full(len(schedule), np.nan)
+    if from_week is not None:
+        fixed_result = np.where(schedule['week'].to_numpy() < from_week, fixed_result, np.nan)
+    tiebreak = strengths.argsort().argsort() / len(strengths)
+
+    results = run_in_chunks(_simulate_chunk, (home, away, p_home, fixed_result, tiebreak), n_simulations, CHUNK_SIZE, seed,
+                            parallel=n_simulations >= PARALLEL_MIN_SIMULATIONS)
+    totals = {key: sum(result[key] for result in results) for key in results[0]}
+
+    simulation_df = pd.DataFrame({
+        'team': TEAMS,
+        'conference': [TEAM_INFO_MAP[team]['conference'] for team in TEAMS],
+        'division': [TEAM_INFO_MAP[team]['division'] for team in TEAMS],
+        'strength': strengths,
+        'expected_wins': totals['wins'] / n_simulations,
+        'division_prob': 100 * totals['division'] / n_simulations,
+        'playoff_prob': 100 * totals['playoffs'] / n_simulations
+    })
+    for s in range(N_DIVISION_WINNERS + N_WILD_CARDS):
+        simulation_df[f'seed_{s + 1}_prob'] = 100 * totals['seeds'][:, s] / n_simulations
+    return simulation_df
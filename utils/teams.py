@@ -0,0 +1,72 @@
+# Importamos las librerías
+import os
+
+# Diccionario con la información de Conferencia y División de cada equipo.
+TEAM_INFO_MAP = {
+    'ARI': {'conference': 'NFC', 'division': 'NFC West'}, 'ATL': {'conference': 'NFC', 'division': 'NFC South'},
+    'BAL': {'conference': 'AFC', 'division': 'AFC North'}, 'BUF': {'conference': 'AFC', 'division': 'AFC East'},
+    'CAR': {'conference': 'NFC', 'division': 'NFC South'}, 'CHI': {'conference': 'NFC', 'division': 'NFC North'},
+    'CIN': {'conference': 'AFC', 'division': 'AFC North'}, 'CLE': {'conference': 'AFC', 'division': 'AFC North'},
+    'DAL': {'conference': 'NFC', 'division': 'NFC East'}, 'DEN': {'conference': 'AFC', 'division': 'AFC West'},
+    'DET': {'conference': 'NFC', 'division': 'NFC North'}, 'GB': {'conference': 'NFC', 'division': 'NFC North'},
+    'HOU': {'conference': 'AFC', 'division': 'AFC South'}, 'IND': {'conference': 'AFC', 'division': 'AFC South'},
+    'JAX': {'conference': 'AFC', 'division': 'AFC South'}, 'KC': {'conference': 'AFC', 'division': 'AFC West'},
+    'LA': {'conference': 'NFC', 'division': 'NFC West'}, 'LAC': {'conference': 'AFC', 'division': 'AFC West'},
+    'LV': {'conference': 'AFC', 'division': 'AFC West'}, 'MIA': {'conference': 'AFC', 'division': 'AFC East'},
+    'MIN': {'conference': 'NFC', 'division': 'NFC North'}, 'NE': {'conference': 'AFC', 'division': 'AFC East'},
+    'NO': {'conference': 'NFC', 'division': 'NFC South'}, 'NYG': {'conference': 'NFC', 'division': 'NFC East'},
+    'NYJ': {'conference': 'AFC', 'division': 'AFC East'}, 'PHI': {'conference': 'NFC', 'division': 'NFC East'},
+    'PIT': {'conference': 'AFC', 'division': 'AFC North'}, 'SEA': {'conference': 'NFC', 'division': 'NFC West'},
+    'SF': {'conference': 'NFC', 'division': 'NFC West'}, 'TB': {'conference': 'NFC', 'division': 'NFC South'},
+    'TEN': {'conference': 'AFC', 'division': 'AFC South'}, 'WAS': {'conference': 'NFC', 'division': 'NFC East'}
+}
+
+# Nombre de cada equipo y URL original de su logo en ESPN (la usa el ETL para descargarlo y la web si aún no está descargado)
+TEAM_INFO = {
+    'ARI': {'name': 'Arizona Cardinals', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/ari.png'},
+    'ATL': {'name': 'Atlanta Falcons', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/atl.png'},
+    'BAL': {'name': 'Baltimore Ravens', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/bal.png'},
+    'BUF': {'name': 'Buffalo Bills', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/buf.png'},
+    'CAR': {'name': 'Carolina Panthers', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/car.png'},
+    'CHI': {'name': 'Chicago Bears', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/chi.png'},
+    'CIN': {'name': 'Cincinnati Bengals', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/cin.png'},
+    'CLE': {'name': 'Cleveland Browns', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/cle.png'},
+    'DAL': {'name': 'Dallas Cowboys', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/dal.png'},
+    'DEN': {'name': 'Denver Broncos', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/den.png'},
+    'DET': {'name': 'Detroit Lions', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/det.png'},
+    'GB': {'name': 'Green Bay Packers', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/gb.png'},
+    'HOU': {'name': 'Houston Texans', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/hou.png'},
+    'IND': {'name': 'Indianapolis Colts', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/ind.png'},
+    'JAX': {'name': 'Jacksonville Jaguars', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/jax.png'},
+    'KC': {'name': 'Kansas City Chiefs', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/kc.png'},
+    'LV': {'name': 'Las Vegas Raiders', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/lv.png'},
+    'LAC': {'name': 'Los Angeles Chargers', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/lac.png'},
+    'LA': {'name': 'Los Angeles Rams', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/lar.png'},
+    'MIA': {'name': 'Miami Dolphins', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/mia.png'},
+    'MIN': {'name': 'Minnesota Vikings', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/min.png'},
+    'NE': {'name': 'New England Patriots', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/ne.png'},
+    'NO': {'name': 'New Orleans Saints', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/no.png'},
+    'NYG': {'name': 'New York Giants', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/nyg.png'},
+    'NYJ': {'name': 'New York Jets', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/nyj.png'},
+    'PHI': {'name': 'Philadelphia Eagles', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/phi.png'},
+    'PIT': {'name': 'Pittsburgh Steelers', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/pit.png'},
+    'SF': {'name': 'San Francisco 49ers', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/sf.png'},
+    'SEA': {'name': 'Seattle Seahawks', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/sea.png'},
+    'TB': {'name': 'Tampa Bay Buccaneers', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/tb.png'},
+    'TEN': {'name': 'Tennessee Titans', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/ten.png'},
+    'WAS': {'name': 'Washington Commanders', 'logo_url': 'https://a.espncdn.com/i/teamlogos/nfl/500/wsh.png'}
+}
+
+LOGO_DIR = os.path.join('Images', 'logos') #Logos descargados por Data_extraction.py
+LOGO_SIZES = (100, 200) #Tamaños pre-redimensionados (px de ancho máximo)
+
+
+def team_logo_path(team, size=100):
+    """Ruta local del logo de un equipo con el tamaño indicado, o None si no se ha descargado."""
+    path = os.path.join(LOGO_DIR, str(size), f'{team}.png')
+    return path if os.path.exists(path) else None
+
+
+def team_logo(team, size=100):
+    """Logo local si ya se ha descargado con Data_extraction.py; si no, la URL original de ESPN (None si no se conoce)."""
+    return team_logo_path(team, size) or TEAM_INFO.get(team, {}).get('logo_url')
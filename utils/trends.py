@@ -0,0 +1,73 @@
+# Importamos las librerías
+import numpy as np
+import pandas as pd
+
+
+def compute_trends(df, entity_col, metrics, attribute_columns=(), year_col='year'):
+    """
+    Calcula de una sola vez, para todas las entidades y métricas, la variación interanual,
+    la pendiente por mínimos cuadrados y la volatilidad. Los datos se colocan en una matriz
+    (entidad x año x métrica) con NaN en las temporadas sin datos y se opera con NumPy
+    """
+    years = np.sort(df[year_col].unique())
+    entities = pd.Index(df[entity_col].unique())
+    entity_idx = entities.get_indexer(df[entity_col])
+    year_idx = np.searchsorted(years, df[year_col])
+
+    values = np.full((len(entities), len(years), len(metrics)), np.nan)
+    values[entity_idx, year_idx] = df[metrics].to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    n_seasons = valid.sum(axis=1)
+
+    # Pendiente por mínimos cuadrados ignorando las temporadas sin datos
+    x = np.broadcast_to(years.astype(float)[None, :, None], values.shape)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = np.where(valid, x, 0).sum(axis=1) / n_seasons
+        y_mean = np.nansum(values, axis=1) / n_seasons
+        dx = np.where(valid, x - x_mean[:, None, :], 0)
+        dy = np.where(valid, values - y_mean[:, None, :], 0)
+        slope = (dx * dy).sum(axis=1) / (dx ** 2).sum(axis=1)
+    slope[n_seasons < 2] = np.nan
+
+    # Variaciones interanuales entre temporadas consecutivas
+    deltas = np.diff(values, axis=1)
+    with np.errstate(invalid='ignore'):
+        n_deltas = (~np.isnan(deltas)).sum(axis=1)
+        mean_delta = np.where(n_deltas > 0, np.nansum(deltas, axis=1) / np.maximum(n_deltas, 1), np.nan)
+        volatility = np.where(n_deltas > 1, np.sqrt(np.nansum((deltas - mean_delta[:, None, :]) ** 2, axis=1) / np.maximum(n_deltas - 1, 1)), np.nan)
+    last_delta = deltas[:, -1, :] if deltas.shape[1] else np.full(n_seasons.shape, np.nan) #Cambio de la penúltima a la última temporada
+
+    # Primer y último valor disponibles de cada serie
+    first_idx = valid.argmax(axis=1)
+    last_idx = len(years) - 1 - valid[:, ::-1].argmax(axis=1)
+    e, m = np.indices(n_seasons.shape)
+    first_value = values[e, first_idx, m]
+    last_value = values[e, last_idx, m]
+
+    trends = pd.DataFrame({
+        entity_col: np.repeat(entities.to_numpy(), len(metrics)),
+        'metric': np.tile(metrics, len(entities)),
+        'n_seasons': n_seasons.ravel(),
+        'first_year': years[first_idx].ravel(),
+        'last_year': years[last_idx].ravel(),
+        'first_value': first_value.ravel(),
+        'last_value': last_value.ravel(),
+        'last_delta': last_delta.ravel(),
+        'mean_delta': mean_delta.ravel(),
+        'slope': slope.ravel(),
+        'volatility': volatility.ravel()
+    })
+    trends = trends[trends['n_seasons'] > 0]
+
+    if attribute_columns: #Atributos de la última temporada de cada entidad (nombre, posición...)
+        attributes = df.sort_values(year_col).drop_duplicates(entity_col, keep='last').set_index(entity_col)[list(attribute_columns)]
+        trends = trends.join(attributes, on=entity_col)
+    return trends.reset_index(drop=True)
+
+
+def biggest_movers(trends, metric, by='slope', n=10, lower_is_better=False, min_seasons=2):
+    """Devuelve (los que más mejoran, los que más empeoran) para una métrica según la columna indicada."""
+    metric_trends = trends[(trends['metric'] == metric) & (trends['n_seasons'] >= min_seasons)].dropna(subset=[by])
+    improving = metric_trends.nsmallest(n, by) if lower_is_better else metric_trends.nlargest(n, by)
+    declining = metric_trends.nlargest(n, by) if lower_is_better else metric_trends.nsmallest(n, by)
+    return improving, declining